@@ -0,0 +1,42 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import argparse
+import logging
+import os
+
+from jass.train.obs_action_dataset import convert_games_to_dataset
+
+"""
+Tool for converting files that contain complete games (json logs or game archives) into npz files that
+contain observation features and actions, using several processes.
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert files with games to npz files of features/actions')
+    parser.add_argument('--trump', action='store_true', help='Generate files for trump decision')
+    parser.add_argument('--output', type=str, help='Base name of the output files', default='dataset')
+    parser.add_argument('--output_dir', type=str, help='Directory for output files', default='.')
+    parser.add_argument('--max_entry', type=int, default=1000000, help='Maximal number of entries in one file')
+    parser.add_argument('--chunk', type=int, default=1000, help='Number of games converted together')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes')
+    parser.add_argument('--check', action='store_true', help='Check the invariants of the games (slow)')
+    parser.add_argument('files', type=str, nargs='+', help='The log files')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    os.makedirs(args.output_dir, exist_ok=True)
+    filenames = convert_games_to_dataset(args.files, os.path.join(args.output_dir, args.output),
+                                         trump=args.trump,
+                                         max_entries_per_file=args.max_entry,
+                                         chunk_size=args.chunk,
+                                         nr_workers=args.workers,
+                                         check_invariants=args.check)
+    print('Files written: {}'.format(len(filenames)))
+
+
+if __name__ == '__main__':
+    main()
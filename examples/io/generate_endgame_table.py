@@ -0,0 +1,31 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import argparse
+import logging
+
+from jass.game.endgame_table import generate_endgame_table
+
+"""
+Tool for generating an endgame table with the exact values of the positions of the last tricks, to be used by
+the search agents (see EndgameTable).
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate an endgame table')
+    parser.add_argument('--games', type=int, default=10000, help='Number of endgames to solve')
+    parser.add_argument('--tricks', type=int, default=3, help='Number of tricks left in the positions')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for the random generator')
+    parser.add_argument('output_dir', type=str, help='Directory for the table')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    nr_positions = generate_endgame_table(args.output_dir, args.games, nr_tricks=args.tricks, seed=args.seed)
+    print('Positions: {}'.format(nr_positions))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import argparse
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.service.latency_histogram import LatencyHistogram
+from jass.service.player_service_route import PLAY_CARD_PATH_PREFIX
+
+"""
+Load test for a player service: sends action_play_card requests from several threads with keep-alive connections
+and reports the throughput and the latency percentiles.
+
+For example, start the service with
+    python player_service.py --port 8888
+and run
+    python examples/service/load_test_player_service.py http://localhost:8888/noob --requests 5000 --concurrency 32
+"""
+
+
+def create_observations(nr_games: int) -> list:
+    """
+    Create the observations (as json) for all card plays of random games.
+    """
+    rule = RuleSchieber()
+    agent = AgentRandomSchieber()
+    observations = []
+    for _ in range(nr_games):
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=0)
+        game.action_trump(agent.action_trump(game.get_observation()))
+        if game.state.trump == -1:
+            game.action_trump(agent.action_trump(game.get_observation()))
+        while not game.is_done():
+            obs = game.get_observation()
+            data = obs.to_json()
+            data['gameId'] = 0
+            observations.append(data)
+            game.action_play_card(agent.action_play_card(obs))
+    return observations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test for a player service')
+    parser.add_argument('url', type=str, help='Url of the player, for example http://localhost:8888/noob')
+    parser.add_argument('--requests', type=int, default=1000, help='Number of requests')
+    parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent requests')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Timeout of the requests in seconds')
+    parser.add_argument('--output', type=str, default=None, help='File to write the results as json')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    observations = create_observations(nr_games=10)
+    url = args.url + PLAY_CARD_PATH_PREFIX
+
+    http = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=args.concurrency)
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+
+    histogram = LatencyHistogram()
+    nr_errors = 0
+    errors_lock = threading.Lock()
+
+    def send(i: int) -> None:
+        nonlocal nr_errors
+        start = time.perf_counter()
+        try:
+            response = http.post(url, json=observations[i % len(observations)], timeout=args.timeout)
+            response.raise_for_status()
+            histogram.record(time.perf_counter() - start)
+        except Exception:
+            with errors_lock:
+                nr_errors += 1
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start_time
+
+    result = histogram.to_dict()
+    result['throughput'] = histogram.count / elapsed
+    result['errors'] = nr_errors
+    result['elapsed'] = elapsed
+    print('Requests: {}, errors: {}, time: {:.2f} s, throughput: {:.1f} requests/s'.format(
+        args.requests, nr_errors, elapsed, result['throughput']))
+    print('Latency: {}'.format(histogram))
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
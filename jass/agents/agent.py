@@ -2,6 +2,8 @@
 #
 # Created by Thomas Koller on 7/28/2020
 #
+from typing import List
+
 from jass.game.game_observation import GameObservation
 
 
@@ -31,3 +33,31 @@ class Agent:
             the card to play, int encoded as defined in jass.game.const
         """
         raise NotImplementedError
+
+    def action_trump_batch(self, observations: List[GameObservation]) -> List[int]:
+        """
+        Determine the trump actions for a list of observations, for example from different games. Agents can
+        override this to determine all actions together, for example in one evaluation of a neural network. The
+        default implementation calls action_trump for each observation.
+
+        Args:
+            observations: the game observations, they must be in a state for trump selection
+
+        Returns:
+            list of the selected trumps or PUSH, in the same order as the observations
+        """
+        return [self.action_trump(obs) for obs in observations]
+
+    def action_play_card_batch(self, observations: List[GameObservation]) -> List[int]:
+        """
+        Determine the cards to play for a list of observations, for example from different games. Agents can
+        override this to determine all actions together, for example in one evaluation of a neural network. The
+        default implementation calls action_play_card for each observation.
+
+        Args:
+            observations: the game observations
+
+        Returns:
+            list of the cards to play, in the same order as the observations
+        """
+        return [self.action_play_card(obs) for obs in observations]
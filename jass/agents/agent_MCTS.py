@@ -1,11 +1,17 @@
+import logging
+import time
+
 import numpy as np
-import random
 from jass.game.const import *
+from jass.game.endgame_table import EndgameTable
 from jass.game.game_sim import GameSim
 from jass.game.game_observation import GameObservation
+from jass.game.game_state_util import state_from_observation
+from jass.game.hand_sampler import HandSampler
 from jass.agents.agent import Agent
 from jass.game.rule_schieber import RuleSchieber
 
+
 class MCTSNode:
     def __init__(self, state, parent=None, action=None):
         self.state = state
@@ -27,97 +33,128 @@ class MCTSNode:
             return float('inf')  # unerforschte Knoten bevorzugen
         return (self.wins / self.visits) + exploration_param * np.sqrt(np.log(self.parent.visits) / self.visits)
 
+
 class AgentMCTS(Agent):
-    def __init__(self):
+    """
+    Monte-Carlo-Agent: die Aktionen an der Wurzel werden mit UCT ausgewählt, die unbekannten Karten der anderen
+    Spieler werden für jede Iteration zufällig verteilt (passend zu den bisher gespielten Karten, siehe HandSampler)
+    und das Spiel mit zufälligen Zügen zu Ende gespielt.
+
+    Ohne Zeitbudget wird eine feste Anzahl Iterationen durchgeführt. Mit einem Zeitbudget (in Sekunden) wird iteriert,
+    bis die Zeit abgelaufen ist (anytime), und die bis dahin beste Aktion gewählt. Informationen zur letzten Suche
+    stehen in last_search_info.
+
+    Mit einer Endspiel-Tabelle (siehe EndgameTable) wird die Simulation beendet, sobald eine Position in der
+    Tabelle ist, und deren exakter Wert verwendet.
+    """
+    def __init__(self, iterations: int = 100, time_budget: float = None, seed: int = None,
+                 endgame_table: EndgameTable = None):
         super().__init__()
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.endgame_table = endgame_table
+        self.last_search_info = {}
+        self._logger = logging.getLogger(__name__)
         self._rule = RuleSchieber()
+        self.game_simulator = GameSim(rule=self._rule)
+        self._rng = np.random.default_rng(seed)
 
-    def run_simulation(self, node):
+    def run_simulation(self, own_team: int) -> float:
         """
-        Führe eine Simulation von dem aktuellen Knoten aus, um ein Spielende zu erreichen.
+        Führe eine Simulation vom aktuellen Zustand des Simulators bis zum Spielende durch.
+
+        Returns:
+            Anteil der Punkte des eigenen Teams
         """
         sim_game = self.game_simulator
-        sim_game.init_from_game_state(node.state)
 
         # Zufaellige Spielausgänge simulieren
         while not sim_game.is_done():
-            valid_cards = self._rule.get_valid_cards_from_obs(sim_game.current_player)
-            action = random.choice(valid_cards)
-            sim_game.play_card(action)
+            if self.endgame_table is not None:
+                points = self.endgame_table.final_points(sim_game)
+                if points is not None:
+                    return points[own_team] / 157.0
+            valid_cards = np.flatnonzero(self._rule.get_valid_cards_from_state(sim_game.state))
+            sim_game.action_play_card(int(self._rng.choice(valid_cards)))
 
         # Ergebniss des Spiels
-        result = sim_game.get_winner()
-        if result == 0:  # wenn Agent gewinnt
-            return 1
-        return 0
+        return sim_game.state.points[own_team] / 157.0
 
     def select_best_action(self, node):
         """
-        Wähle die Aktion mit dem höchsten UCT-Wert.
+        Wähle die am meisten besuchte Aktion.
         """
-        best_child = max(node.children, key=lambda child: child.uct_value())
+        best_child = max(node.children, key=lambda child: child.visits)
         return best_child.action
 
-    def action_trump(self, obs: GameObservation) -> int:
+    def search(self, obs: GameObservation, actions, apply_action) -> int:
         """
-        Wähle Trumpf mit MCTS basierend auf der Hand und der Situation.
+        Suche die beste Aktion mit UCT an der Wurzel.
+
+        Args:
+            obs: die Beobachtung
+            actions: die möglichen Aktionen
+            apply_action: Funktion, welche eine Aktion im Simulator ausführt
+        Returns:
+            die beste Aktion
         """
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        own_team = team[obs.player_view]
         root_node = MCTSNode(state=obs)
+        sampler = HandSampler(obs, self._rng)
+        for action in actions:
+            root_node.add_child(MCTSNode(state=None, parent=root_node, action=action))
+
+        nr_iterations = 0
+        while True:
+            if deadline is None:
+                if nr_iterations >= self.iterations:
+                    break
+            elif nr_iterations > 0 and time.perf_counter() > deadline:
+                break
 
-        for _ in range(self.iterations):
-            node = root_node
             # Auswahl
-            while node.children:
-                node = max(node.children, key=lambda child: child.uct_value())
-            
-            # Expansion
-            if node.visits > 0:
-                for action in [DIAMONDS, HEARTS, SPADES, CLUBS, OBE_ABE, UNE_UFE, PUSH]:
-                    child_state = obs.clone()
-                    child_state.trump = action
-                    child_node = MCTSNode(state=child_state, parent=node, action=action)
-                    node.add_child(child_node)
-                node = random.choice(node.children)
+            node = max(root_node.children, key=lambda child: child.uct_value())
 
             # Simulation
-            result = self.run_simulation(node)
-            
+            self.game_simulator.init_from_state(state_from_observation(obs, sampler.sample()))
+            apply_action(self.game_simulator, node.action)
+            result = self.run_simulation(own_team)
+
             # Backpropagation
             while node is not None:
                 node.update(result)
                 node = node.parent
+            nr_iterations += 1
 
-        return self.select_best_action(root_node)
+        best_action = self.select_best_action(root_node)
+        self.last_search_info = dict(iterations=nr_iterations, time=time.perf_counter() - start)
+        self._logger.info('Action: {}, search: {}'.format(best_action, self.last_search_info))
+        return best_action
 
-    def action_play_card(self, obs: GameObservation) -> int:
+    def action_trump(self, obs: GameObservation) -> int:
         """
-        Wähle die beste Karte basierend auf MCTS.
+        Wähle Trumpf mit MCTS basierend auf der Hand und der Situation.
         """
-        root_node = MCTSNode(state=obs)
+        actions = [DIAMONDS, HEARTS, SPADES, CLUBS, OBE_ABE, UNE_UFE]
+        if obs.forehand == -1:
+            actions.append(PUSH)
 
-        for _ in range(100):
-            node = root_node
+        def apply_trump(sim: GameSim, action: int):
+            sim.action_trump(action)
+            if action == PUSH:
+                # der Partner wählt zufällig
+                sim.action_trump(int(self._rng.integers(0, MAX_TRUMP + 1)))
 
-            # Auswahl
-            while node.children:
-                node = max(node.children, key=lambda child: child.uct_value())
-
-            # Expansion
-            if node.visits > 0:
-                valid_cards = self._rule.get_valid_cards_from_obs(obs)
-                for action in valid_cards:
-                    child_state = obs.clone()
-                    child_state.play_card(action)
-                    child_node = MCTSNode(state=child_state, parent=node, action=action)
-                    node.add_child(child_node)
-                node = random.choice(node.children)
-
-            # Simulation
-            result = self.run_simulation(node)
-
-            # Backpropagation
-            while node is not None:
-                node.update(result)
-                node = node.parent
+        return self.search(obs, actions, apply_trump)
 
-        return self.select_best_action(root_node)
+    def action_play_card(self, obs: GameObservation) -> int:
+        """
+        Wähle die beste Karte basierend auf MCTS.
+        """
+        valid_cards = [int(card) for card in np.flatnonzero(self._rule.get_valid_cards_from_obs(obs))]
+        if len(valid_cards) == 1:
+            self.last_search_info = dict(iterations=0, time=0.0)
+            return valid_cards[0]
+        return self.search(obs, valid_cards, lambda sim, card: sim.action_play_card(card))
@@ -3,14 +3,20 @@
 # Created by Thomas Koller on 7/30/2020
 #
 import logging
+import threading
+import uuid
+from http import HTTPStatus
+from typing import List
 
 import requests
 
 from jass.agents.agent import Agent
 from jass.agents.agent_random_schieber import AgentRandomSchieber
-from jass.game.const import card_ids
+from jass.game.const import card_ids, card_strings
 from jass.game.game_observation import GameObservation
-from jass.service.player_service_route import SEND_INFO_PREFIX, SELECT_TRUMP_PATH_PREFIX, PLAY_CARD_PATH_PREFIX
+from jass.service.player_service_route import SEND_INFO_PREFIX, SELECT_TRUMP_PATH_PREFIX, PLAY_CARD_PATH_PREFIX, \
+    GAME_ID_KEY, SESSION_KEY, DELTA_CARDS_KEY, DELTA_NR_PLAYED_CARDS_KEY, SELECT_TRUMP_BATCH_PATH_PREFIX, \
+    PLAY_CARD_BATCH_PATH_PREFIX, OBSERVATIONS_KEY
 
 
 class AgentByNetwork(Agent):
@@ -18,16 +24,27 @@ class AgentByNetwork(Agent):
     Forwards the request to a player service. Used for locally playing against deployed services.
 
     A random agent is used as standing player, if the service does not answer within a timeout.
+
+    If use_session is set, the session protocol of the service is used to play cards: the full observation is only
+    sent for the first card of a game, and afterwards only the cards played since the last request.
     """
 
-    def __init__(self, url, timeout=10):
+    def __init__(self, url, timeout=10, use_session=False):
         self._logger = logging.getLogger(__name__)
         self._standin_player = AgentRandomSchieber()
         self._base_url = url
         self._url_info = self._base_url + SEND_INFO_PREFIX
         self._url_trump = self._base_url + SELECT_TRUMP_PATH_PREFIX
         self._url_play = self._base_url + PLAY_CARD_PATH_PREFIX
+        self._url_trump_batch = self._base_url + SELECT_TRUMP_BATCH_PATH_PREFIX
+        self._url_play_batch = self._base_url + PLAY_CARD_BATCH_PATH_PREFIX
         self._timeout = timeout
+        self._use_session = use_session
+
+        # game id and number of played cards sent to the service, by the player of the observation and its cards at
+        # the start of the game (so that the same agent can be used for several players and concurrent games)
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
 
     def action_trump(self, obs: GameObservation) -> int:
         data = obs.to_json()
@@ -35,7 +52,7 @@ class AgentByNetwork(Agent):
         # noinspection PyBroadException
         try:
             self._logger.info('Sending request...')
-            response = requests.post(self._url_trump, json=data, timeout=self._timeout)
+            response = self._post(self._url_trump, data)
             response_data = response.json()
             self._logger.info('got response: {}'.format(response_data))
             trump = int(response_data['trump'])
@@ -46,11 +63,14 @@ class AgentByNetwork(Agent):
 
     # noinspection PyBroadException
     def action_play_card(self, obs: GameObservation) -> int:
-        data = obs.to_json()
-        data['gameId'] = 0
         try:
             self._logger.info('Sending request...')
-            response = requests.post(self._url_play, json=data, timeout=self._timeout)
+            if self._use_session:
+                response = self._post_play_card_session(obs)
+            else:
+                data = obs.to_json()
+                data['gameId'] = 0
+                response = self._post(self._url_play, data)
             response_data = response.json()
             self._logger.info('got response: {}'.format(response_data))
             card = response_data['card']
@@ -59,3 +79,88 @@ class AgentByNetwork(Agent):
         except Exception:
             self._logger.error('No response from network player, using standin player')
             return self._standin_player.action_play_card(obs)
+
+    # noinspection PyBroadException
+    def action_trump_batch(self, observations: List[GameObservation]) -> List[int]:
+        try:
+            self._logger.info('Sending batch request...')
+            response = self._post(self._url_trump_batch, {OBSERVATIONS_KEY: [obs.to_json() for obs in observations]})
+            trumps = [int(trump) for trump in response.json()['trumps']]
+            if len(trumps) != len(observations):
+                raise ValueError('Wrong number of trumps in response')
+            return trumps
+        except Exception:
+            self._logger.error('No response from network player, using standin player')
+            return [self._standin_player.action_trump(obs) for obs in observations]
+
+    # noinspection PyBroadException
+    def action_play_card_batch(self, observations: List[GameObservation]) -> List[int]:
+        try:
+            self._logger.info('Sending batch request...')
+            response = self._post(self._url_play_batch, {OBSERVATIONS_KEY: [obs.to_json() for obs in observations]})
+            cards = [card_ids[card] for card in response.json()['cards']]
+            if len(cards) != len(observations):
+                raise ValueError('Wrong number of cards in response')
+            return cards
+        except Exception:
+            self._logger.error('No response from network player, using standin player')
+            return [self._standin_player.action_play_card(obs) for obs in observations]
+
+    def _post(self, url: str, data: dict) -> requests.Response:
+        """
+        Send a request to the service.
+        Args:
+            url: the url of the request
+            data: the data to send as json
+        Returns:
+            the response
+        """
+        return requests.post(url, json=data, timeout=self._timeout)
+
+    def _post_play_card_session(self, obs: GameObservation) -> requests.Response:
+        """
+        Send the play card request using the session protocol. A new session is started if the observation is from
+        a new game, or if the service does not know the session.
+        """
+        key = _session_key(obs)
+        with self._sessions_lock:
+            session = self._sessions.get(key)
+        if session is not None and session[1] < obs.nr_played_cards:
+            game_id, nr_sent = session
+            cards = obs.tricks.reshape(-1)[nr_sent:obs.nr_played_cards]
+            data = {GAME_ID_KEY: game_id,
+                    DELTA_CARDS_KEY: [card_strings[card] for card in cards],
+                    DELTA_NR_PLAYED_CARDS_KEY: obs.nr_played_cards}
+            response = self._post(self._url_play, data)
+            if response.status_code != HTTPStatus.CONFLICT:
+                self._update_session(key, game_id, obs)
+                return response
+            self._logger.info('Session not found by service, sending full observation')
+
+        game_id = uuid.uuid4().hex
+        data = obs.to_json()
+        data[GAME_ID_KEY] = game_id
+        data[SESSION_KEY] = True
+        response = self._post(self._url_play, data)
+        self._update_session(key, game_id, obs)
+        return response
+
+    def _update_session(self, key: tuple, game_id: str, obs: GameObservation) -> None:
+        with self._sessions_lock:
+            if obs.hand.sum() <= 1:
+                # last card of the player in this game
+                self._sessions.pop(key, None)
+            else:
+                self._sessions[key] = (game_id, obs.nr_played_cards)
+
+
+def _session_key(obs: GameObservation) -> tuple:
+    """
+    Key identifying the game of an observation: the player and the cards the player had at the start of the game.
+    """
+    cards = obs.hand.copy()
+    for trick in range((obs.nr_played_cards + 3) // 4):
+        card = obs.tricks[trick, (obs.trick_first_player[trick] - obs.player_view) % 4]
+        if card != -1:
+            cards[card] = 1
+    return obs.player_view, cards.tobytes()
@@ -0,0 +1,90 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from jass.agents.agent_by_network import AgentByNetwork
+from jass.game.game_observation import GameObservation
+from jass.service.latency_histogram import LatencyHistogram
+
+
+class AgentByNetworkAsync(AgentByNetwork):
+    """
+    Forwards the request to a player service like AgentByNetwork, but reuses keep-alive connections from a pool and
+    supports several requests in flight at the same time, for example to play concurrent games against the same
+    service.
+
+    The requests can be made synchronously (action_trump, action_play_card) from several threads, or from asyncio
+    coroutines (action_trump_async, action_play_card_async), which run the requests in a thread pool with one thread
+    per connection. The observation must not be changed until the request has completed.
+
+    The latencies of the successful requests are collected in histograms, failed requests are answered by the
+    standin player as in AgentByNetwork and counted in nr_failed_requests.
+    """
+
+    def __init__(self, url, timeout=10, use_session=False, max_connections: int = 16):
+        """
+        Args:
+            url: url of the player service
+            timeout: timeout of the requests in seconds
+            use_session: use the session protocol for playing cards
+            max_connections: maximal number of connections (and concurrent requests) to the service
+        """
+        super().__init__(url, timeout=timeout, use_session=use_session)
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections, pool_block=True)
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections)
+
+        self.latency_trump = LatencyHistogram()
+        self.latency_play_card = LatencyHistogram()
+        self.nr_failed_requests = 0
+        self._failed_lock = threading.Lock()
+
+    async def action_trump_async(self, obs: GameObservation) -> int:
+        """
+        Determine the trump action as coroutine, see action_trump.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.action_trump, obs)
+
+    async def action_play_card_async(self, obs: GameObservation) -> int:
+        """
+        Determine the card to play as coroutine, see action_play_card.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.action_play_card, obs)
+
+    def close(self) -> None:
+        """
+        Close the connections and stop the threads.
+        """
+        self._executor.shutdown(wait=True)
+        self._http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _post(self, url: str, data: dict) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            response = self._http.post(url, json=data, timeout=self._timeout)
+        except Exception:
+            with self._failed_lock:
+                self.nr_failed_requests += 1
+            raise
+        latency = time.perf_counter() - start
+        if url == self._url_trump or url == self._url_trump_batch:
+            self.latency_trump.record(latency)
+        else:
+            self.latency_play_card.record(latency)
+        return response
@@ -0,0 +1,63 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import logging
+import time
+
+from jass.agents.agent_cheating import AgentCheating
+from jass.game.const import card_strings, team, MAX_TRUMP
+from jass.game.double_dummy_search import DoubleDummySearch
+from jass.game.game_sim import GameSim
+from jass.game.game_state import GameState
+from jass.game.rule_schieber import RuleSchieber
+
+
+class AgentDoubleDummySearch(AgentCheating):
+    """
+    Agent playing with all hands known using a horizon limited double dummy search (see DoubleDummySearch).
+
+    The play is exact (double dummy) only for the last exact_tricks tricks. Searching all the remaining tricks takes
+    too long in python earlier in the game, so before that only the next max_tricks tricks are searched and the points
+    of the later tricks are split evenly, which is a heuristic and not the double dummy value. Trump is selected in the
+    same way by searching the first max_tricks tricks for each trump. As all hands are known, pushing can not be better than selecting trump (the forehand player leads
+    in both cases), so the agent never pushes.
+    """
+
+    def __init__(self, exact_tricks: int = 5, max_tricks: int = 3):
+        """
+        Args:
+            exact_tricks: number of tricks left from which on all the remaining tricks are searched (exact play)
+            max_tricks: number of tricks to search ahead before that
+        """
+        self.exact_tricks = exact_tricks
+        self.max_tricks = max_tricks
+        self.last_search_info = {}
+        self._logger = logging.getLogger(__name__)
+        self._search = DoubleDummySearch()
+        self._sim = GameSim(rule=RuleSchieber())
+
+    def action_trump(self, state: GameState) -> int:
+        own_team = team[state.player]
+        best_trump = 0
+        best_value = -1
+        for trump in range(MAX_TRUMP + 1):
+            self._sim.init_from_state(state)
+            self._sim.action_trump(trump)
+            value = self._search.solve(self._sim.state, self.max_tricks)
+            if team[self._sim.state.player] != own_team:
+                # no cards are played yet, so all 157 points are left
+                value = 157 - value
+            if value > best_value:
+                best_trump, best_value = trump, value
+        return best_trump
+
+    def action_play_card(self, state: GameState) -> int:
+        start = time.perf_counter()
+        tricks_left = 9 - state.nr_tricks
+        max_tricks = None if tricks_left <= self.exact_tricks else self.max_tricks
+        card = self._search.best_card(state, max_tricks)
+        self.last_search_info = dict(exact=max_tricks is None, nodes=self._search.nr_nodes,
+                                     time=time.perf_counter() - start)
+        self._logger.info('Played card: {}, search: {}'.format(card_strings[card], self.last_search_info))
+        return card
@@ -0,0 +1,227 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import logging
+import multiprocessing
+import time
+from typing import Dict
+
+import numpy as np
+
+from jass.agents.agent import Agent
+from jass.agents.agent_MCTS import AgentMCTS
+from jass.game.const import team
+from jass.game.endgame_table import EndgameTable
+from jass.game.game_observation import GameObservation
+from jass.game.game_sim import GameSim
+from jass.game.hand_sampler import HandSampler
+from jass.game.game_state_util import state_from_observation
+from jass.game.rule_schieber import RuleSchieber
+
+
+class ISMCTSNode:
+    """
+    Node of the information set MCTS tree. The children are indexed by the card played, the reward is from the view
+    of the team of the player that played the card leading to this node.
+    """
+    def __init__(self, parent: 'ISMCTSNode' = None, card: int = -1, player_team: int = -1):
+        self.parent = parent
+        self.card = card
+        self.player_team = player_team
+        self.children: Dict[int, 'ISMCTSNode'] = {}
+        self.visits = 0
+        self.availability = 0
+        self.reward = 0.0
+
+    def ucb_value(self, exploration: float) -> float:
+        return self.reward / self.visits + exploration * np.sqrt(np.log(self.availability) / self.visits)
+
+
+class AgentISMCTS(Agent):
+    """
+    Agent playing cards with single observer information set MCTS (Cowling et al.). In each iteration, the hidden
+    cards of the other players are dealt randomly by a HandSampler, consistent with the cards the players have shown
+    not to hold, and the tree is descended using only the cards that are valid in this deal. The game is then played
+    to the end with random cards, or until a position in the endgame table is reached, if one is given.
+
+    A single GameSim is reused for all iterations: after each iteration the played cards are undone and only the
+    hands of the other players are replaced by a new deal.
+
+    The search can be run in several processes (root parallelization), the visit counts of the cards at the root
+    are then added. The agent (with its endgame table) is sent to the worker processes once when they are started,
+    so changes of its parameters after the first decision do not reach the workers. Trump is selected by the flat Monte Carlo search of AgentMCTS.
+    """
+    # number of deals that are drawn at once from the sampler
+    DEALS_PER_BATCH = 64
+
+    def __init__(self, iterations: int = 1000, time_budget: float = None, exploration: float = 0.7,
+                 nr_processes: int = 1, seed: int = None, endgame_table: EndgameTable = None):
+        """
+        Args:
+            iterations: number of iterations per decision (per process), if no time budget is set
+            time_budget: time in seconds per decision, iterations are run until the time is used
+            exploration: exploration constant of UCB
+            nr_processes: number of processes to search in parallel
+            seed: seed for the random generators
+            endgame_table: table of exact values to end the simulations early
+        """
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.nr_processes = nr_processes
+        self.endgame_table = endgame_table
+        self.last_search_info = {}
+        self._logger = logging.getLogger(__name__)
+        self._rule = RuleSchieber()
+        self._sim = GameSim(rule=self._rule)
+        self._rng = np.random.default_rng(seed)
+        self._trump_agent = AgentMCTS(iterations=200, seed=seed)
+        self._pool = None
+        self._deals = np.zeros([self.DEALS_PER_BATCH, 4, 36], dtype=np.int32)
+
+    def __getstate__(self):
+        # the pool can not be pickled to the worker processes
+        state = self.__dict__.copy()
+        state['_pool'] = None
+        return state
+
+    def close(self) -> None:
+        """
+        Stop the worker processes, if any.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def action_trump(self, obs: GameObservation) -> int:
+        return self._trump_agent.action_trump(obs)
+
+    def action_play_card(self, obs: GameObservation) -> int:
+        start = time.perf_counter()
+        valid_cards = np.flatnonzero(self._rule.get_valid_cards_from_obs(obs))
+        if len(valid_cards) == 1:
+            self.last_search_info = dict(iterations=0, time=0.0)
+            return int(valid_cards[0])
+
+        if self.nr_processes > 1:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.nr_processes, initializer=_init_process, initargs=(self,))
+            seeds = self._rng.integers(0, 2 ** 31, size=self.nr_processes)
+            results = self._pool.map(_search_in_process, [(obs, int(seed)) for seed in seeds])
+        else:
+            results = [self.search(obs)]
+
+        visits = np.zeros(36, dtype=np.int64)
+        nr_iterations = 0
+        for root_visits, iterations in results:
+            visits += root_visits
+            nr_iterations += iterations
+        card = int(np.argmax(visits))
+        self.last_search_info = dict(iterations=nr_iterations, time=time.perf_counter() - start)
+        self._logger.info('Card: {}, search: {}'.format(card, self.last_search_info))
+        return card
+
+    def search(self, obs: GameObservation) -> (np.ndarray, int):
+        """
+        Run the search from the observation.
+
+        Args:
+            obs: observation of the player to play
+
+        Returns:
+            the visit counts of the cards at the root, the number of iterations
+        """
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        root = ISMCTSNode()
+        sampler = HandSampler(obs, self._rng)
+        deals = self._deals
+        sim = self._sim
+        sim.init_from_state(state_from_observation(obs, sampler.sample()))
+        state = sim.state
+        root_nr_played = state.nr_played_cards
+
+        nr_iterations = 0
+        while True:
+            if deadline is None:
+                if nr_iterations >= self.iterations:
+                    break
+            elif nr_iterations > 0 and time.perf_counter() > deadline:
+                break
+
+            # new determinization, the state is at the root
+            deal_nr = nr_iterations % self.DEALS_PER_BATCH
+            if deal_nr == 0:
+                sampler.sample_batch(self.DEALS_PER_BATCH, out=deals)
+            state.hands[:, :] = deals[deal_nr]
+            sim.update_zobrist_key()
+
+            # selection and expansion
+            node = root
+            while state.nr_played_cards < 36:
+                valid = np.flatnonzero(self._rule.get_valid_cards_from_state(state))
+                untried = [card for card in valid if card not in node.children]
+                for card in valid:
+                    if card in node.children:
+                        node.children[card].availability += 1
+                if len(untried) > 0:
+                    card = int(self._rng.choice(untried))
+                    child = ISMCTSNode(parent=node, card=card, player_team=team[state.player])
+                    child.availability = 1
+                    node.children[card] = child
+                    sim.action_play_card(card)
+                    node = child
+                    break
+                node = max((node.children[card] for card in valid),
+                           key=lambda child: child.ucb_value(self.exploration))
+                sim.action_play_card(node.card)
+
+            # simulation
+            points = None
+            while state.nr_played_cards < 36:
+                if self.endgame_table is not None:
+                    points = self.endgame_table.final_points(sim)
+                    if points is not None:
+                        break
+                valid = np.flatnonzero(self._rule.get_valid_cards_from_state(state))
+                sim.action_play_card(int(self._rng.choice(valid)))
+            result = (points if points is not None else state.points)[0] / 157.0
+
+            # backpropagation
+            while node.parent is not None:
+                node.visits += 1
+                node.reward += result if node.player_team == 0 else 1.0 - result
+                node = node.parent
+            root.visits += 1
+
+            # back to the root state
+            while state.nr_played_cards > root_nr_played:
+                sim.undo_play_card()
+            nr_iterations += 1
+
+        root_visits = np.zeros(36, dtype=np.int64)
+        for card, child in root.children.items():
+            root_visits[card] = child.visits
+        return root_visits, nr_iterations
+
+
+# the agent of a worker process, set when the process is started
+_process_agent: AgentISMCTS or None = None
+
+
+def _init_process(agent: AgentISMCTS) -> None:
+    """
+    Store the agent in a worker process, so that it is not sent with each search.
+    """
+    global _process_agent
+    _process_agent = agent
+
+
+def _search_in_process(args) -> (np.ndarray, int):
+    """
+    Run the search of the agent of the worker process with a different seed.
+    """
+    obs, seed = args
+    _process_agent._rng = np.random.default_rng(seed)
+    return _process_agent.search(obs)
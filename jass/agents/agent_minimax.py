@@ -1,16 +1,45 @@
 import logging
+import time
+
 import numpy as np
 from jass.agents.agent_cheating import AgentCheating
-from jass.game.const import card_strings, PUSH, MAX_TRUMP
+from jass.game.const import card_strings, PUSH, MAX_TRUMP, team
+from jass.game.game_sim import GameSim
 from jass.game.game_state import GameState
 from jass.game.rule_schieber import RuleSchieber
+from jass.game.zobrist import TranspositionTable
+
+
+class _SearchTimeout(Exception):
+    """
+    Raised inside the search when the deadline has passed.
+    """
+
 
 class AgentMinimax(AgentCheating):
-    def __init__(self, depth=3):
+    """
+    Minimax-Agent mit Alpha-Beta-Pruning auf dem vollständigen Spielzustand.
+
+    Ohne Zeitbudget wird bis zur festen Tiefe (in Karten) gesucht. Mit einem Zeitbudget (in Sekunden) wird die Tiefe
+    iterativ erhöht (anytime), bis die Zeit abgelaufen ist, und der beste Zug der letzten vollständigen Iteration
+    gespielt. Informationen zur letzten Suche stehen in last_search_info.
+
+    Positionen, die über verschiedene Reihenfolgen der Karten erreicht werden, werden über eine Transpositionstabelle
+    (Zobrist-Schlüssel der Simulation) nur einmal durchsucht, die Werte sind relativ zur Punktdifferenz der Position
+    gespeichert.
+    """
+    def __init__(self, depth=3, time_budget: float = None, table_size_bits: int = 18):
         super().__init__()
         self.depth = depth  # Tiefe für den Minimax-Baum
+        self.time_budget = time_budget
+        self.last_search_info = {}
         self._logger = logging.getLogger(__name__)
         self._rule = RuleSchieber()
+        self._sim = GameSim(rule=self._rule)
+        self._deadline = None
+        self._nr_nodes = 0
+        # eine Tabelle pro Team, da die Werte aus der Sicht des eigenen Teams sind
+        self._tables = [TranspositionTable(table_size_bits), TranspositionTable(table_size_bits)]
 
     def action_trump(self, state: GameState) -> int:
         """
@@ -25,54 +54,119 @@ class AgentMinimax(AgentCheating):
         """
         Wählt die beste Karte basierend auf Minimax mit Alpha-Beta-Pruning.
         """
-        valid_cards = self._rule.get_valid_cards_from_state(state)
-        best_score = float('-inf')
-        best_card = None
+        start = time.perf_counter()
+        self._deadline = start + self.time_budget if self.time_budget is not None else None
+        self._nr_nodes = 0
+        table = self._tables[team[state.player]]
+        table.new_search()
+        nr_hits = table.nr_hits
+        max_depth = 36 - state.nr_played_cards
+
+        if self.time_budget is None:
+            depths = [min(self.depth, max_depth)]
+        else:
+            depths = range(1, max_depth + 1)
+
+        valid_cards = np.flatnonzero(self._rule.get_valid_cards_from_state(state))
+        best_card = int(valid_cards[0])
+        nr_iterations = 0
+        depth_reached = 0
+        for depth in depths:
+            self._sim.init_from_state(state)
+            try:
+                best_card = self._search_root(valid_cards, depth, best_card)
+            except _SearchTimeout:
+                break
+            nr_iterations += 1
+            depth_reached = depth
+
+        self.last_search_info = dict(iterations=nr_iterations, depth=depth_reached, nodes=self._nr_nodes,
+                                     table_hits=table.nr_hits - nr_hits, time=time.perf_counter() - start)
+        self._logger.info('Played card: {}, search: {}'.format(card_strings[best_card], self.last_search_info))
+        return best_card
 
-        for card in np.flatnonzero(valid_cards):
-            new_state = state.clone()
-            new_state.play_card(card)
-            score = self.minimax(new_state, self.depth, False, float('-inf'), float('inf'))
+    def _search_root(self, valid_cards: np.ndarray, depth: int, first_card: int) -> int:
+        """
+        Suche auf der Wurzel, die beste Karte der vorherigen Iteration wird zuerst untersucht.
+        """
+        own_team = team[self._sim.state.player]
+        ordered = [first_card] + [int(card) for card in valid_cards if card != first_card]
+        best_score = float('-inf')
+        best_card = first_card
+        alpha = float('-inf')
+        for card in ordered:
+            self._sim.action_play_card(card)
+            score = self.minimax(depth - 1, own_team, alpha, float('inf'))
+            self._sim.undo_play_card()
             if score > best_score:
                 best_score = score
                 best_card = card
-
-        self._logger.info(f"Played card: {card_strings[best_card]}")
+            alpha = max(alpha, score)
         return best_card
 
-    def minimax(self, state: GameState, depth, maximizing_player, alpha, beta) -> int:
+    def minimax(self, depth: int, own_team: int, alpha, beta) -> int:
         """
-        Minimax mit Alpha-Beta-Pruning.
+        Minimax mit Alpha-Beta-Pruning auf dem Zustand der Simulation, die Züge werden gespielt und wieder
+        zurückgenommen. Der maximierende Spieler ist das eigene Team.
         """
-        if depth == 0 or state.is_done():
-            return self.evaluate_state(state)
-
-        valid_cards = self._rule.get_valid_cards_from_state(state)
-        if maximizing_player:
-            max_eval = float('-inf')
-            for card in np.flatnonzero(valid_cards):
-                new_state = state.clone()
-                new_state.play_card(card)
-                eval_score = self.minimax(new_state, depth - 1, False, alpha, beta)
-                max_eval = max(max_eval, eval_score)
+        self._nr_nodes += 1
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+
+        state = self._sim.state
+        if depth == 0 or state.nr_played_cards == 36:
+            return self.evaluate_state(state, own_team)
+
+        # Werte der Tabelle sind relativ zur Bewertung der Position
+        base = self.evaluate_state(state, own_team)
+        table = self._tables[own_team]
+        key = self._sim.zobrist_key
+        entry = table.lookup(key)
+        best_card = -1
+        if entry is not None:
+            best_card = entry.best_move
+            if entry.depth >= depth:
+                if entry.lower + base >= beta:
+                    return entry.lower + base
+                if entry.upper + base <= alpha:
+                    return entry.upper + base
+                alpha = max(alpha, entry.lower + base)
+                beta = min(beta, entry.upper + base)
+        alpha_start, beta_start = alpha, beta
+
+        valid_cards = [int(card) for card in np.flatnonzero(self._rule.get_valid_cards_from_state(state))]
+        if best_card in valid_cards:
+            # bester Zug aus der Tabelle zuerst
+            valid_cards.remove(best_card)
+            valid_cards.insert(0, best_card)
+
+        maximize = team[state.player] == own_team
+        best_eval = float('-inf') if maximize else float('inf')
+        for card in valid_cards:
+            self._sim.action_play_card(card)
+            eval_score = self.minimax(depth - 1, own_team, alpha, beta)
+            self._sim.undo_play_card()
+            if maximize:
+                if eval_score > best_eval:
+                    best_eval, best_card = eval_score, card
                 alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break  # Beta-Abschneidung
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for card in np.flatnonzero(valid_cards):
-                new_state = state.clone()
-                new_state.play_card(card)
-                eval_score = self.minimax(new_state, depth - 1, True, alpha, beta)
-                min_eval = min(min_eval, eval_score)
+            else:
+                if eval_score < best_eval:
+                    best_eval, best_card = eval_score, card
                 beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break  # Alpha-Abschneidung
-            return min_eval
+            if beta <= alpha:
+                break  # Abschneidung
+
+        if best_eval <= alpha_start:
+            table.store(key, depth, float('-inf'), best_eval - base, best_card)
+        elif best_eval >= beta_start:
+            table.store(key, depth, best_eval - base, float('inf'), best_card)
+        else:
+            table.store(key, depth, best_eval - base, best_eval - base, best_card)
+        return best_eval
 
-    def evaluate_state(self, state: GameState) -> int:
+    def evaluate_state(self, state: GameState, own_team: int = 0) -> int:
         """
         Bewertungsfunktion für den aktuellen GameState.
         """
-        return state.points[0] - state.points[1]  # Beispielhafte Bewertung: Punktdifferenz
+        return state.points[own_team] - state.points[1 - own_team]  # Beispielhafte Bewertung: Punktdifferenz
@@ -2,8 +2,11 @@
 #
 # Created by Thomas Koller on 27.07.20
 #
+import asyncio
 import logging
+import multiprocessing
 import sys
+import time
 from datetime import datetime
 from typing import List, Union
 
@@ -16,7 +19,10 @@ from jass.arena.dealing_card_strategy import DealingCardStrategy
 from jass.game.const import NORTH, EAST, SOUTH, WEST, DIAMONDS, MAX_TRUMP, PUSH, next_player
 from jass.game.game_observation import GameObservation
 from jass.game.game_sim import GameSim
+from jass.game.game_state import GameState
+from jass.game.instrumentation import Instrumentation
 from jass.game.rule_schieber import RuleSchieber
+from jass.logs.game_archive import GameArchiveWriter
 from jass.logs.game_log_entry import GameLogEntry
 from jass.logs.log_entry_file_generator import LogEntryFileGenerator
 
@@ -30,6 +36,9 @@ class Arena:
     The class uses some strategy and template methods patterns. Currently, this is only done for dealing cards.
 
     """
+    # formats to save the games
+    SAVE_FORMAT_JSON = 'json'
+    SAVE_FORMAT_ARCHIVE = 'archive'
 
     def __init__(self,
                  nr_games_to_play: int,
@@ -37,23 +46,38 @@ class Arena:
                  print_every_x_games: int = 5,
                  check_move_validity=True,
                  save_filename=None,
-                 cheating_mode=False):
+                 cheating_mode=False,
+                 reuse_observation=False,
+                 save_format=SAVE_FORMAT_JSON,
+                 instrumentation: Instrumentation = None):
         """
 
         Args:
             nr_games_to_play: number of games in the arena
             dealing_card_strategy: strategy for dealing cards
-            print_every_x_games: print results every x games
+            print_every_x_games: print results every x games, or 0 to not print any progress
             check_move_validity: True if moves from the agents should be checked for validity
             save_filename: True if results should be save
             cheating_mode: True if agents will receive the full game state
+            reuse_observation: True if the same observation object should be filled for every move instead of
+                creating a new one, the agents must then not keep references to the observations
+            save_format: SAVE_FORMAT_JSON to save the games as json log files, SAVE_FORMAT_ARCHIVE to save them to a
+                binary game archive (see GameArchiveWriter)
+            instrumentation: if given, the time of the phases of the games (decisions of the agents, observations,
+                validity checks, state updates, saving and json encoding) is recorded in it, see Instrumentation
         """
         self._cheating_mode = cheating_mode
+        self._reuse_observation = reuse_observation
         self._logger = logging.getLogger(__name__)
 
         self._nr_games_played = 0
         self._nr_games_to_play = nr_games_to_play
 
+        # number of the first game and total number of games, used for dealing when the games of an arena are split
+        # into several arenas
+        self._first_game_nr = 0
+        self._total_nr_games = nr_games_to_play
+
         # the strategies
         if dealing_card_strategy is None:
             self._dealing_card_strategy = DealingCardRandomStrategy()
@@ -78,15 +102,36 @@ class Arena:
         self._check_moves_validity = check_move_validity
 
         # Save file if enabled
+        self._save_filename = save_filename
+        self._save_format = save_format
         if save_filename is not None:
             self._save_games = True
-            self._file_generator = LogEntryFileGenerator(basename=save_filename, max_entries=100000, shuffle=False)
+            if save_format == Arena.SAVE_FORMAT_ARCHIVE:
+                self._file_generator = GameArchiveWriter(basename=save_filename)
+            else:
+                self._file_generator = LogEntryFileGenerator(basename=save_filename, max_entries=100000,
+                                                             shuffle=False)
         else:
             self._save_games = False
 
+        # the methods of the arena and the game are replaced by timed versions, if instrumentation is enabled
+        self._instrumentation = instrumentation
+        if instrumentation is not None:
+            self._game.instrument(instrumentation)
+            instrumentation.instrument(self, 'play_game', 'game')
+            instrumentation.instrument(self, '_agent_action_trump', 'trump_decision')
+            instrumentation.instrument(self, '_agent_action_play_card', 'card_decision')
+            instrumentation.instrument(self, '_check_trump_action', 'validity_check')
+            instrumentation.instrument(self, '_check_card_action', 'validity_check')
+            instrumentation.instrument(self, 'save_game', 'save_game')
+            instrumentation.instrument(self, '_encode_game', 'json_encoding')
+
         # if cheating mode agents observation corresponds to the full game state
         if self._cheating_mode:
             self.get_agent_observation = lambda: self._game.state
+        elif reuse_observation:
+            self._obs = GameObservation()
+            self.get_agent_observation = lambda: self._game.get_observation(self._obs)
         else:
             self.get_agent_observation = self._game.get_observation
 
@@ -94,6 +139,10 @@ class Arena:
     def nr_games_to_play(self):
         return self._nr_games_to_play
 
+    @property
+    def instrumentation(self) -> Instrumentation or None:
+        return self._instrumentation
+
         # We define properties for the individual players to set/get them easily by name
 
     @property
@@ -190,33 +239,27 @@ class Arena:
         """
         # init game
         self._game.init_from_cards(dealer=dealer, hands=self._dealing_card_strategy.deal_cards(
-            game_nr=self._nr_games_played,
-            total_nr_games=self._nr_games_to_play))
+            game_nr=self._first_game_nr + self._nr_games_played,
+            total_nr_games=self._total_nr_games))
 
         # determine trump
         # ask first player
 
-        trump_action = self._players[self._game.state.player].action_trump(self.get_agent_observation())
-        if trump_action < DIAMONDS or (trump_action > MAX_TRUMP and trump_action != PUSH):
-            self._logger.error('Illegal trump (' + str(trump_action) + ') selected')
-            raise RuntimeError('Illegal trump (' + str(trump_action) + ') selected')
+        trump_action = self._agent_action_trump(self.get_agent_observation())
+        self._check_trump_action(trump_action, push_allowed=True)
         self._game.action_trump(trump_action)
         if trump_action == PUSH:
             # ask second player
-            trump_action = self._players[self._game.state.player].action_trump(self.get_agent_observation())
-            if trump_action < DIAMONDS or trump_action > MAX_TRUMP:
-                self._logger.error('Illegal trump (' + str(trump_action) + ') selected')
-                raise RuntimeError('Illegal trump (' + str(trump_action) + ') selected')
+            trump_action = self._agent_action_trump(self.get_agent_observation())
+            self._check_trump_action(trump_action, push_allowed=False)
             self._game.action_trump(trump_action)
 
         # play cards
         for cards in range(36):
             obs = self.get_agent_observation()
-            card_action = self._players[self._game.state.player].action_play_card(obs)
+            card_action = self._agent_action_play_card(obs)
             if self._check_moves_validity:
-                assert card_action in np.flatnonzero(self._game.rule.get_valid_actions_from_state(obs)) \
-                    if self._cheating_mode else \
-                    card_action in np.flatnonzero(self._game.rule.get_valid_cards_from_obs(obs)), 'Invalid card played!'
+                self._check_card_action(obs, card_action)
             self._game.action_play_card(card_action)
 
         # update results
@@ -226,15 +269,38 @@ class Arena:
 
         self._nr_games_played += 1
 
-    def save_game(self):
+    def _agent_action_trump(self, obs: GameObservation or GameState) -> int:
+        return self._players[self._game.state.player].action_trump(obs)
+
+    def _agent_action_play_card(self, obs: GameObservation or GameState) -> int:
+        return self._players[self._game.state.player].action_play_card(obs)
+
+    def _check_trump_action(self, trump_action: int, push_allowed: bool) -> None:
+        if trump_action < DIAMONDS or (trump_action > MAX_TRUMP and not (push_allowed and trump_action == PUSH)):
+            self._logger.error('Illegal trump (' + str(trump_action) + ') selected')
+            raise RuntimeError('Illegal trump (' + str(trump_action) + ') selected')
+
+    def _check_card_action(self, obs: GameObservation or GameState, card_action: int) -> None:
+        assert card_action in np.flatnonzero(self._game.rule.get_valid_actions_from_state(obs)) \
+            if self._cheating_mode else \
+            card_action in np.flatnonzero(self._game.rule.get_valid_cards_from_obs(obs)), 'Invalid card played!'
+
+    def save_game(self, state: GameState = None):
         """
         Save the current game if enabled.
-        Returns:
-
+        Args:
+            state: the state of the game to save, the current game if None
         """
         if self._save_games:
-            entry = GameLogEntry(game=self._game.state, date=datetime.now(), player_ids=self._player_ids)
-            self._file_generator.add_entry(entry.to_json())
+            entry = GameLogEntry(game=state if state is not None else self._game.state, date=datetime.now(),
+                                 player_ids=self._player_ids)
+            if self._save_format == Arena.SAVE_FORMAT_ARCHIVE:
+                self._file_generator.add_entry(entry)
+            else:
+                self._file_generator.add_entry(self._encode_game(entry))
+
+    def _encode_game(self, entry: GameLogEntry) -> str:
+        return entry.to_json()
 
     def play_all_games(self):
         """
@@ -242,17 +308,234 @@ class Arena:
         """
         if self._save_games:
             self._file_generator.__enter__()
-        dealer = NORTH
+        # the dealer rotates with each game, starting with NORTH for the first game
+        dealer = (NORTH - self._first_game_nr) % 4
         for game_id in range(self._nr_games_to_play):
             self.play_game(dealer=dealer)
-            if self.nr_games_played % self._print_every_x_games == 0:
-                points_to_write = int(self.nr_games_played / self._nr_games_to_play * 40)
-                spaces_to_write = 40 - points_to_write
-                sys.stdout.write("\r[{}{}] {:4}/{:4} games played".format('.' * points_to_write,
-                                                                          ' ' * spaces_to_write,
-                                                                          self.nr_games_played,
-                                                                          self._nr_games_to_play))
+            if self._print_every_x_games > 0 and self.nr_games_played % self._print_every_x_games == 0:
+                self._print_progress(self.nr_games_played)
             dealer = next_player[dealer]
         if self._save_games:
             self._file_generator.__exit__(None, None, None)
-        sys.stdout.write('\n')
+        if self._print_every_x_games > 0:
+            sys.stdout.write('\n')
+        self._log_instrumentation()
+
+    def play_all_games_parallel(self, nr_workers: int = None, seed: int = None) -> None:
+        """
+        Play the number of games distributed over a pool of processes. The games are split into consecutive shards
+        that are played by separate arenas in the worker processes, and the points are merged in the order of the
+        games.
+
+        If a seed is given, the cards are dealt by a DealingCardRandomStrategy with that seed, which deals the
+        cards depending only on the seed and the number of the game. Playing again with the same seed then gives the
+        same results independent of the number of workers (as long as the agents are deterministic). Otherwise a
+        seed is drawn at random: it is used in the same way if the arena deals the cards randomly without a seed,
+        other dealing strategies of the arena are copied to the workers. The forked workers would otherwise all
+        inherit the same state of the global random generator and deal the same cards in each shard, so the global
+        random generator of each worker is also seeded with the seed and the number of its first game.
+
+        The players and the dealing strategy must be picklable. If games are saved, each worker writes its own files,
+        with the shard number added to the base filename.
+
+        Args:
+            nr_workers: number of worker processes, defaults to the number of cpus
+            seed: seed for dealing the cards
+        """
+        if nr_workers is None:
+            nr_workers = multiprocessing.cpu_count()
+        nr_workers = max(1, min(nr_workers, self._nr_games_to_play))
+
+        if seed is not None:
+            dealing_card_strategy = DealingCardRandomStrategy(seed=seed)
+        else:
+            seed = int(np.random.SeedSequence().entropy % 2 ** 32)
+            if isinstance(self._dealing_card_strategy, DealingCardRandomStrategy) and \
+                    self._dealing_card_strategy.seed is None:
+                dealing_card_strategy = DealingCardRandomStrategy(seed=seed)
+            else:
+                dealing_card_strategy = self._dealing_card_strategy
+
+        # consecutive shards of (almost) the same size
+        shard_bounds = np.linspace(0, self._nr_games_to_play, nr_workers + 1).astype(int)
+        shards = []
+        for shard_nr in range(nr_workers):
+            if self._save_filename is not None:
+                save_filename = '{}_{:02d}_'.format(self._save_filename, shard_nr)
+            else:
+                save_filename = None
+            shards.append(dict(first_game_nr=self._first_game_nr + int(shard_bounds[shard_nr]),
+                               nr_games=int(shard_bounds[shard_nr + 1] - shard_bounds[shard_nr]),
+                               total_nr_games=self._total_nr_games,
+                               dealing_card_strategy=dealing_card_strategy,
+                               check_move_validity=self._check_moves_validity,
+                               save_filename=save_filename,
+                               cheating_mode=self._cheating_mode,
+                               reuse_observation=self._reuse_observation,
+                               save_format=self._save_format,
+                               players=self._players,
+                               player_ids=self._player_ids,
+                               instrumentation=self._instrumentation is not None,
+                               seed=seed))
+
+        with multiprocessing.Pool(processes=nr_workers) as pool:
+            for shard_nr, (points_team_0, points_team_1, instrumentation) in \
+                    enumerate(pool.imap(_play_shard, shards)):
+                if instrumentation is not None:
+                    self._instrumentation.merge(instrumentation)
+                start = shard_bounds[shard_nr]
+                end = shard_bounds[shard_nr + 1]
+                self._points_team_0[start:end] = points_team_0
+                self._points_team_1[start:end] = points_team_1
+                self._nr_games_played = int(end)
+                if self._print_every_x_games > 0:
+                    self._print_progress(self._nr_games_played)
+        if self._print_every_x_games > 0:
+            sys.stdout.write('\n')
+        self._log_instrumentation()
+
+    def play_all_games_async(self, max_games_in_flight: int = 100) -> None:
+        """
+        Play the number of games with many games in flight at the same time, each game as an asyncio coroutine.
+        Agents that provide coroutines action_trump_async and action_play_card_async (like AgentByNetworkAsync)
+        are awaited, so that other games can advance while a game waits for a remote decision. The other agents are
+        called directly.
+
+        The cards are dealt and the points stored by the number of the game as in play_all_games, so the results
+        are the same (for deterministic agents), but the games are saved in the order they are finished.
+
+        With instrumentation, the times of the games and of the awaited decisions are wall-clock times, so they
+        include the time other games run while a game waits and the times of the games in flight overlap.
+
+        Args:
+            max_games_in_flight: maximal number of games that are played at the same time
+        """
+        if self._save_games:
+            self._file_generator.__enter__()
+        asyncio.run(self._play_games_async(max_games_in_flight))
+        if self._save_games:
+            self._file_generator.__exit__(None, None, None)
+        if self._print_every_x_games > 0:
+            sys.stdout.write('\n')
+        self._log_instrumentation()
+
+    async def _play_games_async(self, max_games_in_flight: int) -> None:
+        next_game = 0
+
+        async def play_games():
+            nonlocal next_game
+            game = GameSim(rule=self._game.rule)
+            if self._instrumentation is not None:
+                game.instrument(self._instrumentation)
+            obs = GameObservation() if self._reuse_observation else None
+            while next_game < self._nr_games_to_play:
+                game_nr = next_game
+                next_game += 1
+                start = time.perf_counter()
+                await self._play_game_async(game, game_nr, obs)
+                if self._instrumentation is not None:
+                    self._instrumentation.record('game', time.perf_counter() - start)
+                self._nr_games_played += 1
+                if self._print_every_x_games > 0 and self._nr_games_played % self._print_every_x_games == 0:
+                    self._print_progress(self._nr_games_played)
+
+        nr_tasks = max(1, min(max_games_in_flight, self._nr_games_to_play))
+        await asyncio.gather(*[play_games() for _ in range(nr_tasks)])
+
+    async def _play_game_async(self, game: GameSim, game_nr: int, obs: GameObservation or None) -> None:
+        """
+        Play a complete game as coroutine.
+        Args:
+            game: the game simulation to use
+            game_nr: number of the game in this arena
+            obs: observation to fill for each move, or None to create new observations
+        """
+        global_game_nr = self._first_game_nr + game_nr
+        game.init_from_cards(dealer=(NORTH - global_game_nr) % 4,
+                             hands=self._dealing_card_strategy.deal_cards(game_nr=global_game_nr,
+                                                                          total_nr_games=self._total_nr_games))
+
+        def get_agent_observation():
+            return game.state if self._cheating_mode else game.get_observation(obs)
+
+        instrumentation = self._instrumentation
+        trump_action = await _call_agent(self._players[game.state.player], 'action_trump', get_agent_observation(),
+                                         instrumentation, 'trump_decision')
+        self._check_trump_action(trump_action, push_allowed=True)
+        game.action_trump(trump_action)
+        if trump_action == PUSH:
+            trump_action = await _call_agent(self._players[game.state.player], 'action_trump',
+                                             get_agent_observation(), instrumentation, 'trump_decision')
+            self._check_trump_action(trump_action, push_allowed=False)
+            game.action_trump(trump_action)
+
+        for cards in range(36):
+            agent_obs = get_agent_observation()
+            card_action = await _call_agent(self._players[game.state.player], 'action_play_card', agent_obs,
+                                            instrumentation, 'card_decision')
+            if self._check_moves_validity:
+                self._check_card_action(agent_obs, card_action)
+            game.action_play_card(card_action)
+
+        self._points_team_0[game_nr] = game.state.points[0]
+        self._points_team_1[game_nr] = game.state.points[1]
+        self.save_game(game.state)
+
+    def _log_instrumentation(self) -> None:
+        if self._instrumentation is not None:
+            self._logger.info('Instrumentation:\n{}'.format(self._instrumentation.summary()))
+
+    def _print_progress(self, nr_games_played: int) -> None:
+        points_to_write = int(nr_games_played / self._nr_games_to_play * 40)
+        spaces_to_write = 40 - points_to_write
+        sys.stdout.write("\r[{}{}] {:4}/{:4} games played".format('.' * points_to_write,
+                                                                  ' ' * spaces_to_write,
+                                                                  nr_games_played,
+                                                                  self._nr_games_to_play))
+
+
+async def _call_agent(agent: Agent or AgentCheating, action: str, obs: GameObservation or GameState,
+                      instrumentation: Instrumentation = None, phase: str = None) -> int:
+    """
+    Call an action of an agent, awaiting its coroutine version (with the suffix _async) if it exists. If
+    instrumentation is given, the time until the action is returned is recorded in the phase.
+    """
+    start = time.perf_counter()
+    try:
+        action_async = getattr(agent, action + '_async', None)
+        if action_async is not None:
+            return await action_async(obs)
+        return getattr(agent, action)(obs)
+    finally:
+        if instrumentation is not None:
+            instrumentation.record(phase, time.perf_counter() - start)
+
+
+def _play_shard(shard: dict) -> (np.ndarray, np.ndarray, Instrumentation or None):
+    """
+    Play the games of one shard of Arena.play_all_games_parallel in a separate arena (in a worker process).
+
+    Args:
+        shard: the parameters of the shard
+    Returns:
+        the points of both teams for the games of the shard and the instrumentation, if enabled
+    """
+    # the forked workers inherit the same state of the global random generator
+    np.random.seed([shard['seed'], shard['first_game_nr']])
+    arena = Arena(nr_games_to_play=shard['nr_games'],
+                  dealing_card_strategy=shard['dealing_card_strategy'],
+                  print_every_x_games=0,
+                  check_move_validity=shard['check_move_validity'],
+                  save_filename=shard['save_filename'],
+                  cheating_mode=shard['cheating_mode'],
+                  reuse_observation=shard['reuse_observation'],
+                  save_format=shard['save_format'],
+                  instrumentation=Instrumentation() if shard['instrumentation'] else None)
+    arena._first_game_nr = shard['first_game_nr']
+    arena._total_nr_games = shard['total_nr_games']
+    players = shard['players']
+    player_ids = shard['player_ids']
+    arena.set_players(players[NORTH], players[EAST], players[SOUTH], players[WEST],
+                      player_ids[NORTH], player_ids[EAST], player_ids[SOUTH], player_ids[WEST])
+    arena.play_all_games()
+    return arena.points_team_0, arena.points_team_1, arena.instrumentation
@@ -11,6 +11,19 @@ from jass.game.game_util import deal_random_hand
 class DealingCardRandomStrategy(DealingCardStrategy):
     """
     Deal cards randomly. This is the default implementation.
+
+    If a seed is given, the cards of each game are determined by the seed and the game number only, so the same games
+    are dealt independent of the order in which they are played (for example when the games of an arena are
+    distributed over several processes).
     """
+    def __init__(self, seed: int = None):
+        self._seed = seed
+
+    @property
+    def seed(self) -> int or None:
+        return self._seed
+
     def deal_cards(self, game_nr: int = 0, total_nr_games: int = 0) -> np.ndarray:
-        return deal_random_hand()
+        if self._seed is None:
+            return deal_random_hand()
+        return deal_random_hand(rng=np.random.default_rng([self._seed, game_nr]))
@@ -0,0 +1,255 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+from typing import List
+
+import numpy as np
+
+from jass.game.const import next_player, partner_player, team, PUSH
+from jass.game.game_state import GameState
+from jass.game.rule_schieber import RuleSchieber
+
+# numpy versions of the player tables, so that they can be indexed by arrays
+_next_player = np.array(next_player, dtype=np.int32)
+_partner_player = np.array(partner_player, dtype=np.int32)
+
+
+class BatchGameSim:
+    """
+    Class for simulating a batch of N independent games in lock-step. The state of the games is kept in stacked
+    arrays with the same meaning as the fields in GameState, with the game as first dimension, so for example hands
+    is a [N,4,36] array and tricks a [N,9,4] array.
+
+    Each action advances all N games by one step using array operations, the results are the same as simulating
+    each game in GameSim. The rule must support the batch operations (get_valid_cards_batch, calc_winner_batch,
+    calc_points_batch), which are implemented in RuleSchieber.
+    """
+    def __init__(self, rule: RuleSchieber, nr_games: int):
+        self._rule = rule
+        self._nr_games = nr_games
+        self._idx = np.arange(nr_games)
+
+        self.dealer = np.full(nr_games, -1, dtype=np.int32)
+        self.player = np.full(nr_games, -1, dtype=np.int32)
+        self.trump = np.full(nr_games, -1, dtype=np.int32)
+        self.forehand = np.full(nr_games, -1, dtype=np.int32)
+        self.declared_trump = np.full(nr_games, -1, dtype=np.int32)
+        self.hands = np.zeros([nr_games, 4, 36], dtype=np.int32)
+        self.tricks = np.full([nr_games, 9, 4], -1, dtype=np.int32)
+        self.trick_winner = np.full([nr_games, 9], -1, dtype=np.int32)
+        self.trick_points = np.zeros([nr_games, 9], dtype=np.int32)
+        self.trick_first_player = np.full([nr_games, 9], -1, dtype=np.int32)
+        self.nr_tricks = np.zeros(nr_games, dtype=np.int32)
+        self.nr_cards_in_trick = np.zeros(nr_games, dtype=np.int32)
+        self.nr_played_cards = np.zeros(nr_games, dtype=np.int32)
+        self.points = np.zeros([nr_games, 2], dtype=np.int32)
+
+    @property
+    def rule(self):
+        return self._rule
+
+    @property
+    def nr_games(self) -> int:
+        return self._nr_games
+
+    @property
+    def current_trick(self) -> np.ndarray:
+        """
+        Returns:
+            [N,4] array of the cards in the current tricks (the last trick for finished games)
+        """
+        return self.tricks[self._idx, np.minimum(self.nr_tricks, 8), :]
+
+    def init_from_cards(self, hands: np.ndarray, dealer: np.ndarray or int) -> None:
+        """
+        Initialize the games from dealt cards.
+        Args:
+            hands: [N,4,36] array of the one-hot encoded hands of the players
+            dealer: [N] array of the dealers or a single dealer for all games
+        """
+        self.dealer[:] = dealer
+        self.player[:] = _next_player[self.dealer]
+        self.trump.fill(-1)
+        self.forehand.fill(-1)
+        self.declared_trump.fill(-1)
+        self.hands[:] = hands
+        self.tricks.fill(-1)
+        self.trick_winner.fill(-1)
+        self.trick_points.fill(0)
+        self.trick_first_player.fill(-1)
+        self.nr_tricks.fill(0)
+        self.nr_cards_in_trick.fill(0)
+        self.nr_played_cards.fill(0)
+        self.points.fill(0)
+
+    def init_from_state(self, state: GameState) -> None:
+        """
+        Initialize all games from the same state, for example to simulate different continuations of a game.
+        Args:
+            state: the state to copy into all the games
+        """
+        self.init_from_states([state] * self._nr_games)
+
+    def init_from_states(self, states: List[GameState]) -> None:
+        """
+        Initialize the games from a list of states.
+        Args:
+            states: list of N states
+        """
+        for i, state in enumerate(states):
+            self.dealer[i] = state.dealer
+            self.player[i] = state.player
+            self.trump[i] = state.trump
+            self.forehand[i] = state.forehand
+            self.declared_trump[i] = state.declared_trump
+            self.hands[i] = state.hands
+            self.tricks[i] = state.tricks
+            self.trick_winner[i] = state.trick_winner
+            self.trick_points[i] = state.trick_points
+            self.trick_first_player[i] = state.trick_first_player
+            self.nr_tricks[i] = state.nr_tricks
+            self.nr_cards_in_trick[i] = state.nr_cards_in_trick
+            self.nr_played_cards[i] = state.nr_played_cards
+            self.points[i] = state.points
+
+    def get_state(self, i: int) -> GameState:
+        """
+        Get the state of one of the games.
+        Args:
+            i: the index of the game
+        Returns:
+            GameState of the game (a copy)
+        """
+        state = GameState()
+        state.dealer = int(self.dealer[i])
+        state.player = int(self.player[i])
+        state.trump = int(self.trump[i])
+        state.forehand = int(self.forehand[i])
+        state.declared_trump = int(self.declared_trump[i])
+        state.hands[:, :] = self.hands[i]
+        state.tricks[:, :] = self.tricks[i]
+        state.trick_winner[:] = self.trick_winner[i]
+        state.trick_points[:] = self.trick_points[i]
+        state.trick_first_player[:] = self.trick_first_player[i]
+        state.nr_tricks = int(self.nr_tricks[i])
+        state.nr_cards_in_trick = int(self.nr_cards_in_trick[i])
+        state.nr_played_cards = int(self.nr_played_cards[i])
+        if state.nr_played_cards < 36:
+            state.current_trick = state.tricks[state.nr_tricks]
+        else:
+            state.current_trick = None
+        state.points[:] = self.points[i]
+        return state
+
+    def get_valid_cards_batch(self) -> np.ndarray:
+        """
+        Get the valid cards for the current player of all games.
+
+        Precondition:
+            trump has been selected in all games, and no game is finished
+
+        Returns:
+            [N,36] one-hot encoded array of the valid cards
+        """
+        return self._rule.get_valid_cards_batch(self.hands[self._idx, self.player, :],
+                                                self.current_trick,
+                                                self.nr_cards_in_trick,
+                                                self.trump)
+
+    def action_trump_batch(self, actions: np.ndarray) -> None:
+        """
+        Perform a trump action (trump or PUSH) in all the games that are in the trump selection phase. Games for which
+        the trump has already been selected are not changed, the corresponding actions are ignored.
+
+        Args:
+            actions: [N] array of the trump actions
+        """
+        actions = np.asarray(actions)
+        forehand_player = self.trump == -1
+        forehand_player &= self.forehand == -1
+        rearhand_player = (self.trump == -1) & (self.forehand == 0)
+
+        # forehand player pushed
+        push = forehand_player & (actions == PUSH)
+        self.forehand[push] = 0
+        self.player[push] = _partner_player[self.player[push]]
+
+        # forehand player declared trump, the player remains the same
+        declared = forehand_player & (actions != PUSH)
+        self.forehand[declared] = 1
+        self.trump[declared] = actions[declared]
+        self.declared_trump[declared] = self.player[declared]
+        self.trick_first_player[declared, 0] = self.player[declared]
+
+        # partner of the forehand player declared trump
+        self.trump[rearhand_player] = actions[rearhand_player]
+        self.declared_trump[rearhand_player] = self.player[rearhand_player]
+        self.player[rearhand_player] = _next_player[self.dealer[rearhand_player]]
+        self.trick_first_player[rearhand_player, 0] = self.player[rearhand_player]
+
+    def action_play_card_batch(self, cards: np.ndarray) -> None:
+        """
+        Play a card in all the games as the current player and update the states.
+
+        Preconditions:
+            self.nr_played_cards < 36 for all games
+            self.hands[i, self.player[i], cards[i]] == 1 for all games i
+            (trump selection done in all games)
+
+        Args:
+            cards: [N] array of the cards to play
+        """
+        idx = self._idx
+        cards = np.asarray(cards)
+
+        # remove cards from players and place them in the tricks
+        self.hands[idx, self.player, cards] = 0
+        self.tricks[idx, self.nr_tricks, self.nr_cards_in_trick] = cards
+        self.nr_played_cards += 1
+
+        # make sure the first player is set on the first card of a new trick
+        first_card = self.nr_cards_in_trick == 0
+        self.trick_first_player[first_card, self.nr_tricks[first_card]] = self.player[first_card]
+
+        # tricks that are not finished
+        in_trick = self.nr_cards_in_trick < 3
+        self.nr_cards_in_trick[in_trick] += 1
+        self.player[in_trick] = _next_player[self.player[in_trick]]
+
+        # finish the tricks that are complete
+        end_trick = ~in_trick
+        if end_trick.any():
+            self._end_trick_batch(np.flatnonzero(end_trick))
+
+    def is_done(self) -> bool:
+        """
+        Returns:
+            true if all the games are finished
+        """
+        return bool((self.nr_played_cards == 36).all())
+
+    def _end_trick_batch(self, games: np.ndarray) -> None:
+        """
+        End the current trick for the given games and update all the necessary fields.
+        Args:
+            games: indices of the games for which the trick is complete
+        """
+        nr_tricks = self.nr_tricks[games]
+        trumps = self.trump[games]
+        tricks = self.tricks[games, nr_tricks, :]
+
+        points = self._rule.calc_points_batch(tricks, self.nr_played_cards[games] == 36, trumps)
+        winner = self._rule.calc_winner_batch(tricks, self.trick_first_player[games, nr_tricks], trumps)
+        self.trick_points[games, nr_tricks] = points
+        self.trick_winner[games, nr_tricks] = winner
+        self.points[games, team[winner]] += points
+
+        nr_tricks += 1
+        self.nr_tricks[games] = nr_tricks
+        self.nr_cards_in_trick[games] = 0
+
+        # next player is the winner of the trick, or -1 at the end of the game
+        not_finished = nr_tricks < 9
+        self.trick_first_player[games[not_finished], nr_tricks[not_finished]] = winner[not_finished]
+        self.player[games] = np.where(not_finished, winner, -1)
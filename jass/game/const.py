@@ -301,6 +301,24 @@ lower_trump[9:18, 9:18] = lower_trump_card
 lower_trump[18:27, 18:27] = lower_trump_card
 lower_trump[27:36, 27:36] = lower_trump_card
 
+#
+# 2D array of the strength of the cards for each trump, each row is the strength of the cards for the trump indicated
+# by the row. A card with a higher strength wins against a card with a lower strength, if both are trump or of the
+# color played first. Trump cards are stronger than all other cards, so the winner of a trick is the card with the
+# highest strength among the trump cards and the cards of the first color.
+#
+strength_natural = [9, 8, 7, 6, 5, 4, 3, 2, 1]            # A K Q J 10 9 8 7 6
+strength_reverse = [1, 2, 3, 4, 5, 6, 7, 8, 9]            # for une-ufe the 6 is the highest card
+strength_trump = [16, 15, 14, 18, 13, 17, 12, 11, 10]    # J and 9 are the highest trumps
+card_strength = np.array(
+    [strength_trump + strength_natural * 3,
+     strength_natural + strength_trump + strength_natural * 2,
+     strength_natural * 2 + strength_trump + strength_natural,
+     strength_natural * 3 + strength_trump,
+     strength_natural * 4,
+     strength_reverse * 4
+     ], np.int32)
+
 # next player of player with given index
 next_player = [3, 0, 1, 2]
 
@@ -329,3 +347,55 @@ TRUMP_FULL_O = TRUMP_FULL_OFFSET + OBE_ABE
 TRUMP_FULL_U = TRUMP_FULL_OFFSET + UNE_UFE
 TRUMP_FULL_P = TRUMP_FULL_OFFSET + PUSH_ALT
 ACTION_SET_FULL_SIZE = TRUMP_FULL_P + 1
+
+#
+# Bitboard representation of card sets: a set of cards is encoded as a single (python) int, where bit i is set if
+# card i is contained in the set. Python ints are used instead of numpy scalars, as bit operations on them are
+# considerably faster for single values.
+#
+ALL_CARDS_BITS = (1 << 36) - 1
+
+# bit of each card
+card_bits = [1 << i for i in range(36)]
+
+# bitmask of the cards of each color (same as color_masks)
+color_masks_bits = [int(sum(1 << int(i) for i in np.flatnonzero(color_masks[c, :]))) for c in range(4)]
+
+# bitmask of the higher and lower trumps for each card (same as higher_trump and lower_trump)
+higher_trump_bits = [int(sum(1 << int(i) for i in np.flatnonzero(higher_trump[c, :]))) for c in range(36)]
+lower_trump_bits = [int(sum(1 << int(i) for i in np.flatnonzero(lower_trump[c, :]))) for c in range(36)]
+
+# bit of the jack for each trump color
+trump_jack_bits = [1 << int(color_offset[c] + J_offset) for c in range(4)]
+
+#
+# 5D array of the masks of the cards that are allowed to be played when the player does not play the first card
+# of a trick. The masks are indexed by [have color, trump, color played, lowest trump played], where have color is
+# 1 if the player has a card of the color played first and lowest trump played is the offset (0..8) of the lowest
+# trump played by the second or third player, if the color played first is not trump, or 9 otherwise. Like in
+# RuleSchieber.get_valid_cards, the lowest trump is the one with the highest index.
+#
+# The valid cards are the cards of the hand in the mask, except in two cases, in which any card of the hand can be
+# played:
+#   - trump was played first and the only trump of the player is the trump jack
+#   - a trump was played by the second or third player, and the player has only trump left
+#
+NO_TRUMP_PLAYED = 9
+allowed_masks = np.ones([2, MAX_TRUMP + 1, 4, NO_TRUMP_PLAYED + 1, 36], np.int32)
+for _trump in range(MAX_TRUMP + 1):
+    for _color in range(4):
+        # without the color, any card can be played, unless it is lower than the trump played
+        allowed_masks[1, _trump, _color, :, :] = color_masks[_color, :]
+        if _trump < 4 and _color != _trump:
+            # must give the color or any trump, if nobody played trump yet, or a higher trump
+            allowed_masks[1, _trump, _color, NO_TRUMP_PLAYED, :] += color_masks[_trump, :]
+            for _offset in range(9):
+                allowed_masks[1, _trump, _color, _offset, :] += higher_trump[_trump * 9 + _offset, :]
+                allowed_masks[0, _trump, _color, _offset, :] -= lower_trump[_trump * 9 + _offset, :]
+
+# same as bitboards, as nested lists
+allowed_masks_bits = [[[[int(sum(1 << int(i) for i in np.flatnonzero(allowed_masks[h, t, c, o, :])))
+                         for o in range(NO_TRUMP_PLAYED + 1)]
+                        for c in range(4)]
+                       for t in range(MAX_TRUMP + 1)]
+                      for h in range(2)]
@@ -0,0 +1,477 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+"""
+Horizon limited double dummy search for the card play of Schieber: the value of a position, when all the hands are
+known and both teams play perfectly, searched up to a number of tricks ahead.
+
+The search is an alpha-beta search on the bitboard representation of the hands (RuleSchieberBits) that plays and
+takes back the cards on a small mutable state instead of copying game states. It uses
+- a transposition table at the start of the tricks: the value of the remaining game only depends on the cards still
+  held by each player and the player to lead, so the table is keyed by the four hands and the leader, and it stores
+  a lower and upper bound of the value and the best card to lead
+- move ordering: the best card of the transposition table first, high cards when leading, winning cards first or
+  points on the trick of the partner when following
+- equivalent cards: cards of a color held by the same player, with no card of another player (or of the current
+  trick) between them and with the same points, lead to the same value, so only one of them is searched
+- bounds from the points still to be won
+- null window searches: the value is found by a binary search on the points
+
+Values are the points won by a team from the start of the current trick (including the cards already played in
+it) until the end of the game, including the 5 points for the last trick.
+
+The value is exact (the double dummy value) only if all the remaining tricks are searched, i.e. if max_tricks is
+not set or at least the number of tricks left. This is only practical in the endgame: the number of positions grows
+by about a factor of 10 with each additional trick, in python the last 5 tricks are searched in about 0.1 seconds,
+the last 7 tricks in seconds and the last 8 tricks in about a minute, and a full deal does not finish in 15 minutes.
+Earlier in the game, the search must be limited to the next tricks (max_tricks). The points of the later tricks are
+then split evenly between the teams, so the value is only a heuristic estimate.
+"""
+from typing import Dict, List
+
+from jass.game.const import card_strength, card_values, color_of_card, color_masks_bits, card_bits, team
+from jass.game.game_state import GameState
+from jass.game.game_util import convert_one_hot_encoded_cards_to_bits
+from jass.game.rule_schieber_bits import RuleSchieberBits
+
+_color_of_card = color_of_card.tolist()
+_card_values = card_values.tolist()
+_team = team.tolist()
+
+# effective strength of the cards for each trump and color played first: trumps are stronger than the cards of the
+# color played first, which are stronger than all other cards (strength 0), so the highest value wins the trick
+_effective_strength = [[[(card_strength[trump, card] + 100 if _color_of_card[card] == trump else
+                          card_strength[trump, card] if _color_of_card[card] == lead_color else 0)
+                         for card in range(36)]
+                        for lead_color in range(4)]
+                       for trump in range(6)]
+
+# cards of each color ordered from the strongest to the weakest for each trump
+_cards_by_strength = [[sorted((card for card in range(36) if _color_of_card[card] == color),
+                              key=lambda card: -card_strength[trump, card])
+                       for color in range(4)]
+                      for trump in range(6)]
+
+# order of the cards when leading a trick, strong cards (and trumps) first
+_lead_order = [[card_strength[trump, card] + (100 if _color_of_card[card] == trump else 0) for card in range(36)]
+               for trump in range(6)]
+
+
+class DoubleDummySearch:
+    """
+    Search for positions with all hands known, exact if all remaining tricks are searched (see the module). The
+    transposition table is kept between calls (the values do not depend on the history of the game), so the same
+    search should be used for the positions of the same game.
+    """
+
+    def __init__(self, max_entries: int = 2000000):
+        """
+        Args:
+            max_entries: maximal number of entries of the transposition table, the table is cleared when it is full
+        """
+        self.max_entries = max_entries
+        self.nr_nodes = 0
+        self._rule = RuleSchieberBits()
+        self._tables = {}
+
+        # state of the current search
+        self._trump = -1
+        self._values = None
+        self._effective = None
+        self._tt = None
+        self._hands = [0, 0, 0, 0]
+        self._trick = [-1, -1, -1, -1]
+        self._trick_bits = 0
+        self._remaining_points = 0
+        self._max_tricks = None
+        self._depth = 0
+
+    def solve(self, state: GameState, max_tricks: int = None) -> int:
+        """
+        Calculate the value of the position for the team of the player to play, exact if max_tricks is not set.
+
+        Args:
+            state: the game state, trump must be selected and the game not finished
+            max_tricks: if set, only the next max_tricks tricks (including the current one) are searched, and the
+                points of the later tricks are split evenly between the teams
+
+        Returns:
+            the points the team of the player to play wins from the start of the current trick until the end
+        """
+        self._setup(state, max_tricks)
+        move_nr, leader, win_player, win_eff, effective_row, trick_points, total = self._current_trick(state)
+        maximize = _team[state.player] == 0
+
+        def search(alpha: int, beta: int) -> int:
+            if move_nr == 0:
+                return self._search_trick(leader, alpha, beta)
+            return self._search_card(move_nr, leader, win_player, win_eff, effective_row, trick_points, alpha, beta)
+
+        value = self._binary_search(search, total)
+        return value if maximize else total - value
+
+    def best_card(self, state: GameState, max_tricks: int = None) -> int:
+        """
+        Find a best card in the position, which is faster than calculating the values of all cards.
+
+        Args:
+            state: the game state, trump must be selected and the game not finished
+            max_tricks: if set, only the next max_tricks tricks are searched (see solve)
+
+        Returns:
+            a card with the highest value for the team of the player to play
+        """
+        value = self.solve(state, max_tricks)
+        move_nr, leader, win_player, win_eff, effective_row, trick_points, total = self._current_trick(state)
+        if _team[state.player] == 1:
+            value = total - value
+        valid = self._rule.get_valid_cards(self._hands[state.player], self._trick, move_nr, self._trump)
+        for card in self._moves(valid):
+            # test if the card reaches the value of the position (mostly answered from the transposition table)
+            if _team[state.player] == 0:
+                if self._child(card, move_nr, leader, win_player, win_eff, effective_row, trick_points,
+                               value - 1, value) >= value:
+                    return card
+            elif self._child(card, move_nr, leader, win_player, win_eff, effective_row, trick_points,
+                             value, value + 1) <= value:
+                return card
+        raise RuntimeError('No card reaches the value of the position')
+
+    def solve_moves(self, state: GameState, max_tricks: int = None) -> Dict[int, int]:
+        """
+        Calculate the value of every valid card in the position for the team of the player to play.
+
+        Args:
+            state: the game state, trump must be selected and the game not finished
+            max_tricks: if set, only the next max_tricks tricks are searched (see solve)
+
+        Returns:
+            the points the team of the player to play wins (from the start of the current trick until the end) if
+            the card is played, by the valid cards
+        """
+        self._setup(state, max_tricks)
+        move_nr, leader, win_player, win_eff, effective_row, trick_points, total = self._current_trick(state)
+        player = int(state.player)
+
+        valid = self._rule.get_valid_cards(self._hands[player], self._trick, move_nr, self._trump)
+        values = {}
+        representatives = self._moves(valid)
+        for card in representatives:
+            value = self._binary_search(
+                lambda alpha, beta: self._child(card, move_nr, leader, win_player, win_eff, effective_row,
+                                                trick_points, alpha, beta), total)
+            values[card] = value if _team[player] == 0 else total - value
+
+        # equivalent cards have the value of the card representing them
+        for card in self._cards(valid):
+            if card not in values:
+                values[card] = values[self._representative(card, valid, representatives)]
+        return values
+
+    @staticmethod
+    def _binary_search(search, total: int) -> int:
+        """
+        Find the value of a search by a binary search with null window searches, which cut off much more than
+        a search with the full window, the bounds of the searches are reused from the transposition table.
+
+        Args:
+            search: function to search with the window alpha, beta
+            total: the maximal value
+        Returns:
+            the value (points of team 0)
+        """
+        lower, upper = 0, total
+        while lower < upper:
+            test = (lower + upper + 1) // 2
+            value = search(test - 1, test)
+            if value >= test:
+                lower = value
+            else:
+                upper = value
+        return lower
+
+    def _current_trick(self, state: GameState):
+        """
+        Get the move number, leader, the winner so far, the points so far of the current trick and the points
+        from the current trick to the end of the game.
+        """
+        move_nr = state.nr_cards_in_trick
+        leader = int(state.trick_first_player[state.nr_tricks])
+        win_player, win_eff, effective_row = -1, -1, None
+        trick_points = 0
+        if move_nr > 0:
+            effective_row = self._effective[_color_of_card[self._trick[0]]]
+            for i in range(move_nr):
+                card = self._trick[i]
+                trick_points += self._values[card]
+                if effective_row[card] > win_eff:
+                    win_player, win_eff = (leader - i) % 4, effective_row[card]
+        total = self._remaining_points + trick_points + 5
+        return move_nr, leader, win_player, win_eff, effective_row, trick_points, total
+
+    def _setup(self, state: GameState, max_tricks: int = None) -> None:
+        if state.trump < 0 or state.nr_played_cards >= 36:
+            raise ValueError('Position can not be solved, trump must be selected and the game not finished')
+        if max_tricks is not None and max_tricks < 1:
+            raise ValueError('At least one trick must be searched')
+        self._trump = int(state.trump)
+        self._values = _card_values[self._trump]
+        self._effective = _effective_strength[self._trump]
+        # the values of the searches with a limited number of tricks are stored separately
+        self._tt = self._tables.setdefault((self._trump, max_tricks is not None), {})
+        self._max_tricks = max_tricks
+        self._depth = 0
+        if sum(len(table) for table in self._tables.values()) > self.max_entries:
+            for table in self._tables.values():
+                table.clear()
+        self._hands = [convert_one_hot_encoded_cards_to_bits(state.hands[p]) for p in range(4)]
+        self._trick = [int(card) for card in state.current_trick]
+        self._trick_bits = 0
+        for card in self._trick:
+            if card >= 0:
+                self._trick_bits |= card_bits[card]
+        self._remaining_points = sum(self._values[card] for card in range(36)
+                                     if (self._hands[0] | self._hands[1] | self._hands[2] | self._hands[3]) &
+                                     card_bits[card])
+        self.nr_nodes = 0
+
+    @staticmethod
+    def _cards(cards: int) -> List[int]:
+        result = []
+        while cards:
+            lowest = cards & -cards
+            result.append(lowest.bit_length() - 1)
+            cards ^= lowest
+        return result
+
+    def _moves(self, valid: int) -> List[int]:
+        """
+        Get one card of each set of equivalent valid cards.
+        """
+        if not valid & (valid - 1):
+            return [valid.bit_length() - 1]
+        hands = self._hands
+        alive = hands[0] | hands[1] | hands[2] | hands[3] | self._trick_bits
+        values = self._values
+        cards_by_strength = _cards_by_strength[self._trump]
+        moves = []
+        for color in range(4):
+            color_valid = valid & color_masks_bits[color]
+            if not color_valid:
+                continue
+            if not color_valid & (color_valid - 1):
+                moves.append(color_valid.bit_length() - 1)
+                continue
+            previous = -1
+            for card in cards_by_strength[color]:
+                bit = card_bits[card]
+                if color_valid & bit:
+                    if previous < 0 or values[previous] != values[card]:
+                        moves.append(card)
+                    previous = card
+                    color_valid ^= bit
+                    if not color_valid:
+                        break
+                elif alive & bit:
+                    # a card of another player (or not valid) separates the cards
+                    previous = -1
+        return moves
+
+    def _representative(self, card: int, valid: int, representatives: List[int]) -> int:
+        """
+        Get the representative card (as selected by _moves) of an equivalent card.
+        """
+        alive = self._hands[0] | self._hands[1] | self._hands[2] | self._hands[3] | self._trick_bits
+        representative = -1
+        for other in _cards_by_strength[self._trump][_color_of_card[card]]:
+            if not alive & card_bits[other]:
+                continue
+            if not valid & card_bits[other]:
+                representative = -1
+            elif other in representatives:
+                representative = other
+            if other == card:
+                return representative
+        return representative
+
+    def _search_trick(self, leader: int, alpha: int, beta: int) -> int:
+        """
+        Search the position at the start of a trick.
+
+        Returns:
+            the points of team 0 from this trick until the end
+        """
+        hands = self._hands
+        if not hands[leader]:
+            return 0
+
+        # bounds from the points that are left
+        upper = self._remaining_points + 5
+        if upper <= alpha:
+            return upper
+        if beta <= 0:
+            return 0
+
+        if self._max_tricks is None:
+            key = (hands[0], hands[1], hands[2], hands[3], leader)
+        else:
+            tricks_left = self._max_tricks - self._depth
+            if tricks_left == 0:
+                # split the points after the searched tricks
+                return upper // 2
+            key = (hands[0], hands[1], hands[2], hands[3], leader, tricks_left)
+        entry = self._tt.get(key)
+        best_card = -1
+        if entry is not None:
+            lower, upper, best_card = entry
+            if lower >= beta:
+                return lower
+            if upper <= alpha:
+                return upper
+            if lower > alpha:
+                alpha_search = lower
+            else:
+                alpha_search = alpha
+            beta_search = upper if upper < beta else beta
+        else:
+            alpha_search, beta_search = alpha, beta
+
+        moves = self._moves(hands[leader])
+        lead_order = _lead_order[self._trump]
+        moves.sort(key=lambda card: -lead_order[card])
+        if best_card in moves:
+            moves.remove(best_card)
+            moves.insert(0, best_card)
+
+        maximize = _team[leader] == 0
+        a, b = alpha_search, beta_search
+        best = -1 if maximize else 1000
+        for card in moves:
+            value = self._child(card, 0, leader, -1, -1, None, 0, a, b)
+            if maximize:
+                if value > best:
+                    best, best_card = value, card
+                    if value > a:
+                        a = value
+            else:
+                if value < best:
+                    best, best_card = value, card
+                    if value < b:
+                        b = value
+            if a >= b:
+                break
+
+        # store the bounds from the search window, combined with the bounds of an earlier search
+        lower, upper = (entry[0], entry[1]) if entry is not None else (0, 1000)
+        if best <= alpha_search:
+            upper = min(upper, best)
+        elif best >= beta_search:
+            lower = max(lower, best)
+        else:
+            lower = upper = best
+        self._tt[key] = (lower, upper, best_card)
+        return best
+
+    def _search_card(self, move_nr: int, leader: int, win_player: int, win_eff: int, effective_row: List[int],
+                     trick_points: int, alpha: int, beta: int) -> int:
+        """
+        Search the position after move_nr cards of the trick have been played (move_nr > 0).
+
+        Returns:
+            the points of team 0 from this trick until the end
+        """
+        player = (leader - move_nr) % 4
+        valid = self._rule.get_valid_cards(self._hands[player], self._trick, move_nr, self._trump)
+        moves = self._moves(valid)
+
+        if len(moves) > 1:
+            values = self._values
+            if _team[win_player] == _team[player]:
+                # the partner wins the trick so far, give points
+                moves.sort(key=lambda card: -values[card])
+            else:
+                # win the trick with high points, otherwise give as few points as possible
+                moves.sort(key=lambda card: -values[card] if effective_row[card] > win_eff else 100 + values[card])
+
+        maximize = _team[player] == 0
+        best = -1 if maximize else 1000
+        for card in moves:
+            value = self._child(card, move_nr, leader, win_player, win_eff, effective_row, trick_points, alpha, beta)
+            if maximize:
+                if value > best:
+                    best = value
+                    if value > alpha:
+                        alpha = value
+            else:
+                if value < best:
+                    best = value
+                    if value < beta:
+                        beta = value
+            if alpha >= beta:
+                break
+        return best
+
+    def _child(self, card: int, move_nr: int, leader: int, win_player: int, win_eff: int, effective_row: List[int],
+               trick_points: int, alpha: int, beta: int) -> int:
+        """
+        Play a card, search the resulting position and take the card back.
+
+        Returns:
+            the points of team 0 from this trick until the end
+        """
+        self.nr_nodes += 1
+        hands = self._hands
+        player = (leader - move_nr) % 4
+        bit = card_bits[card]
+        card_value = self._values[card]
+        hands[player] ^= bit
+        self._trick[move_nr] = card
+        self._trick_bits ^= bit
+        self._remaining_points -= card_value
+
+        if move_nr == 0:
+            effective_row = self._effective[_color_of_card[card]]
+        if effective_row[card] > win_eff:
+            win_player, win_eff = player, effective_row[card]
+        trick_points += card_value
+
+        if move_nr == 3:
+            trick = self._trick
+            self._trick = [-1, -1, -1, -1]
+            trick_bits = self._trick_bits
+            self._trick_bits = 0
+            if not (hands[0] | hands[1] | hands[2] | hands[3]):
+                trick_points += 5
+            points_team_0 = trick_points if _team[win_player] == 0 else 0
+            self._depth += 1
+            value = points_team_0 + self._search_trick(win_player, alpha - points_team_0, beta - points_team_0)
+            self._depth -= 1
+            self._trick = trick
+            self._trick_bits = trick_bits
+        else:
+            value = self._search_card(move_nr + 1, leader, win_player, win_eff, effective_row, trick_points,
+                                      alpha, beta)
+
+        hands[player] ^= bit
+        self._trick[move_nr] = -1
+        self._trick_bits ^= bit
+        self._remaining_points += card_value
+        return value
+
+
+def solve_moves(state: GameState, search: DoubleDummySearch = None) -> Dict[int, int]:
+    """
+    Calculate the double dummy value of every valid card in the position.
+
+    Args:
+        state: the game state, trump must be selected and the game not finished
+        search: search to use (to reuse its transposition table), a new one is created if None
+
+    Returns:
+        the points the team of the player to play wins from the start of the current trick until the end of the
+        game if the card is played, by the valid cards
+    """
+    if search is None:
+        search = DoubleDummySearch()
+    return search.solve_moves(state)
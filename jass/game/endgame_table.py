@@ -0,0 +1,184 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+"""
+Table of the exact values of endgame positions, for search agents to end rollouts early.
+
+The positions are keyed by their zobrist key (see zobrist.py), which encodes the hands, the cards of the trick in
+progress, the player and the trump, and which GameSim maintains incrementally, so a lookup during a rollout does
+not need to encode the state. The value of a position is the number of points the team of the player to play wins
+from the start of the current trick until the end of the game with perfect play (double dummy value).
+
+The table is stored in a directory with the sorted keys and the values as npy files, which are memory mapped when
+the table is loaded, so the table does not need to fit into memory and can be shared by several processes. When a
+table is pickled (for example to send it to a worker process), only its directory is pickled and the files are
+memory mapped again when it is unpickled. Keys are looked up with a binary search.
+
+Enumerating all positions is not possible even for a few tricks (with two tricks left there are about 3e11 deals
+for each trump), so the generator solves the positions of randomly played endgames, which are the positions that
+rollouts with random play reach.
+"""
+import json
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+
+from jass.game.const import team
+from jass.game.double_dummy_search import DoubleDummySearch
+from jass.game.game_sim import GameSim
+from jass.game.game_state import GameState
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.game.zobrist import zobrist_hash
+
+KEYS_FILE = 'keys.npy'
+VALUES_FILE = 'values.npy'
+INFO_FILE = 'info.json'
+
+
+class EndgameTable:
+    """
+    Endgame table loaded (memory mapped) from a directory.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: directory of the table, as written by generate_endgame_table
+        """
+        self.directory = directory
+        self._keys = np.load(os.path.join(directory, KEYS_FILE), mmap_mode='r')
+        self._values = np.load(os.path.join(directory, VALUES_FILE), mmap_mode='r')
+        with open(os.path.join(directory, INFO_FILE)) as f:
+            info = json.load(f)
+        self.nr_tricks = info['nr_tricks']
+        self._min_played_cards = 36 - 4 * self.nr_tricks
+
+    def __getstate__(self):
+        # the memory mapped arrays would be pickled as copies of the whole table
+        state = self.__dict__.copy()
+        del state['_keys']
+        del state['_values']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._keys = np.load(os.path.join(self.directory, KEYS_FILE), mmap_mode='r')
+        self._values = np.load(os.path.join(self.directory, VALUES_FILE), mmap_mode='r')
+
+    def __len__(self) -> int:
+        return self._keys.shape[0]
+
+    def lookup_key(self, key: int) -> Optional[int]:
+        """
+        Get the value of a position by its key.
+
+        Args:
+            key: zobrist key of the position
+
+        Returns:
+            the points the team of the player to play wins from the start of the current trick until the end, or
+            None if the position is not in the table
+        """
+        key = np.uint64(key)
+        index = np.searchsorted(self._keys, key)
+        if index < self._keys.shape[0] and self._keys[index] == key:
+            return int(self._values[index])
+        return None
+
+    def lookup(self, state: GameState, key: int = None) -> Optional[int]:
+        """
+        Get the value of a position.
+
+        Args:
+            state: the position
+            key: zobrist key of the position, if it is already known (for example from GameSim)
+
+        Returns:
+            the points the team of the player to play wins from the start of the current trick until the end, or
+            None if the position is not in the table
+        """
+        if state.nr_played_cards < self._min_played_cards or state.nr_played_cards == 36:
+            return None
+        return self.lookup_key(key if key is not None else zobrist_hash(state))
+
+    def final_points(self, sim: GameSim) -> Optional[np.ndarray]:
+        """
+        Get the points of the teams at the end of the game with perfect play from the position of a simulation.
+
+        Args:
+            sim: the simulation
+
+        Returns:
+            the points of both teams at the end of the game, or None if the position is not in the table
+        """
+        state = sim.state
+        value = self.lookup(state, sim.zobrist_key)
+        if value is None:
+            return None
+        points = state.points.copy()
+        player_team = team[state.player]
+        points[player_team] += value
+        points[1 - player_team] += 157 - points.sum()
+        return points
+
+
+def generate_endgame_table(directory: str, nr_games: int, nr_tricks: int = 3, seed: int = None) -> int:
+    """
+    Generate an endgame table by solving the positions of randomly played endgames. For each game, random cards
+    are played until nr_tricks tricks are left, from then on all positions reached by a random card and the
+    positions after each valid card are solved.
+
+    Args:
+        directory: directory to write the table to, it is created if it does not exist
+        nr_games: number of games to play
+        nr_tricks: number of tricks left in the positions of the table
+        seed: seed for the random generator
+
+    Returns:
+        the number of positions in the table
+    """
+    logger = logging.getLogger(__name__)
+    rng = np.random.default_rng(seed)
+    rule = RuleSchieber()
+    sim = GameSim(rule=rule)
+    search = DoubleDummySearch()
+    min_played_cards = 36 - 4 * nr_tricks
+
+    keys = []
+    values = []
+    for game_nr in range(nr_games):
+        sim.init_from_cards(hands=deal_random_hand(rng), dealer=game_nr % 4)
+        sim.action_trump(game_nr % 6)
+        while sim.state.nr_played_cards < min_played_cards:
+            sim.action_play_card(int(rng.choice(np.flatnonzero(rule.get_valid_cards_from_state(sim.state)))))
+
+        while not sim.is_done():
+            valid_cards = np.flatnonzero(rule.get_valid_cards_from_state(sim.state))
+            keys.append(sim.zobrist_key)
+            values.append(search.solve(sim.state))
+            for card in valid_cards:
+                sim.action_play_card(int(card))
+                if not sim.is_done():
+                    keys.append(sim.zobrist_key)
+                    values.append(search.solve(sim.state))
+                sim.undo_play_card()
+            sim.action_play_card(int(rng.choice(valid_cards)))
+
+        if (game_nr + 1) % 1000 == 0:
+            logger.info('Games: {}, positions: {}'.format(game_nr + 1, len(keys)))
+
+    keys = np.array(keys, dtype=np.uint64)
+    values = np.array(values, dtype=np.uint8)
+    keys, index = np.unique(keys, return_index=True)
+    values = values[index]
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, KEYS_FILE), keys)
+    np.save(os.path.join(directory, VALUES_FILE), values)
+    with open(os.path.join(directory, INFO_FILE), 'w') as f:
+        json.dump(dict(nr_tricks=nr_tricks, nr_games=nr_games), f)
+    return keys.shape[0]
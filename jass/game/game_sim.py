@@ -9,10 +9,13 @@ import copy
 import numpy as np
 
 from jass.game.game_util import full_to_trump
-from jass.game.const import next_player, PUSH, partner_player, NORTH, SOUTH, TRUMP_FULL_OFFSET
+from jass.game.const import next_player, PUSH, partner_player, NORTH, SOUTH, TRUMP_FULL_OFFSET, team
+from jass.game.game_observation import GameObservation
 from jass.game.game_rule import GameRule
 from jass.game.game_state import GameState
 from jass.game.game_state_util import observation_from_state
+from jass.game.instrumentation import Instrumentation
+from jass.game.zobrist import zobrist_hash, zobrist_card_owner, zobrist_trick_card, zobrist_player, zobrist_trump
 
 
 class GameSim:
@@ -21,14 +24,19 @@ class GameSim:
     phase is implemented for Schieber. For other versions of the game regarding the order of actions, the class can be
     overridden. The actual rules of the game, points scoring, winning tricks and calculating which cards are allowed
     to be played are implemented in the rule class.
+
+    The zobrist key of the state (see zobrist.py) is maintained incrementally when cards are played and undone. If
+    the state is changed directly, update_zobrist_key must be called.
     """
     def __init__(self, rule: GameRule):
         # the internal state of the game is stored in a GameState object that can be set and retrieved
         self._state = GameState()
         self._rule = rule
+        self._zobrist_key = zobrist_hash(self._state)
 
     def init_from_state(self, state: GameState):
         self._state = copy.deepcopy(state)
+        self._zobrist_key = zobrist_hash(self._state)
 
     def init_from_cards(self, hands: np.array, dealer: int):
         self._state.dealer = dealer
@@ -46,25 +54,55 @@ class GameSim:
         self._state.nr_played_cards = 0
         self._state.points[0] = 0
         self._state.points[1] = 0
+        self._zobrist_key = zobrist_hash(self._state)
 
     @property
     def rule(self):
         return self._rule
 
+    @property
+    def zobrist_key(self) -> int:
+        """
+        The zobrist key of the current state.
+        """
+        return self._zobrist_key
+
+    def update_zobrist_key(self) -> None:
+        """
+        Calculate the zobrist key from scratch, after the state has been changed directly.
+        """
+        self._zobrist_key = zobrist_hash(self._state)
+
     @property
     def state(self):
         return self._state
 
-    def get_observation(self):
+    def instrument(self, instrumentation: Instrumentation) -> None:
+        """
+        Record the time of the trump actions and the cards played (phase 'state_update') and of the observations
+        (phase 'observation') in the instrumentation.
+
+        Args:
+            instrumentation: the instrumentation
+        """
+        instrumentation.instrument(self, 'action_trump', 'state_update')
+        instrumentation.instrument(self, 'action_play_card', 'state_update')
+        instrumentation.instrument(self, 'get_observation', 'observation')
+
+    def get_observation(self, obs: GameObservation = None) -> GameObservation:
         """
         Get the observation for the current player in the current state of the game.
 
+        Args:
+            obs: observation to fill in place, or None to create a new observation
+
         Returns:
             The observation for the current player.
         """
-        return observation_from_state(self._state)
+        return observation_from_state(self._state, obs=obs)
 
     def action_trump(self, action: int) -> None:
+        self._zobrist_key ^= zobrist_trump[self._state.trump] ^ zobrist_player[self._state.player]
         if self._state.forehand == -1:
             # this is the action of the forehand player
             if action == PUSH:
@@ -84,6 +122,7 @@ class GameSim:
             self._state.trick_first_player[0] = self._state.player
         else:
             raise ValueError('Unexpected value {} for forehand in action_trump'.format(self._state.forehand))
+        self._zobrist_key ^= zobrist_trump[self._state.trump] ^ zobrist_player[self._state.player]
 
     def action_play_card(self, card: int) -> None:
         """
@@ -102,6 +141,8 @@ class GameSim:
         """
         # remove card from player
         self._state.hands[self._state.player, card] = 0
+        self._zobrist_key ^= zobrist_card_owner[card][self._state.player] ^ zobrist_player[self._state.player] ^ \
+            zobrist_trick_card[self._state.nr_cards_in_trick][card]
 
         # place in trick
         self._state.current_trick[self._state.nr_cards_in_trick] = card
@@ -116,8 +157,11 @@ class GameSim:
             self._state.nr_cards_in_trick += 1
             self._state.player = next_player[self._state.player]
         else:
-            # finish current trick
+            # finish current trick, the cards of the trick are no longer part of the key
+            for position in range(4):
+                self._zobrist_key ^= zobrist_trick_card[position][self._state.current_trick[position]]
             self._end_trick()
+        self._zobrist_key ^= zobrist_player[self._state.player]
 
     def action(self, action: int):
         """
@@ -131,6 +175,80 @@ class GameSim:
             trump_action = full_to_trump(action)
             self.action_trump(trump_action)
 
+    def undo_play_card(self) -> None:
+        """
+        Undo the last card played and restore the state exactly as it was before the card was played. Together
+        with action_play_card this allows searching the game tree with make/unmake instead of copying the state.
+
+        The tricks of the state already contain the cards in the order they were played, so they serve as the
+        move stack: the last card, the player who played it and the result of the trick it completed can all be
+        derived from the state.
+
+        Preconditions:
+            self._state.nr_played_cards > 0
+        """
+        state = self._state
+        if state.nr_played_cards == 0:
+            raise ValueError('No card played that could be undone')
+
+        self._zobrist_key ^= zobrist_player[state.player]
+        if state.nr_cards_in_trick == 0:
+            # the card completed a trick, so undo the results of the trick
+            state.nr_tricks -= 1
+            for position in range(4):
+                self._zobrist_key ^= zobrist_trick_card[position][state.tricks[state.nr_tricks, position]]
+            points = state.trick_points[state.nr_tricks]
+            state.points[team[state.trick_winner[state.nr_tricks]]] -= points
+            state.trick_points[state.nr_tricks] = 0
+            state.trick_winner[state.nr_tricks] = -1
+            if state.nr_tricks < 8:
+                state.trick_first_player[state.nr_tricks + 1] = -1
+            state.current_trick = state.tricks[state.nr_tricks, :]
+            state.nr_cards_in_trick = 3
+        else:
+            state.nr_cards_in_trick -= 1
+
+        # the player of the card is determined by its position in the trick
+        player = (state.trick_first_player[state.nr_tricks] - state.nr_cards_in_trick) % 4
+        card = state.current_trick[state.nr_cards_in_trick]
+        state.current_trick[state.nr_cards_in_trick] = -1
+        state.nr_played_cards -= 1
+        state.hands[player, card] = 1
+        state.player = int(player)
+        self._zobrist_key ^= zobrist_card_owner[card][player] ^ zobrist_player[player] ^ \
+            zobrist_trick_card[state.nr_cards_in_trick][card]
+
+    def undo_trump(self) -> None:
+        """
+        Undo the last trump action (declaring trump or pushing) and restore the state as it was before.
+
+        Preconditions:
+            No card has been played yet, and a trump action has been made
+        """
+        state = self._state
+        if state.nr_played_cards > 0:
+            raise ValueError('Trump action can not be undone after cards have been played')
+        self._zobrist_key ^= zobrist_trump[state.trump] ^ zobrist_player[state.player]
+        if state.forehand == 1:
+            # forehand player declared trump, the player remains the same
+            state.forehand = -1
+            state.trump = -1
+            state.declared_trump = -1
+            state.trick_first_player[0] = -1
+        elif state.forehand == 0 and state.trump != -1:
+            # partner of the forehand player declared trump
+            state.trump = -1
+            state.declared_trump = -1
+            state.player = partner_player[next_player[state.dealer]]
+            state.trick_first_player[0] = -1
+        elif state.forehand == 0:
+            # forehand player pushed
+            state.forehand = -1
+            state.player = next_player[state.dealer]
+        else:
+            raise ValueError('No trump action that could be undone')
+        self._zobrist_key ^= zobrist_trump[state.trump] ^ zobrist_player[state.player]
+
     def is_done(self):
         """
         Return true if the game is finished.
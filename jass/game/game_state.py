@@ -5,7 +5,7 @@
 import logging
 import numpy as np
 
-from jass.game.const import JASS_SCHIEBER, partner_player, next_player, card_ids
+from jass.game.const import JASS_SCHIEBER, partner_player, next_player, card_ids, team
 from jass.game.game_util import convert_int_encoded_cards_to_str_encoded, \
     convert_one_hot_encoded_cards_to_str_encoded_list, convert_str_encoded_cards_to_int_encoded
 
@@ -27,6 +27,16 @@ class GameState:
     # version of game state
     FORMAT_VERSION = 'V0.2'
 
+    # structured dtype of the binary representation (see to_bytes). The cards contain the played cards in the order
+    # they were played, followed by the cards still in the hands, first the cards of player 0, then player 1 etc.
+    BYTES_DTYPE = np.dtype([
+        ('dealer', np.int8),
+        ('trump', np.int8),
+        ('forehand', np.int8),
+        ('nr_played_cards', np.uint8),
+        ('cards', np.uint8, (36,))
+    ])
+
     def __init__(self) -> None:
         """
         Initialize the class. All numpy arrays will be allocated.
@@ -170,6 +180,120 @@ class GameState:
         nr_trick, card_in_trick = divmod(card_nr, 4)
         return int(self.tricks[nr_trick, card_in_trick])
 
+    def to_record(self) -> np.void:
+        """
+        Generate the binary representation of the state as a record of BYTES_DTYPE. Only the dealer, the trump
+        selection, and the cards in the order they were played (and the remaining cards in the hands) are stored,
+        all the other information is derived again when reading with from_record.
+
+        Precondition:
+            the hands and tricks of the state contain all 36 cards
+
+        Returns:
+            record (numpy structured scalar) of the state
+        """
+        record = np.zeros(1, dtype=GameState.BYTES_DTYPE)[0]
+        record['dealer'] = self.dealer
+        record['trump'] = self.trump
+        record['forehand'] = self.forehand
+        record['nr_played_cards'] = self.nr_played_cards
+        cards = record['cards']
+        cards[0:self.nr_played_cards] = self.tricks.reshape(-1)[0:self.nr_played_cards]
+        cards[self.nr_played_cards:] = np.nonzero(self.hands)[1]
+        return record
+
+    def to_bytes(self) -> bytes:
+        """
+        Generate the binary representation of the state (40 bytes), see to_record.
+
+        Returns:
+            bytes of the state
+        """
+        return self.to_record().tobytes()
+
+    @classmethod
+    def from_record(cls, record: np.void, rule) -> 'GameState':
+        """
+        Create state from the binary representation in a record of BYTES_DTYPE. The trick winners, points and
+        the current player are calculated again by replaying the cards using the rule.
+
+        Args:
+            record: the record
+            rule: the rule (GameRule) to calculate the winners and points of the tricks
+        Returns:
+            the state
+        """
+        state = GameState()
+        state.dealer = int(record['dealer'])
+        state.trump = int(record['trump'])
+        state.forehand = int(record['forehand'])
+        state.nr_played_cards = int(record['nr_played_cards'])
+        cards = record['cards']
+
+        forehand_player = next_player[state.dealer]
+        if state.trump != -1:
+            if state.forehand == 1:
+                state.declared_trump = forehand_player
+            else:
+                state.declared_trump = partner_player[forehand_player]
+            state.trick_first_player[0] = forehand_player
+            player = forehand_player
+        elif state.forehand == 0:
+            player = partner_player[forehand_player]
+        else:
+            player = forehand_player
+
+        # replay the cards to determine the players and the results of the tricks
+        nr_played_by_player = [0, 0, 0, 0]
+        tricks = state.tricks.reshape(-1)
+        tricks[0:state.nr_played_cards] = cards[0:state.nr_played_cards]
+        for card_nr in range(state.nr_played_cards):
+            nr_trick, card_in_trick = divmod(card_nr, 4)
+            if card_in_trick == 0:
+                state.trick_first_player[nr_trick] = player
+            nr_played_by_player[player] += 1
+            if card_in_trick < 3:
+                player = next_player[player]
+            else:
+                trick = state.tricks[nr_trick, :]
+                points = rule.calc_points(trick, nr_trick == 8, state.trump)
+                winner = rule.calc_winner(trick, state.trick_first_player[nr_trick], state.trump)
+                state.trick_points[nr_trick] = points
+                state.trick_winner[nr_trick] = winner
+                state.points[team[winner]] += points
+                if nr_trick < 8:
+                    state.trick_first_player[nr_trick + 1] = winner
+                player = winner
+
+        state.nr_tricks, state.nr_cards_in_trick = divmod(state.nr_played_cards, 4)
+        if state.nr_played_cards < 36:
+            state.player = int(player)
+            state.current_trick = state.tricks[state.nr_tricks]
+        else:
+            state.player = -1
+            state.current_trick = None
+
+        # the remaining cards are in the hands, ordered by player
+        start = state.nr_played_cards
+        for player in range(4):
+            end = start + 9 - nr_played_by_player[player]
+            state.hands[player, cards[start:end]] = 1
+            start = end
+        return state
+
+    @classmethod
+    def from_bytes(cls, data: bytes, rule) -> 'GameState':
+        """
+        Create state from the binary representation, see from_record.
+
+        Args:
+            data: the bytes generated by to_bytes
+            rule: the rule (GameRule) to calculate the winners and points of the tricks
+        Returns:
+            the state
+        """
+        return GameState.from_record(np.frombuffer(data, dtype=GameState.BYTES_DTYPE)[0], rule)
+
     @classmethod
     def from_json(cls, data: dict):
         """
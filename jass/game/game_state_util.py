@@ -2,10 +2,13 @@
 #
 # Created by Thomas Koller on 7/24/2020
 #
+from typing import List, Union
+
 import numpy as np
 
 from jass.game.const import next_player, partner_player
 from jass.game.game_observation import GameObservation
+from jass.game.game_rule import GameRule
 from jass.game.game_state import GameState
 
 
@@ -47,19 +50,24 @@ def calculate_points_from_tricks(state: 'GameState') -> np.ndarray:
     return points
 
 
-def observation_from_state(state: GameState, player: int = -1) -> GameObservation:
+def observation_from_state(state: GameState, player: int = -1, obs: GameObservation = None) -> GameObservation:
     """
     Initialize observation from game state for the given player or the current player if the player is not
     supplied.
 
+    If an observation is supplied, it is filled in place instead of allocating a new one, so the same observation
+    object can be reused for every move of a game. All the fields of the observation are overwritten.
+
     Args:
         state: The game state from which to determine the observation
         player: player for which to create the observation or -1 for the current player
+        obs: observation to fill, or None to create a new observation
 
     Returns:
         the observation for a given game state for the view of the player
     """
-    obs = GameObservation()
+    if obs is None:
+        obs = GameObservation()
 
     obs.dealer = state.dealer
     obs.player = state.player
@@ -75,6 +83,8 @@ def observation_from_state(state: GameState, player: int = -1) -> GameObservatio
 
     if state.nr_played_cards < 36:
         obs.hand[:] = state.hands[obs.player_view, :]
+    else:
+        obs.hand.fill(0)
 
     obs.tricks[:, :] = state.tricks[:, :]
     obs.trick_winner[:] = state.trick_winner[:]
@@ -96,6 +106,58 @@ def observation_from_state(state: GameState, player: int = -1) -> GameObservatio
     return obs
 
 
+def observation_play_card(obs: GameObservation, card: int, rule: GameRule) -> None:
+    """
+    Update an observation in place after the current player has played a card, in the same way as
+    GameSim.action_play_card updates the state. The card is removed from the hand, if the observation is from the
+    view of the player that played it.
+
+    This is used to keep an observation up to date from the cards played, instead of creating a new observation for
+    every move.
+
+    Preconditions:
+        obs.nr_played_cards < 36
+        obs.trump != -1
+
+    Args:
+        obs: the observation to update
+        card: the card played by the current player
+        rule: the rule to calculate the winner and the points of the tricks
+    """
+    if obs.player == obs.player_view:
+        obs.hand[card] = 0
+
+    obs.current_trick[obs.nr_cards_in_trick] = card
+    obs.nr_played_cards += 1
+
+    if obs.nr_cards_in_trick < 3:
+        if obs.nr_cards_in_trick == 0:
+            obs.trick_first_player[obs.nr_tricks] = obs.player
+        obs.nr_cards_in_trick += 1
+        obs.player = next_player[obs.player]
+        return
+
+    # end of trick
+    points = rule.calc_points(obs.current_trick, obs.nr_played_cards == 36, obs.trump)
+    winner = rule.calc_winner(obs.current_trick, obs.trick_first_player[obs.nr_tricks], obs.trump)
+    obs.trick_points[obs.nr_tricks] = points
+    obs.trick_winner[obs.nr_tricks] = winner
+    if winner == 0 or winner == 2:
+        obs.points[0] += points
+    else:
+        obs.points[1] += points
+    obs.nr_tricks += 1
+    obs.nr_cards_in_trick = 0
+
+    if obs.nr_tricks < 9:
+        obs.trick_first_player[obs.nr_tricks] = winner
+        obs.player = winner
+        obs.current_trick = obs.tricks[obs.nr_tricks, :]
+    else:
+        obs.player = -1
+        obs.current_trick = None
+
+
 def state_from_observation(obs: GameObservation, hands: np.ndarray) -> GameState:
     """
     Initialize state from an observation and the distribution of all hands.
@@ -294,3 +356,153 @@ def obs_for_trump_from_complete_game(game: GameState) -> (GameObservation, GameO
         return obs, obs2
     else:
         return obs, None
+
+
+def states_to_array(states: List[GameState]) -> np.ndarray:
+    """
+    Convert states to an array of the binary representation (GameState.BYTES_DTYPE), for example to save
+    a large number of games.
+
+    Args:
+        states: the states to convert
+
+    Returns:
+        array of the records of the states
+    """
+    result = np.zeros(len(states), dtype=GameState.BYTES_DTYPE)
+    for i, state in enumerate(states):
+        result[i] = state.to_record()
+    return result
+
+
+def states_from_array(records: np.ndarray, rule: GameRule) -> List[GameState]:
+    """
+    Convert an array of the binary representation (GameState.BYTES_DTYPE) to states.
+
+    Args:
+        records: the array of records
+        rule: the rule to calculate the winners and points of the tricks
+
+    Returns:
+        list of the states
+    """
+    return [GameState.from_record(record, rule) for record in records]
+
+
+def permute_card(card: int, color_perm: np.ndarray) -> int:
+    """
+    Map a card to the card of the same rank in the permuted color.
+
+    Args:
+        card: the card (int encoded)
+        color_perm: the new color of each color
+
+    Returns:
+        the permuted card
+    """
+    color, rank = divmod(card, 9)
+    return int(color_perm[color]) * 9 + rank
+
+
+def permute_trump(trump: int, color_perm: np.ndarray) -> int:
+    """
+    Map a trump (or trump action) to the permuted color, OBE_ABE, UNE_UFE, PUSH and -1 are not changed.
+
+    Args:
+        trump: the trump
+        color_perm: the new color of each color
+
+    Returns:
+        the permuted trump
+    """
+    if 0 <= trump < 4:
+        return int(color_perm[trump])
+    return trump
+
+
+def permute_colors(state: Union[GameState, GameObservation],
+                   color_perm: np.ndarray) -> Union[GameState, GameObservation]:
+    """
+    Create a copy of a state or observation with the colors of all the cards (and the trump) permuted.
+
+    Args:
+        state: the state or observation
+        color_perm: the new color of each color, i.e. the cards of color c become cards of color color_perm[c]
+
+    Returns:
+        the permuted state or observation
+    """
+    card_perm = (np.asarray(color_perm)[:, np.newaxis] * 9 + np.arange(9)).reshape(36)
+    result = type(state)()
+
+    result.dealer = state.dealer
+    result.player = state.player
+    result.trump = permute_trump(state.trump, color_perm)
+    result.forehand = state.forehand
+    result.declared_trump = state.declared_trump
+
+    if isinstance(state, GameObservation):
+        result.player_view = state.player_view
+        result.hand[card_perm] = state.hand
+    else:
+        result.hands[:, card_perm] = state.hands
+
+    played = state.tricks != -1
+    result.tricks[played] = card_perm[state.tricks[played]]
+    result.trick_winner[:] = state.trick_winner[:]
+    result.trick_points[:] = state.trick_points[:]
+    result.trick_first_player[:] = state.trick_first_player[:]
+    result.nr_tricks = state.nr_tricks
+    result.nr_cards_in_trick = state.nr_cards_in_trick
+    result.nr_played_cards = state.nr_played_cards
+    result.points[:] = state.points[:]
+
+    # current trick is a view to the trick
+    if state.nr_played_cards < 36:
+        result.current_trick = result.tricks[result.nr_tricks]
+    else:
+        result.current_trick = None
+    return result
+
+
+def canonicalize(state: Union[GameState, GameObservation]) -> (Union[GameState, GameObservation], np.ndarray):
+    """
+    Map a state or observation to the canonical representative of the states that only differ by a permutation of
+    the colors that are equivalent for the game: the three colors that are not trump if a color is trump, and all
+    four colors for OBE_ABE, UNE_UFE and if trump has not been selected yet (the trump actions are then permuted
+    as well, see permute_trump).
+
+    The equivalent colors are ordered by the location of their cards (the hand holding each card and when it has
+    been played), so all the states that only differ by such a permutation have the same canonical state.
+
+    Args:
+        state: the state or observation
+
+    Returns:
+        the canonical state or observation and the inverse permutation of the colors, which maps the colors of the
+        canonical state back to the original colors, for example to map an action selected for the canonical
+        state with permute_card or permute_trump
+    """
+    # location of each card: the player holding it, the number of the card in the played cards or 40 if it is
+    # not known (cards of the other players in an observation)
+    locations = np.full(36, 40, dtype=np.int32)
+    if isinstance(state, GameObservation):
+        locations[state.hand == 1] = state.player_view
+    else:
+        for player in range(4):
+            locations[state.hands[player] == 1] = player
+    played = state.tricks.reshape(36)
+    played_nr = np.flatnonzero(played != -1)
+    locations[played[played_nr]] = 4 + played_nr
+    locations = locations.reshape(4, 9)
+
+    if 0 <= state.trump < 4:
+        colors = [color for color in range(4) if color != state.trump]
+    else:
+        colors = list(range(4))
+
+    # the sorted colors are placed at the positions of the equivalent colors, the other colors remain
+    inverse_perm = np.arange(4)
+    inverse_perm[colors] = sorted(colors, key=lambda color: tuple(locations[color]))
+    color_perm = np.argsort(inverse_perm)
+    return permute_colors(state, color_perm), inverse_perm
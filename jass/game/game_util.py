@@ -92,6 +92,52 @@ def convert_one_hot_encoded_cards_to_int_encoded_list(cards: np.ndarray):
     return np.flatnonzero(cards).tolist()
 
 
+def convert_one_hot_encoded_cards_to_bits(cards: np.ndarray) -> int:
+    """
+    Get the bitboard representation of a one hot encoded array
+    Args:
+        cards: the cards, 1-hot encoded
+
+    Returns:
+        int with bit i set if card i is in the array
+    """
+    result = 0
+    for i in np.flatnonzero(cards):
+        result |= 1 << int(i)
+    return result
+
+
+def convert_bits_to_one_hot_encoded_cards(cards: int) -> np.ndarray:
+    """
+    Get the one hot encoded array from the bitboard representation
+    Args:
+        cards: the cards as bitboard
+
+    Returns:
+        1-hot encoded numpy array of the cards
+    """
+    result = np.zeros(36, np.int32)
+    result[convert_bits_to_int_encoded_list(cards)] = 1
+    return result
+
+
+def convert_bits_to_int_encoded_list(cards: int) -> List[int]:
+    """
+    Get the int encoded list of the cards in the bitboard representation
+    Args:
+        cards: the cards as bitboard
+
+    Returns:
+        list of the cards as int, in increasing order
+    """
+    result = []
+    while cards:
+        lowest = cards & -cards
+        result.append(lowest.bit_length() - 1)
+        cards ^= lowest
+    return result
+
+
 def count_colors(cards: np.ndarray) -> np.ndarray:
     """
     Count the colors in the cards. The return value is an array of size 4 that indicates how many cards of each
@@ -111,16 +157,22 @@ def count_colors(cards: np.ndarray) -> np.ndarray:
     return result
 
 
-def deal_random_hand() -> np.ndarray:
+def deal_random_hand(rng: np.random.Generator = None) -> np.ndarray:
     """
     Deal random cards for each hand.
 
+    Args:
+        rng: random number generator to use, or None to use the global numpy random state
+
     Returns:
         one hot encoded 4x36 array
     """
     # shuffle card ids
     cards = np.arange(0, 36, dtype=np.int32)
-    np.random.shuffle(cards)
+    if rng is None:
+        np.random.shuffle(cards)
+    else:
+        rng.shuffle(cards)
     hands = np.zeros(shape=[4, 36], dtype=np.int32)
 
     # convert to one hot encoded
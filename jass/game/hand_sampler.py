@@ -0,0 +1,191 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+"""
+Sampling of the hidden hands of the other players from an observation.
+
+The cards played so far restrict the cards the other players can hold: with the rules of RuleSchieber, a player
+that does not follow suit (and does not play trump) has no card of the color played first, except for the jack of
+trump. These restrictions are derived from the tricks of the observation (calc_voids).
+
+The deals are drawn uniformly from all deals that respect the restrictions, without rejecting deals: the number of
+valid deals for each number of cards still to be dealt to each player is counted first (by dynamic programming over
+the unknown cards), and each card is then dealt to a player with the probability of the number of deals that remain
+valid afterwards.
+"""
+import numpy as np
+
+from jass.game.const import color_of_card, offset_of_card, J_offset, lower_trump
+from jass.game.game_observation import GameObservation
+
+
+def calc_voids(obs: GameObservation) -> np.ndarray:
+    """
+    Calculate the colors the players can not hold anymore from the cards played so far.
+
+    A player can not hold a color, if
+    - the player did not follow suit and did not play trump (a trump can always be played)
+    - trump was played first and the player did not play trump (except for the jack of trump, which does not
+      have to be played)
+    - the player played a trump lower than a trump played before in the trick, which is only allowed if the player
+      holds nothing but trump
+
+    Args:
+        obs: the observation
+
+    Returns:
+        [4,4] array with 1 if the player (first index) can not hold cards of the color (second index), the jack of
+        trump is excluded from the restrictions
+    """
+    voids = np.zeros([4, 4], dtype=np.int32)
+    trump = obs.trump
+    for i in range(obs.nr_played_cards):
+        trick, position = divmod(i, 4)
+        if position == 0:
+            continue
+        player = (obs.trick_first_player[trick] - position) % 4
+        card = obs.tricks[trick, position]
+        lead_color = color_of_card[obs.tricks[trick, 0]]
+        card_color = color_of_card[card]
+        if card_color != lead_color and card_color != trump:
+            voids[player, lead_color] = 1
+        elif card_color == trump != lead_color and position > 1:
+            # the lowest trump played before (as in RuleSchieber, the one with the highest index)
+            trumps_played = [c for c in obs.tricks[trick, 1:position] if color_of_card[c] == trump]
+            if len(trumps_played) > 0 and lower_trump[max(trumps_played), card]:
+                voids[player, :] = 1
+                voids[player, trump] = 0
+    return voids
+
+
+class HandSampler:
+    """
+    Draws deals of the hidden cards uniformly from all deals consistent with an observation.
+
+    The counts are calculated once when the sampler is created, so one sampler should be used to draw all the
+    deals for the same observation.
+    """
+
+    def __init__(self, obs: GameObservation, rng: np.random.Generator = None):
+        """
+        Args:
+            obs: the observation of the player, for which the hands of the other players are sampled
+            rng: random generator to use, a new one is created if None
+        """
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self._player_view = obs.player_view
+        self._hand = obs.hand.astype(np.int32)
+        self._hidden_players = np.array([p for p in range(4) if p != obs.player_view], dtype=np.int32)
+
+        known = obs.hand.copy()
+        nr_cards = np.full(4, 9, dtype=np.int64)
+        for i in range(obs.nr_played_cards):
+            trick, position = divmod(i, 4)
+            known[obs.tricks[trick, position]] = 1
+            nr_cards[(obs.trick_first_player[trick] - position) % 4] -= 1
+        self._unknown = np.flatnonzero(known == 0)
+        self._nr_cards = nr_cards[self._hidden_players]
+        if self._nr_cards.sum() != self._unknown.shape[0]:
+            raise ValueError('Number of unknown cards does not match the number of cards of the other players')
+
+        # allowed[i, p]: hidden player p can hold the i-th unknown card
+        voids = calc_voids(obs)
+        colors = color_of_card[self._unknown]
+        self._allowed = (voids[self._hidden_players][:, colors] == 0).T
+        if 0 <= obs.trump < 4:
+            trump_jack = (colors == obs.trump) & (offset_of_card[self._unknown] == J_offset)
+            self._allowed[trump_jack, :] = True
+
+        self._counts = self._calc_counts()
+        self.nr_deals = int(self._counts[0][tuple(self._nr_cards)])
+        if self.nr_deals == 0:
+            raise ValueError('No deal is consistent with the observation')
+
+        # strides to index the flattened count tables with the numbers of cards still to deal
+        shape = self._nr_cards + 1
+        self._strides = np.array([shape[1] * shape[2], shape[2], 1], dtype=np.int64)
+        self._flat_counts = self._counts.reshape(self._counts.shape[0], -1)
+
+    def _calc_counts(self) -> np.ndarray:
+        """
+        Returns:
+            counts[i, n0, n1, n2]: number of ways to deal the unknown cards from index i on, if the hidden players
+            still get n0, n1 and n2 cards
+        """
+        nr_unknown = self._unknown.shape[0]
+        counts = np.zeros([nr_unknown + 1] + list(self._nr_cards + 1), dtype=np.int64)
+        counts[nr_unknown, 0, 0, 0] = 1
+        for i in reversed(range(nr_unknown)):
+            if self._allowed[i, 0]:
+                counts[i, 1:, :, :] += counts[i + 1, :-1, :, :]
+            if self._allowed[i, 1]:
+                counts[i, :, 1:, :] += counts[i + 1, :, :-1, :]
+            if self._allowed[i, 2]:
+                counts[i, :, :, 1:] += counts[i + 1, :, :, :-1]
+        return counts
+
+    def sample(self) -> np.ndarray:
+        """
+        Draw one deal.
+
+        Returns:
+            [4,36] array with the hands of all players, the hand of the observing player is the one of the observation
+        """
+        # same as sample_batch for a single deal, but with python scalars, which is much faster for one deal
+        hands = np.zeros([4, 36], dtype=np.int32)
+        hands[self._player_view] = self._hand
+        remaining = [int(n) for n in self._nr_cards]
+        strides = [int(s) for s in self._strides]
+        index = sum(n * s for n, s in zip(remaining, strides))
+        uniform = self._rng.random(self._unknown.shape[0])
+        for i, card in enumerate(self._unknown):
+            counts = self._flat_counts[i + 1]
+            allowed = self._allowed[i]
+            weights = [int(counts[index - strides[p]]) if allowed[p] and remaining[p] > 0 else 0 for p in range(3)]
+            total = sum(weights)
+            u = min(uniform[i] * total, total - 1)
+            chosen = 0
+            while chosen < 2 and (u >= weights[chosen] or weights[chosen] == 0):
+                u -= weights[chosen]
+                chosen += 1
+            hands[self._hidden_players[chosen], card] = 1
+            remaining[chosen] -= 1
+            index -= strides[chosen]
+        return hands
+
+    def sample_batch(self, nr_deals: int, out: np.ndarray = None) -> np.ndarray:
+        """
+        Draw several independent deals.
+
+        Args:
+            nr_deals: number of deals K to draw
+            out: optional preallocated [K,4,36] array to fill (it can be larger in the first dimension, only the
+                first K entries are written)
+
+        Returns:
+            [K,4,36] array with the hands of all players for each deal
+        """
+        if out is None:
+            out = np.zeros([nr_deals, 4, 36], dtype=np.int32)
+        else:
+            out = out[:nr_deals]
+            out[:] = 0
+        out[:, self._player_view, :] = self._hand
+
+        rows = np.arange(nr_deals)
+        remaining = np.tile(self._nr_cards, (nr_deals, 1))
+        index = remaining @ self._strides
+        for i, card in enumerate(self._unknown):
+            # number of valid deals if the card is given to each of the hidden players
+            possible = self._allowed[i][np.newaxis, :] & (remaining > 0)
+            next_index = np.where(possible, index[:, np.newaxis] - self._strides[np.newaxis, :], 0)
+            weights = np.where(possible, self._flat_counts[i + 1][next_index], 0)
+            cumulative = np.cumsum(weights, axis=1)
+            u = self._rng.integers(0, cumulative[:, -1])
+            chosen = (cumulative <= u[:, np.newaxis]).sum(axis=1)
+
+            out[rows, self._hidden_players[chosen], card] = 1
+            remaining[rows, chosen] -= 1
+            index -= self._strides[chosen]
+        return out
@@ -0,0 +1,135 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import json
+import time
+from typing import Callable, Dict
+
+
+class Instrumentation:
+    """
+    Timers and counters for the phases of playing games, for example the decisions of the agents, creating the
+    observations, checking the moves and updating the states (see Arena and GameSim).
+
+    The methods of the instrumented objects are replaced on the instance by wrappers that measure the time of each
+    call (see instrument), so objects that are not instrumented run without any overhead. For each phase, the
+    number of calls, the total time and the maximal time are recorded. Counters can be incremented for any other
+    events.
+    """
+
+    def __init__(self):
+        # for each phase: [number of calls, total time, maximal time]
+        self._timers: Dict[str, list] = {}
+        self._counters: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        self._timers.clear()
+        self._counters.clear()
+
+    def record(self, phase: str, seconds: float) -> None:
+        """
+        Add the time of a call to a phase.
+
+        Args:
+            phase: name of the phase
+            seconds: the time in seconds
+        """
+        timer = self._timers.get(phase)
+        if timer is None:
+            self._timers[phase] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    def count(self, counter: str, n: int = 1) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            counter: name of the counter
+            n: the increment
+        """
+        self._counters[counter] = self._counters.get(counter, 0) + n
+
+    def timed(self, phase: str, function: Callable) -> Callable:
+        """
+        Get a wrapper of a function that records the time of each call in a phase.
+
+        Args:
+            phase: name of the phase
+            function: the function to time
+
+        Returns:
+            the wrapper
+        """
+        record = self.record
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(phase, perf_counter() - start)
+        return wrapper
+
+    def instrument(self, obj: object, method: str, phase: str = None) -> None:
+        """
+        Replace a method of an object (only on this instance) by a wrapper that records the time of each call.
+
+        Args:
+            obj: the object
+            method: name of the method
+            phase: name of the phase, the name of the method if None
+        """
+        setattr(obj, method, self.timed(phase if phase is not None else method, getattr(obj, method)))
+
+    def merge(self, other: 'Instrumentation') -> None:
+        """
+        Add the timers and counters of another instrumentation, for example from another process.
+        """
+        for phase, (nr_calls, total, maximum) in other._timers.items():
+            timer = self._timers.setdefault(phase, [0, 0.0, 0.0])
+            timer[0] += nr_calls
+            timer[1] += total
+            timer[2] = max(timer[2], maximum)
+        for counter, value in other._counters.items():
+            self.count(counter, value)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            the timers (number of calls, total, mean and maximal time in seconds for each phase) and counters as dict,
+            for example to save as json
+        """
+        return dict(timers={phase: dict(calls=nr_calls, total=total, mean=total / nr_calls, max=maximum)
+                            for phase, (nr_calls, total, maximum) in self._timers.items()},
+                    counters=dict(self._counters))
+
+    def save_json(self, filename: str) -> None:
+        """
+        Save the timers and counters (see to_dict) to a json file.
+        """
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def summary(self) -> str:
+        """
+        Returns:
+            a table of the phases, sorted by the total time, and the counters
+        """
+        lines = ['{:<20} {:>10} {:>12} {:>12} {:>12}'.format('phase', 'calls', 'total [s]', 'mean [us]',
+                                                              'max [us]')]
+        for phase, (nr_calls, total, maximum) in sorted(self._timers.items(), key=lambda item: -item[1][1]):
+            lines.append('{:<20} {:>10} {:>12.3f} {:>12.1f} {:>12.1f}'.format(phase, nr_calls, total,
+                                                                               total / nr_calls * 1e6,
+                                                                               maximum * 1e6))
+        for counter, value in sorted(self._counters.items()):
+            lines.append('{:<20} {:>10}'.format(counter, value))
+        return '\n'.join(lines)
+
+    def __str__(self) -> str:
+        return self.summary()
@@ -0,0 +1,261 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+"""
+Kernel to play many continuations (rollouts) of a game from one state to the end, as needed by the simulation
+based agents.
+
+All the continuations start from the same state, so they are always at the same card of the same trick and only
+the cards, the players and the points differ. The kernel uses this to keep the state in a few small arrays, with
+the hands as bitboards (int64 with bit i set for card i, see const.py), and plays one card in all continuations
+with a few array operations. The arrays are allocated once for a number of continuations and reused.
+
+The card played is selected by a policy, which is called with the kernel and the bitboards of the valid cards and
+returns the cards to play. The kernel provides random_policy and highest_card_policy, other policies can use the
+fields of the kernel (trump, trick, player, hands...).
+"""
+from typing import Callable, Dict
+
+import numpy as np
+
+from jass.game.const import card_strength, card_values, color_masks_bits, next_player, team, trump_jack_bits, \
+    allowed_masks_bits, NO_TRUMP_PLAYED
+from jass.game.game_state import GameState
+
+# numpy versions of the tables
+_color_masks = np.array(color_masks_bits, dtype=np.int64)
+_allowed_masks = np.array(allowed_masks_bits, dtype=np.int64)
+_trump_jack = np.array(trump_jack_bits, dtype=np.int64)
+_next_player = np.array(next_player, dtype=np.int32)
+_team = np.array(team, dtype=np.int32)
+_shifts = np.arange(36, dtype=np.int64)
+
+# number of set bits and the position of the i-th set bit in a byte, to select a card from a bitboard
+_byte_counts = np.array([bin(b).count('1') for b in range(256)], dtype=np.int64)
+_byte_select = np.array([[[i for i in range(8) if b >> i & 1][j] if j < _byte_counts[b] else 0 for j in range(8)]
+                         for b in range(256)], dtype=np.int64)
+_byte_shifts = np.arange(0, 40, 8, dtype=np.int64)
+
+
+def bits_from_one_hot(cards: np.ndarray) -> np.ndarray:
+    """
+    Convert one-hot encoded cards to bitboards.
+
+    Args:
+        cards: [...,36] array of one-hot encoded cards
+
+    Returns:
+        [...] array of the bitboards (int64)
+    """
+    return (np.asarray(cards, dtype=np.int64) << _shifts).sum(axis=-1)
+
+
+def one_hot_from_bits(bits: np.ndarray) -> np.ndarray:
+    """
+    Convert bitboards to one-hot encoded cards.
+
+    Args:
+        bits: [...] array of bitboards
+
+    Returns:
+        [...,36] array of the one-hot encoded cards (int64)
+    """
+    return (np.asarray(bits, dtype=np.int64)[..., np.newaxis] >> _shifts) & 1
+
+
+def select_bits(bits: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """
+    Get the position of the index-th set bit (counted from the lowest bit) in each bitboard.
+
+    Precondition:
+        0 <= index < number of set bits
+
+    Args:
+        bits: [N] array of bitboards
+        index: [N] array of the indices
+
+    Returns:
+        [N] array of the positions of the bits, i.e. the cards
+    """
+    n = bits.shape[0]
+    # count the bits byte by byte and find the byte containing the bit
+    byte_values = (bits[:, np.newaxis] >> _byte_shifts) & 0xFF
+    cumulative = np.cumsum(_byte_counts[byte_values], axis=1)
+    byte_nr = (cumulative <= index[:, np.newaxis]).sum(axis=1)
+    before = np.where(byte_nr > 0, cumulative[np.arange(n), np.maximum(byte_nr - 1, 0)], 0)
+    return byte_nr * 8 + _byte_select[byte_values[np.arange(n), byte_nr], index - before]
+
+
+def random_policy(kernel: 'Rollout', valid: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Play a random valid card.
+    """
+    counts = _byte_counts[(valid[:, np.newaxis] >> _byte_shifts) & 0xFF].sum(axis=1)
+    index = (rng.random(valid.shape[0]) * counts).astype(np.int64)
+    return select_bits(valid, np.minimum(index, counts - 1))
+
+
+def highest_card_policy(kernel: 'Rollout', valid: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Play the valid card with the highest strength for the trump, i.e. try to win the trick.
+    """
+    return np.argmax(one_hot_from_bits(valid) * kernel.strength, axis=1)
+
+
+class Rollout:
+    """
+    Kernel for playing n continuations of a game to the end with a policy.
+    """
+
+    def __init__(self, nr_games: int):
+        """
+        Args:
+            nr_games: the number of continuations played at the same time
+        """
+        self.nr_games = nr_games
+        self._idx = np.arange(nr_games)
+
+        # state of the continuations, the fields that are the same for all continuations are ints
+        self.trump = -1
+        self.nr_tricks = 0
+        self.nr_cards_in_trick = 0
+        self.hands = np.zeros([nr_games, 4], dtype=np.int64)
+        self.trick = np.zeros([nr_games, 4], dtype=np.int64)
+        self.trick_first_player = np.zeros(nr_games, dtype=np.int32)
+        self.player = np.zeros(nr_games, dtype=np.int32)
+        self.points = np.zeros([nr_games, 2], dtype=np.int32)
+
+        # tables for the trump
+        self.strength = card_strength[0]
+        self._values = card_values[0]
+
+    def init_from_state(self, state: GameState) -> None:
+        """
+        Initialize all continuations from a state.
+
+        Args:
+            state: the state, trump must have been selected
+        """
+        if state.trump == -1:
+            raise ValueError('Trump must be selected for a rollout')
+        self.trump = state.trump
+        self.strength = card_strength[state.trump]
+        self._values = card_values[state.trump]
+        self.nr_tricks = state.nr_tricks
+        self.nr_cards_in_trick = state.nr_cards_in_trick
+        self.hands[:] = bits_from_one_hot(state.hands)
+        self.points[:] = state.points
+        if state.nr_tricks < 9:
+            self.trick[:] = state.current_trick
+            self.trick_first_player.fill(state.trick_first_player[state.nr_tricks])
+            self.player.fill(state.player)
+
+    def get_valid_cards(self) -> np.ndarray:
+        """
+        Get the valid cards of the players to play, with the same rules as RuleSchieberBits.get_valid_cards.
+
+        Returns:
+            [N] array of the bitboards of the valid cards
+        """
+        hands = self.hands[self._idx, self.player]
+        move_nr = self.nr_cards_in_trick
+        if move_nr == 0:
+            return hands
+
+        color_played = self.trick[:, 0] // 9
+        have_color_played = (hands & _color_masks[color_played]) != 0
+        trump = self.trump
+        if trump >= 4:
+            return hands & _allowed_masks[have_color_played.astype(np.int64), trump, color_played, NO_TRUMP_PLAYED]
+
+        # the lowest trump played by player 1 and 2, if the color played is not trump (lower cards have a higher
+        # index)
+        lowest_trump_played = np.full(self.nr_games, -1, dtype=np.int64)
+        for position in range(1, min(move_nr, 3)):
+            cards = self.trick[:, position]
+            lowest_trump_played = np.where((cards // 9 == trump) & (color_played != trump),
+                                           np.maximum(lowest_trump_played, cards), lowest_trump_played)
+        trump_played = lowest_trump_played >= 0
+        valid = hands & _allowed_masks[have_color_played.astype(np.int64), trump, color_played,
+                                       np.where(trump_played, lowest_trump_played - trump * 9, NO_TRUMP_PLAYED)]
+
+        # only the trump jack or only trumps left
+        trump_cards = hands & _color_masks[trump]
+        any_card = ((color_played == trump) & (trump_cards == _trump_jack[trump])) | \
+                   (trump_played & (trump_cards == hands))
+        return np.where(any_card, hands, valid)
+
+    def play_cards(self, cards: np.ndarray) -> None:
+        """
+        Play a card in all continuations.
+
+        Args:
+            cards: [N] array of the cards of the players to play
+        """
+        idx = self._idx
+        self.hands[idx, self.player] ^= np.int64(1) << cards
+        self.trick[:, self.nr_cards_in_trick] = cards
+        if self.nr_cards_in_trick < 3:
+            self.nr_cards_in_trick += 1
+            self.player = _next_player[self.player]
+            return
+
+        # end of the trick: only trumps and cards of the first color can win the trick
+        self.nr_tricks += 1
+        self.nr_cards_in_trick = 0
+        colors = self.trick // 9
+        can_win = (colors == colors[:, 0:1]) | (colors == self.trump)
+        winner = (self.trick_first_player - np.argmax(self.strength[self.trick] * can_win, axis=1)) % 4
+        points = self._values[self.trick].sum(axis=1)
+        if self.nr_tricks == 9:
+            points += 5
+        self.points[idx, _team[winner]] += points
+        self.player = winner.astype(np.int32)
+        self.trick_first_player = self.player
+
+    def run(self, state: GameState, policy: Callable = random_policy,
+            rng: np.random.Generator = None) -> np.ndarray:
+        """
+        Play all continuations from the state to the end.
+
+        Args:
+            state: the state to start from, trump must have been selected
+            policy: function (kernel, valid cards, rng) -> cards selecting the cards to play
+            rng: the random generator
+
+        Returns:
+            [N,2] array of the points of the teams at the end of each continuation, the array is reused by the
+            next run
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        self.init_from_state(state)
+        while self.nr_tricks < 9:
+            self.play_cards(policy(self, self.get_valid_cards(), rng))
+        return self.points
+
+
+# kernels by the number of continuations, so that the arrays are reused
+_kernels: Dict[int, Rollout] = {}
+
+
+def rollout(state: GameState, policy: Callable = random_policy, rng: np.random.Generator = None,
+            n: int = 1) -> np.ndarray:
+    """
+    Play n continuations of the game from the state to the end.
+
+    Args:
+        state: the state to start from, trump must have been selected
+        policy: function (kernel, valid cards, rng) -> cards selecting the cards to play, for example random_policy
+            or highest_card_policy
+        rng: the random generator
+        n: the number of continuations
+
+    Returns:
+        [n,2] array of the points of the teams at the end of each continuation
+    """
+    kernel = _kernels.get(n)
+    if kernel is None:
+        kernel = _kernels[n] = Rollout(n)
+    return kernel.run(state, policy, rng).copy()
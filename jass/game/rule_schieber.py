@@ -4,8 +4,8 @@
 #
 import numpy as np
 
-from jass.game.const import color_of_card, color_masks, J_offset, higher_trump, lower_trump, card_values, UNE_UFE, \
-    OBE_ABE, next_player, partner_player
+from jass.game.const import color_of_card, color_masks, J_offset, lower_trump, card_values, UNE_UFE, \
+    OBE_ABE, next_player, partner_player, card_strength, allowed_masks, NO_TRUMP_PLAYED
 from jass.game.game_rule import GameRule
 from jass.game.game_state import GameState
 
@@ -22,8 +22,9 @@ class RuleSchieber(GameRule):
                         move_nr: int,
                         trump: int or None) -> np.array:
         """
-        Get the valid cards that can be played by the current player. (It is implemented as one long function
-        in order to take advantage of intermediate results of calculation.)
+        Get the valid cards that can be played by the current player. The cards allowed in the context of the trick
+        are looked up in the table allowed_masks, only the two exceptions (only the trump jack or only trumps left)
+        need to be checked separately.
 
         Args:
             hand: one-hot encoded array of hands owned by the player
@@ -38,113 +39,80 @@ class RuleSchieber(GameRule):
         if move_nr == 0:
             return hand
 
-        # get the color of the first played card and check if we have that color
+        # get the color of the first played card and check if we have that color (the cards of a color are
+        # consecutive)
         color_played = color_of_card[current_trick[0]]
-        have_color_played = (np.sum(hand * color_masks[color_played, :]) > 0)
+        have_color_played = int(hand[color_played * 9:color_played * 9 + 9].any())
 
-        if trump >= 4:
-            # obe or une declared
-            if have_color_played:
-                # must give the correct color
-                return hand * color_masks[color_played, :]
-            else:
-                # play anything, if we don't have the color
-                return hand
-        else:
-            #
-            # round with trumps declared (not 'obe' or 'une')
-            #
-
-            # check number of trumps we have and number of cards left, in order to simplify some of the conditions
-            number_of_trumps = np.sum(hand * color_masks[trump, :])
-            number_of_cards = np.sum(hand)
-
-            #
-            # the played color was trump
-            #
+        lowest_trump_played = -1
+        if trump < 4:
+            trump_cards = hand[trump * 9:trump * 9 + 9]
             if color_played == trump:
-                if number_of_trumps == 0:
-                    # no more trumps, play anything
+                if trump_cards[J_offset] and trump_cards.sum() == 1:
+                    # we have only the trump jack, so we can play anything
                     return hand
-                elif number_of_trumps == 1:
-                    if hand[trump * 9 + J_offset]:
-                        # we have only trump jack, so we can play anything
-                        return hand
-                    else:
-                        # we have just one trump and must play it
-                        return hand * color_masks[trump, :]
-                else:
-                    # we have more than one trump, so we must play one of them
-                    return hand * color_masks[trump, :]
-            #
-            # the played color was not trump
-            #
             else:
-                # check if anybody else (player 1 or player 2) played a trump, and if yes how high
-                lowest_trump_played = None
-                trump_played = False
+                # check if player 1 or player 2 played a trump, and if yes, which one is the lowest (lower cards
+                # have a higher index value)
+                for card in current_trick[1:min(move_nr, 3)]:
+                    if color_of_card[card] == trump and card > lowest_trump_played:
+                        lowest_trump_played = card
+                if lowest_trump_played != -1 and trump_cards.sum() == hand.sum():
+                    # we have only trump left, so we can give any of them
+                    return hand
 
-                if move_nr > 1:
-                    # check player 1
-                    if color_of_card[current_trick[1]] == trump:
-                        trump_played = True
-                        lowest_trump_played = current_trick[1]
-                    # check player 2
-                    if move_nr == 3:
-                        if color_of_card[current_trick[2]] == trump:
-                            trump_played = True
-                            if lowest_trump_played is not None:
-                                # 2 trumps were played, so we must compare
-                                if lowest_trump_played < current_trick[2]:
-                                    # move from player 2 is lower (as its index value is higher)
-                                    lowest_trump_played = current_trick[2]
-                            else:
-                                # this is the only trump played, so it is the lowest
-                                lowest_trump_played = current_trick[2]
-
-                #
-                # nobody played a trump, so we do not need to consider any restrictions on playing trump ourselves
-                #
-                if not trump_played:
-                    if have_color_played:
-                        # must give a color or can give any trump
-                        color_cards = hand * color_masks[color_played, :]
-                        trump_cards = hand * color_masks[trump, :]
-                        return color_cards + trump_cards
-                    else:
-                        # we do not have the color, so we can play anything, including any trump
-                        return hand
-
-                #
-                # somebody played a trump, so we have the restriction that we can not play a lower trump, with
-                # the exception if we only have trump left
-                #
-                else:
-                    if number_of_trumps == number_of_cards:
-                        # we have only trump left, so we can give any of them
-                        return hand
-                    else:
-                        #
-                        # find the valid trumps to play
-                        #
+        if lowest_trump_played == -1:
+            return hand * allowed_masks[have_color_played, trump, color_played, NO_TRUMP_PLAYED]
+        return hand * allowed_masks[have_color_played, trump, color_played, lowest_trump_played - trump * 9]
 
-                        # all trumps in hand
-                        trump_cards = hand * color_masks[trump, :]
+    def get_valid_cards_batch(self, hands: np.ndarray,
+                              current_tricks: np.ndarray,
+                              move_nrs: np.ndarray,
+                              trumps: np.ndarray) -> np.ndarray:
+        """
+        Get the valid cards for a batch of positions. The result is the same as calling get_valid_cards for each
+        position, but the calculation is done with array operations on the whole batch.
 
-                        # higher trump cards in hand
-                        higher_trump_cards = trump_cards * higher_trump[lowest_trump_played, :]
+        Args:
+            hands: [N,36] one-hot encoded arrays of the hands of the players to move
+            current_tricks: [N,4] arrays with the indices of the cards in the current tricks (-1 if not played)
+            move_nrs: [N] which move the players have to make in the current trick
+            trumps: [N] trump of each position
 
-                        # lower trump cards in hand
-                        lower_trump_cards = trump_cards * lower_trump[lowest_trump_played, :]
+        Returns:
+            [N,36] one-hot encoded arrays of valid moves
+        """
+        hands = np.asarray(hands)
+        current_tricks = np.asarray(current_tricks)
+        move_nrs = np.asarray(move_nrs)
+        trumps = np.asarray(trumps)
+        n = hands.shape[0]
 
-                    if have_color_played:
-                        # must give a color or a higher trump
-                        color_cards = hand * color_masks[color_played, :]
-                        return color_cards + higher_trump_cards
-                    else:
-                        # play anything except a lower trump
-                        not_lower_trump_cards = 1 - lower_trump_cards
-                        return hand * not_lower_trump_cards
+        # the color played is set to a valid value (0) where no card is played yet, these entries are not used for
+        # the result
+        color_played = color_of_card[np.maximum(current_tricks[:, 0], 0)]
+        have_color_played = (hands * color_masks[color_played, :]).any(axis=1)
+        trump_color = np.where(trumps < 4, trumps, 0)
+        number_of_trumps = (hands * color_masks[trump_color, :]).sum(axis=1)
+        number_of_cards = hands.sum(axis=1)
+        have_only_trump_jack = (color_played == trumps) & (number_of_trumps == 1) & \
+                               (hands[np.arange(n), trump_color * 9 + J_offset] == 1)
+
+        # the lowest trump (the one with the highest index) played by player 1 and 2 in the current trick, if the
+        # color played is not trump
+        cards_1_2 = current_tricks[:, 1:3]
+        is_trump_1_2 = (color_of_card[np.maximum(cards_1_2, 0)] == trumps[:, np.newaxis]) & \
+                       (np.arange(1, 3)[np.newaxis, :] < move_nrs[:, np.newaxis]) & \
+                       (cards_1_2 >= 0) & \
+                       (color_played != trumps)[:, np.newaxis]
+        lowest_trump_played = np.where(is_trump_1_2, cards_1_2, -1).max(axis=1)
+        trump_played = lowest_trump_played >= 0
+        have_only_trump = trump_played & (number_of_trumps == number_of_cards)
+
+        masks = allowed_masks[have_color_played.astype(np.int32), trumps, color_played,
+                              np.where(trump_played, lowest_trump_played - trump_color * 9, NO_TRUMP_PLAYED)]
+        any_card = (move_nrs == 0) | have_only_trump_jack | have_only_trump
+        return np.where(any_card[:, np.newaxis], hands, hands * masks)
 
     def calc_points(self, trick: np.ndarray, is_last: bool, trump: int = -1) -> int:
         """
@@ -231,6 +199,45 @@ class RuleSchieber(GameRule):
         # adjust actual winner by first player
         return (first_player - winner) % 4
 
+    def calc_points_batch(self, tricks: np.ndarray, is_last: np.ndarray or bool, trumps: np.ndarray) -> np.ndarray:
+        """
+        Calculate the points of a batch of completed tricks.
+
+        Args:
+            tricks: [N,4] array of the cards in the tricks
+            is_last: [N] array, true if the trick is the last trick of the game (or a single value for all tricks)
+            trumps: [N] trump for each trick
+        Returns:
+            [N] array of the points of the tricks
+        """
+        tricks = np.asarray(tricks)
+        trumps = np.asarray(trumps)
+        points = card_values[trumps[:, np.newaxis], tricks].sum(axis=1)
+        return points + 5 * np.asarray(is_last, dtype=np.int32)
+
+    def calc_winner_batch(self, tricks: np.ndarray, first_player: np.ndarray, trumps: np.ndarray) -> np.ndarray:
+        """
+        Calculate the winners of a batch of completed tricks using the table of the card strengths: only trumps
+        and cards of the first color can win the trick, and the one with the highest strength wins.
+
+        Precondition:
+            0 <= tricks[:, i] <= 35, for i = 0..3
+        Args:
+            tricks: [N,4] array of the cards in the tricks
+            first_player: [N] first player of each trick
+            trumps: [N] trump for each trick
+        Returns:
+            [N] array of the players who won the tricks
+        """
+        tricks = np.asarray(tricks)
+        trumps = np.asarray(trumps)
+        colors = color_of_card[tricks]
+        can_win = (colors == colors[:, 0:1]) | (colors == trumps[:, np.newaxis])
+        strength = card_strength[trumps[:, np.newaxis], tricks] * can_win
+        winner = strength.argmax(axis=1)
+        # adjust actual winner by first player
+        return (np.asarray(first_player) - winner) % 4
+
     def assert_invariants(self, state: GameState) -> None:
         """
         Validates the internal consistency of the state according to the rules and throws an assertion exception if an
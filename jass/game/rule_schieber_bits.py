@@ -0,0 +1,146 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+from typing import List
+
+import numpy as np
+
+from jass.game.const import color_of_card, card_values, card_bits, color_masks_bits, lower_trump_bits, \
+    trump_jack_bits, allowed_masks_bits, UNE_UFE, OBE_ABE, NO_TRUMP_PLAYED
+
+# python list versions of the tables, indexing lists with ints is much faster than indexing numpy arrays
+_color_of_card = color_of_card.tolist()
+_card_values = card_values.tolist()
+
+
+class RuleSchieberBits:
+    """
+    Rules for the jass game for the variation 'Schieber', operating on the bitboard representation of the cards.
+    Hands and valid cards are single ints with bit i set if card i is in the set (see const.py), the cards in a
+    trick are int encoded as in RuleSchieber.
+
+    The results are the same as the ones of RuleSchieber, but the methods are considerably faster for single
+    positions, which makes them suitable for rollouts and search.
+    """
+
+    def get_valid_cards(self, hand: int,
+                        current_trick: np.ndarray or List[int],
+                        move_nr: int,
+                        trump: int) -> int:
+        """
+        Get the valid cards that can be played by the current player.
+
+        Args:
+            hand: bitboard of the cards owned by the player
+            current_trick: array with the indices of the cards for the previous moves in the current trick
+            move_nr: which move the player has to make in the current trick, 0 for first move, 1 for second and so on
+            trump: trump color (or 'obe', 'une')
+
+        Returns:
+            bitboard of the valid moves
+        """
+        # play anything on the first move
+        if move_nr == 0:
+            return hand
+
+        color_played = _color_of_card[current_trick[0]]
+        have_color_played = 1 if hand & color_masks_bits[color_played] else 0
+
+        lowest_trump_played = -1
+        if trump < 4:
+            trump_cards = hand & color_masks_bits[trump]
+            if color_played == trump:
+                if trump_cards == trump_jack_bits[trump]:
+                    # we have only the trump jack, so we can play anything
+                    return hand
+            else:
+                # check if player 1 or player 2 played a trump, and if yes, which one is the lowest (lower cards
+                # have a higher index value)
+                if move_nr > 1 and _color_of_card[current_trick[1]] == trump:
+                    lowest_trump_played = current_trick[1]
+                if move_nr == 3 and _color_of_card[current_trick[2]] == trump and \
+                        current_trick[2] > lowest_trump_played:
+                    lowest_trump_played = current_trick[2]
+                if lowest_trump_played != -1 and trump_cards == hand:
+                    # we have only trump left, so we can give any of them
+                    return hand
+
+        if lowest_trump_played == -1:
+            return hand & allowed_masks_bits[have_color_played][trump][color_played][NO_TRUMP_PLAYED]
+        return hand & allowed_masks_bits[have_color_played][trump][color_played][lowest_trump_played - trump * 9]
+
+    def calc_points(self, trick: np.ndarray or List[int], is_last: bool, trump: int = -1) -> int:
+        """
+        Calculate the points from the cards in the trick according to the given trump
+
+        Args:
+            trick: the trick, int encoded
+            is_last: true if this is the last trick
+            trump: trump for the round
+        """
+        values = _card_values[trump]
+        return values[trick[0]] + values[trick[1]] + values[trick[2]] + values[trick[3]] + (5 if is_last else 0)
+
+    def calc_points_bits(self, cards: int, trump: int) -> int:
+        """
+        Calculate the points of a set of cards, for example the cards won by a team.
+
+        Args:
+            cards: bitboard of the cards
+            trump: trump for the round
+        Returns:
+            the sum of the card values (without the bonus for the last trick)
+        """
+        values = _card_values[trump]
+        points = 0
+        while cards:
+            lowest = cards & -cards
+            points += values[lowest.bit_length() - 1]
+            cards ^= lowest
+        return points
+
+    def calc_winner(self, trick: np.ndarray or List[int], first_player: int, trump: int = -1) -> int:
+        """
+        Calculate the winner of a completed trick.
+
+        Precondition:
+            0 <= trick[i] <= 35, for i = 0..3
+        Args:
+            trick: the completed trick, int encoded
+            first_player: the first player of the trick
+            trump: trump for the round
+        Returns:
+            the player who won this trick
+        """
+        color_of_first_card = _color_of_card[trick[0]]
+        winner = 0
+        winning_card = trick[0]
+        if trump == UNE_UFE:
+            # lowest card of first color wins (lower card values have a higher card index)
+            for i in range(1, 4):
+                if _color_of_card[trick[i]] == color_of_first_card and trick[i] > winning_card:
+                    winning_card = trick[i]
+                    winner = i
+        elif trump == OBE_ABE:
+            # highest card of first color wins
+            for i in range(1, 4):
+                if _color_of_card[trick[i]] == color_of_first_card and trick[i] < winning_card:
+                    winning_card = trick[i]
+                    winner = i
+        else:
+            # the winning card is a trump, if the first card or any later card was a trump
+            trump_played = color_of_first_card == trump
+            for i in range(1, 4):
+                card = trick[i]
+                if _color_of_card[card] == trump:
+                    if not trump_played or lower_trump_bits[card] & card_bits[winning_card]:
+                        # first trump, or higher than the previous trump
+                        trump_played = True
+                        winning_card = card
+                        winner = i
+                elif not trump_played and _color_of_card[card] == color_of_first_card and card < winning_card:
+                    winning_card = card
+                    winner = i
+        # adjust actual winner by first player
+        return (first_player - winner) % 4
@@ -0,0 +1,129 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+"""
+Zobrist hashing of game states and a transposition table for search agents.
+
+The key of a state is the xor of random 64 bit numbers for
+- each card in a hand, by card and owner
+- each card in the current trick, by card and position in the trick
+- the trump
+- the player to play
+
+The cards played in completed tricks (and therefore the points so far) are not part of the key: states with the
+same key have the same remaining game, so values stored relative to the points so far can be shared.
+
+The random numbers are generated from a fixed seed with the numpy generator, so the keys are the same in all
+processes and runs, and tables can be shared between processes or stored.
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from jass.game.game_state import GameState
+
+ZOBRIST_SEED = 0x4A415353
+
+_rng = np.random.default_rng(ZOBRIST_SEED)
+
+# python ints, as xor on ints is faster than on numpy scalars
+zobrist_card_owner = [[int(key) for key in row]
+                      for row in _rng.integers(0, 2 ** 64, size=(36, 4), dtype=np.uint64)]
+zobrist_trick_card = [[int(key) for key in row]
+                      for row in _rng.integers(0, 2 ** 64, size=(4, 36), dtype=np.uint64)]
+# the last entry (index -1) is used if trump is not yet selected or if there is no player to play
+zobrist_trump = [int(key) for key in _rng.integers(0, 2 ** 64, size=6, dtype=np.uint64)] + [0]
+zobrist_player = [int(key) for key in _rng.integers(0, 2 ** 64, size=4, dtype=np.uint64)] + [0]
+
+
+def zobrist_hash(state: GameState) -> int:
+    """
+    Calculate the zobrist key of a state from scratch.
+
+    Args:
+        state: the state
+
+    Returns:
+        the key as a 64 bit int
+    """
+    key = zobrist_trump[state.trump] ^ zobrist_player[state.player]
+    for player in range(4):
+        for card in np.flatnonzero(state.hands[player]):
+            key ^= zobrist_card_owner[card][player]
+    if state.nr_tricks < 9:
+        for position in range(state.nr_cards_in_trick):
+            key ^= zobrist_trick_card[position][state.current_trick[position]]
+    return key
+
+
+class TranspositionEntry(NamedTuple):
+    key: int
+    depth: int
+    lower: float
+    upper: float
+    best_move: int
+    generation: int
+
+
+class TranspositionTable:
+    """
+    Transposition table with a fixed number of slots, indexed by the lower bits of the zobrist key. Each entry
+    stores the depth of the search, a lower and an upper bound of the value and the best move.
+
+    When two keys map to the same slot, the entry of the deeper search is kept, unless it is from an older
+    search (see new_search), entries of older searches are always replaced.
+    """
+
+    def __init__(self, size_bits: int = 20):
+        """
+        Args:
+            size_bits: the table has 2**size_bits slots
+        """
+        self._mask = (1 << size_bits) - 1
+        self._slots = [None] * (1 << size_bits)
+        self._generation = 0
+        self.nr_stores = 0
+        self.nr_hits = 0
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._slots)
+
+    def new_search(self) -> None:
+        """
+        Mark the entries stored so far as old, so that they are replaced first.
+        """
+        self._generation += 1
+
+    def clear(self) -> None:
+        self._slots = [None] * len(self._slots)
+
+    def lookup(self, key: int) -> Optional[TranspositionEntry]:
+        """
+        Get the entry for a key.
+
+        Returns:
+            the entry or None if the key is not in the table
+        """
+        entry = self._slots[key & self._mask]
+        if entry is not None and entry.key == key:
+            self.nr_hits += 1
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, lower: float, upper: float, best_move: int = -1) -> None:
+        """
+        Store the result of a search, if the replacement policy allows it.
+
+        Args:
+            key: zobrist key of the position
+            depth: depth of the search
+            lower: lower bound of the value
+            upper: upper bound of the value
+            best_move: best move found, or -1
+        """
+        index = key & self._mask
+        entry = self._slots[index]
+        if entry is None or entry.key == key or entry.generation != self._generation or depth >= entry.depth:
+            self._slots[index] = TranspositionEntry(key, depth, lower, upper, best_move, self._generation)
+            self.nr_stores += 1
@@ -0,0 +1,186 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+
+from jass.game.game_rule import GameRule
+from jass.game.game_state import GameState
+from jass.game.rule_schieber import RuleSchieber
+from jass.logs.game_log_entry import GameLogEntry
+
+# dtype of the records in the archive: the binary representation of the game, the date (in seconds since 1.1.1970,
+# not time zone aware like the dates in the json logs) and the ids of the players
+GAME_RECORD_DTYPE = np.dtype([
+    ('game', GameState.BYTES_DTYPE),
+    ('date', np.int64),
+    ('player_ids', np.int32, (4,))
+])
+
+# value of the date in the record, if no date is available
+NO_DATE = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class GameArchiveWriter:
+    """
+    Write games to an archive of fixed-width binary records that can be read using GameArchiveReader. The
+    archive consists of a data file containing the records and a small index file (json) containing the format
+    version and the number of records.
+
+    The class should be used as a context manager within "with" in python, similar to LogEntryFileGenerator.
+    """
+    EXTENSION = '.games'
+    INDEX_EXTENSION = '.games.json'
+    FORMAT_VERSION = 'V0.1'
+
+    def __init__(self, basename: str, max_buffer: int = 10000):
+        """
+        Initialize the writer.
+
+        Args:
+            basename: basename of the generated files, this should include the whole file path
+            max_buffer: number of records that are collected before writing them to the file
+        """
+        self._basename = basename
+        self._buffer = np.zeros(max_buffer, dtype=GAME_RECORD_DTYPE)
+        self._nr_in_buffer = 0
+        self._nr_records = 0
+        self._file = None
+
+    def __enter__(self):
+        """
+        Start of context region, opens the file.
+        """
+        filename = self._basename + GameArchiveWriter.EXTENSION
+        logging.getLogger(__name__).info('Writing file: {}'.format(filename))
+        self._file = open(filename, mode='wb')
+        self._nr_records = 0
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        End of context region, writes the buffer, closes the file and writes the index.
+        """
+        self._write_buffer()
+        self._file.close()
+        self._file = None
+        with open(self._basename + GameArchiveWriter.INDEX_EXTENSION, mode='w') as file:
+            json.dump(dict(version=GameArchiveWriter.FORMAT_VERSION,
+                           nr_records=self._nr_records,
+                           record_size=GAME_RECORD_DTYPE.itemsize), file)
+
+    def _write_buffer(self):
+        if self._nr_in_buffer > 0:
+            self._file.write(self._buffer[0:self._nr_in_buffer].tobytes())
+            self._nr_records += self._nr_in_buffer
+            self._nr_in_buffer = 0
+
+    def add_game(self, game: GameState, date: datetime = None, player_ids: List[int] = None) -> None:
+        """
+        Add a game to the archive.
+
+        Args:
+            game: the game to add
+            date: the date when the game was played
+            player_ids: information about the players
+        """
+        record = self._buffer[self._nr_in_buffer]
+        record['game'] = game.to_record()
+        record['date'] = NO_DATE if date is None else int((date - _EPOCH).total_seconds())
+        record['player_ids'] = [0, 0, 0, 0] if player_ids is None else player_ids
+        self._nr_in_buffer += 1
+        if self._nr_in_buffer == self._buffer.shape[0]:
+            self._write_buffer()
+
+    def add_entry(self, entry: GameLogEntry) -> None:
+        """
+        Add a game log entry to the archive.
+
+        Args:
+            entry: entry to add
+        """
+        self.add_game(entry.game, entry.date, entry.player_ids)
+
+
+class GameArchiveReader:
+    """
+    Read an archive written by GameArchiveWriter. The records are memory mapped, so opening an archive does not
+    read the file, and the games can be accessed randomly by their index. The raw records can be used directly for
+    array operations (see GameState.BYTES_DTYPE), or converted to GameState or GameLogEntry objects.
+    """
+
+    def __init__(self, basename: str, rule: GameRule = None):
+        """
+        Open the archive.
+
+        Args:
+            basename: basename of the archive files, this should include the whole file path
+            rule: rule used to restore the games, RuleSchieber if None
+        """
+        with open(basename + GameArchiveWriter.INDEX_EXTENSION, mode='r') as file:
+            index = json.load(file)
+        if index['version'] != GameArchiveWriter.FORMAT_VERSION:
+            raise ValueError('Unexpected format version: {}'.format(index['version']))
+        if index['record_size'] != GAME_RECORD_DTYPE.itemsize:
+            raise ValueError('Unexpected record size: {}'.format(index['record_size']))
+
+        self._rule = rule if rule is not None else RuleSchieber()
+        self._nr_records = index['nr_records']
+        if self._nr_records > 0:
+            self._records = np.memmap(basename + GameArchiveWriter.EXTENSION, dtype=GAME_RECORD_DTYPE,
+                                      mode='r', shape=(self._nr_records,))
+        else:
+            self._records = np.zeros(0, dtype=GAME_RECORD_DTYPE)
+
+    def __len__(self) -> int:
+        return self._nr_records
+
+    @property
+    def records(self) -> np.ndarray:
+        """
+        Returns:
+            the (memory mapped) array of all the records
+        """
+        return self._records
+
+    def get_state(self, index: int) -> GameState:
+        """
+        Get a game from the archive.
+        Args:
+            index: index of the game
+        Returns:
+            the state of the game
+        """
+        return GameState.from_record(self._records[index]['game'], self._rule)
+
+    def get_states(self, start: int, stop: int) -> List[GameState]:
+        """
+        Get the games in a range of the archive.
+        Args:
+            start: index of the first game
+            stop: index after the last game
+        Returns:
+            list of the states of the games
+        """
+        return [GameState.from_record(record, self._rule) for record in self._records[start:stop]['game']]
+
+    def get_entry(self, index: int) -> GameLogEntry:
+        """
+        Get a game from the archive together with its date and the player ids.
+        Args:
+            index: index of the game
+        Returns:
+            the game log entry
+        """
+        record = self._records[index]
+        date = None if record['date'] == NO_DATE else _EPOCH + timedelta(seconds=int(record['date']))
+        return GameLogEntry(game=GameState.from_record(record['game'], self._rule),
+                            date=date,
+                            player_ids=record['player_ids'].tolist())
@@ -0,0 +1,106 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+import threading
+
+import numpy as np
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies (in seconds) with logarithmically spaced bins, that can be updated from several threads.
+
+    The bins range from min_latency to max_latency, with an additional bin below and above the range. Percentiles
+    are estimated from the upper edges of the bins, so their precision depends on the number of bins per decade.
+    """
+    def __init__(self, min_latency: float = 1e-4, max_latency: float = 100.0, bins_per_decade: int = 20):
+        nr_decades = np.log10(max_latency / min_latency)
+        nr_edges = int(round(nr_decades * bins_per_decade)) + 1
+        self._edges = np.logspace(np.log10(min_latency), np.log10(max_latency), nr_edges)
+        self._counts = np.zeros(nr_edges + 1, dtype=np.int64)
+        self._sum = 0.0
+        self._min = float('inf')
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def edges(self) -> np.ndarray:
+        return self._edges
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        Returns:
+            the counts of the bins, bin i contains latencies in [edges[i-1], edges[i])
+        """
+        return self._counts
+
+    @property
+    def count(self) -> int:
+        return int(self._counts.sum())
+
+    def record(self, latency: float) -> None:
+        """
+        Add a latency to the histogram.
+        Args:
+            latency: latency in seconds
+        """
+        index = np.searchsorted(self._edges, latency, side='right')
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += latency
+            self._min = min(self._min, latency)
+            self._max = max(self._max, latency)
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """
+        Add the counts of another histogram with the same bins.
+        """
+        if not np.array_equal(self._edges, other.edges):
+            raise ValueError('Histograms with different bins can not be merged')
+        with self._lock:
+            self._counts += other.counts
+            self._sum += other._sum
+            self._min = min(self._min, other._min)
+            self._max = max(self._max, other._max)
+
+    def mean(self) -> float:
+        count = self.count
+        return self._sum / count if count > 0 else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate a percentile of the latencies.
+        Args:
+            q: percentile between 0 and 100
+        Returns:
+            the upper edge of the bin containing the percentile (limited by the maximal latency), 0 if empty
+        """
+        count = self.count
+        if count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self._counts), q / 100.0 * count, side='left'))
+        if index >= self._edges.shape[0]:
+            return self._max
+        return min(float(self._edges[index]), self._max)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            summary of the histogram as dict (for example to save as json)
+        """
+        return dict(count=self.count,
+                    mean=self.mean(),
+                    min=self._min if self.count > 0 else 0.0,
+                    max=self._max,
+                    p50=self.percentile(50),
+                    p90=self.percentile(90),
+                    p99=self.percentile(99),
+                    edges=self._edges.tolist(),
+                    counts=self._counts.tolist())
+
+    def __str__(self) -> str:
+        return 'count: {}, mean: {:.2f} ms, p50: {:.2f} ms, p90: {:.2f} ms, p99: {:.2f} ms, max: {:.2f} ms'.format(
+            self.count, self.mean() * 1000, self.percentile(50) * 1000, self.percentile(90) * 1000,
+            self.percentile(99) * 1000, self._max * 1000)
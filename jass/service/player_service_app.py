@@ -2,9 +2,13 @@
 #
 # Created by Thomas Koller on 12.10.18
 #
+import threading
+from collections import OrderedDict
 
 from flask import Flask
 from jass.agents.agent import Agent
+from jass.game.game_observation import GameObservation
+from jass.game.rule_schieber import RuleSchieber
 from jass.service.player_service_route import players
 
 
@@ -17,7 +21,8 @@ class PlayerServiceApp(Flask):
                  template_folder='templates',
                  instance_path=None,
                  instance_relative_config=False,
-                 root_path=None):
+                 root_path=None,
+                 max_sessions: int = 1000):
         super(PlayerServiceApp, self).__init__(import_name,
                                                static_url_path=static_url_path,
                                                static_folder=static_folder,
@@ -31,6 +36,13 @@ class PlayerServiceApp(Flask):
         self.players = {}
         self.register_blueprint(players)
 
+        # observations of the running games for the session protocol, by (player name, game id), the least
+        # recently used sessions are removed when there are more than max_sessions
+        self.rule = RuleSchieber()
+        self._sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._max_sessions = max_sessions
+
     def add_player(self, player_name: str, player: Agent):
         self.players[player_name] = player
 
@@ -39,3 +51,42 @@ class PlayerServiceApp(Flask):
 
     def get_players(self):
         return [name for name in self.players.keys()]
+
+    def set_session_observation(self, player_name: str, game_id, obs: GameObservation) -> None:
+        """
+        Store the observation of a game for the session protocol.
+        Args:
+            player_name: name of the player
+            game_id: id of the game, supplied by the client
+            obs: observation to store
+        """
+        with self._sessions_lock:
+            self._sessions[(player_name, game_id)] = obs
+            self._sessions.move_to_end((player_name, game_id))
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get_session_observation(self, player_name: str, game_id) -> GameObservation or None:
+        """
+        Get the stored observation of a game.
+        Args:
+            player_name: name of the player
+            game_id: id of the game
+        Returns:
+            the observation or None if there is no session for the game
+        """
+        with self._sessions_lock:
+            obs = self._sessions.get((player_name, game_id))
+            if obs is not None:
+                self._sessions.move_to_end((player_name, game_id))
+            return obs
+
+    def remove_session(self, player_name: str, game_id) -> None:
+        """
+        Remove the stored observation of a game, if it exists.
+        Args:
+            player_name: name of the player
+            game_id: id of the game
+        """
+        with self._sessions_lock:
+            self._sessions.pop((player_name, game_id), None)
@@ -9,20 +9,53 @@
 Code for the Jass player web interface, i.e. the "web part" receiving requests and serving them accordingly.
 This file handles requests like action_trump and action_play_card and delegates them to a one of the registered Jass
 agents.
+
+The action_play_card request supports a session protocol to reduce the size of the requests: the client sends the
+full observation with the additional entries gameId and session=true once per game, the observation is then
+stored by the service. The following requests for the game only contain the gameId, the cards played since the last
+request (including the card played by the player itself) and the total number of played cards, for example
+    {"gameId": "5e1f", "cards": ["DA", "D6", "DQ", "H7"], "nrPlayedCards": 8}
+If there is no stored observation for the game (or it does not match), the service answers with CONFLICT and the
+client must send the full observation again.
+
+The batch requests action_play_card_batch and action_trump_batch contain a list of (full) observations, for
+example from different games, in the entry observations, and are answered with the list of the actions in the entry
+cards or trumps respectively. They are forwarded to action_play_card_batch and action_trump_batch of the agent.
+
+For agents with a time budget (attribute time_budget, for example AgentMCTS), the action_play_card and action_trump
+requests can contain the entry timeBudget with the time in seconds to use for this decision. If the agent reports
+information about its search (attribute last_search_info), it is returned in the entry searchInfo of the response.
 """
 
 import logging
+from contextlib import contextmanager
 from http import HTTPStatus
 
 from flask import request, jsonify, Blueprint, current_app
 
-from jass.game.const import card_strings
+from jass.game.const import card_strings, card_ids
 from jass.game.game_observation import GameObservation
+from jass.game.game_state_util import observation_play_card
 
 JASS_PATH_PREFIX = '/jass/players/'
 SELECT_TRUMP_PATH_PREFIX = '/action_trump'
 PLAY_CARD_PATH_PREFIX = '/action_play_card'
 SEND_INFO_PREFIX = '/game_info'
+SELECT_TRUMP_BATCH_PATH_PREFIX = '/action_trump_batch'
+PLAY_CARD_BATCH_PATH_PREFIX = '/action_play_card_batch'
+
+# entries of the requests for the session protocol
+GAME_ID_KEY = 'gameId'
+SESSION_KEY = 'session'
+DELTA_CARDS_KEY = 'cards'
+DELTA_NR_PLAYED_CARDS_KEY = 'nrPlayedCards'
+
+# entry of the batch requests
+OBSERVATIONS_KEY = 'observations'
+
+# entries for agents with a time budget
+TIME_BUDGET_KEY = 'timeBudget'
+SEARCH_INFO_KEY = 'searchInfo'
 
 players = Blueprint(JASS_PATH_PREFIX, __name__)
 
@@ -49,21 +82,85 @@ def action_play_card(player_name: str):
 
     try:
         request_dict = request.get_json()
-        obs = GameObservation.from_json(request_dict)
+        session = DELTA_CARDS_KEY in request_dict or request_dict.get(SESSION_KEY, False)
+        if DELTA_CARDS_KEY in request_dict:
+            obs = _observation_from_delta(player_name, request_dict)
+            if obs is None:
+                logging.info('no session for game {}'.format(request_dict[GAME_ID_KEY]))
+                return jsonify(error='no session for game'), HTTPStatus.CONFLICT
+        else:
+            obs = GameObservation.from_json(request_dict)
+            if request_dict.get(SESSION_KEY, False):
+                current_app.set_session_observation(player_name, request_dict[GAME_ID_KEY], obs)
     except Exception as e:
         logging.warning('Error parsing request to GameObservation')
         return jsonify(error=str(e)), HTTPStatus.BAD_REQUEST
 
     try:
-        card = player.action_play_card(obs)
+        with _time_budget(player, request_dict):
+            card = player.action_play_card(obs)
+        # the session is not needed anymore after the last card of the player
+        if session and obs.hand.sum() <= 1:
+            current_app.remove_session(player_name, request_dict[GAME_ID_KEY])
         # convert card from int to string
         data = dict(card=card_strings[card])
+        _add_search_info(player, data)
         return jsonify(data), HTTPStatus.OK
     except Exception as e:
         logging.warning('Error in action_play_card')
         return jsonify(error=str(e)), HTTPStatus.INTERNAL_SERVER_ERROR
 
 
+@contextmanager
+def _time_budget(player, request_dict: dict):
+    """
+    Set the time budget of the request for the agent (or the agent of the thread for a ThreadLocalAgent) during the
+    request, if the request contains a time budget and the agent supports it.
+    """
+    agent = getattr(player, 'agent', player)
+    budget = request_dict.get(TIME_BUDGET_KEY)
+    if budget is None or not hasattr(agent, 'time_budget'):
+        yield
+        return
+    previous_budget = agent.time_budget
+    agent.time_budget = float(budget)
+    try:
+        yield
+    finally:
+        agent.time_budget = previous_budget
+
+
+def _add_search_info(player, data: dict) -> None:
+    """
+    Add the information about the last search of the agent to the response data, if the agent provides it.
+    """
+    search_info = getattr(getattr(player, 'agent', player), 'last_search_info', None)
+    if search_info:
+        data[SEARCH_INFO_KEY] = search_info
+
+
+def _observation_from_delta(player_name: str, request_dict: dict) -> GameObservation or None:
+    """
+    Update the stored observation of a game with the cards of a delta request.
+    Args:
+        player_name: the name of the player
+        request_dict: the data of the request
+    Returns:
+        the updated observation or None if there is no matching stored observation
+    """
+    game_id = request_dict[GAME_ID_KEY]
+    obs = current_app.get_session_observation(player_name, game_id)
+    if obs is None:
+        return None
+    cards = [card_ids[card] for card in request_dict[DELTA_CARDS_KEY]]
+    if obs.nr_played_cards + len(cards) != request_dict[DELTA_NR_PLAYED_CARDS_KEY]:
+        current_app.remove_session(player_name, game_id)
+        return None
+    for card in cards:
+        observation_play_card(obs, card, current_app.rule)
+    return obs
+
+
 @players.route('/<string:player_name>' + SELECT_TRUMP_PATH_PREFIX, methods=['POST'])
 def action_trump(player_name: str):
     """
@@ -94,14 +191,82 @@ def action_trump(player_name: str):
         return jsonify(error=str(e)), HTTPStatus.BAD_REQUEST
 
     try:
-        trump = player.action_trump(obs)
+        with _time_budget(player, request_dict):
+            trump = player.action_trump(obs)
         data = dict(trump=trump)
+        _add_search_info(player, data)
         return jsonify(data), HTTPStatus.OK
     except Exception as e:
         logging.warning('Error in action_trump: {}'.format(e))
         return jsonify(error=str(e)), HTTPStatus.INTERNAL_SERVER_ERROR
 
 
+@players.route('/<string:player_name>' + PLAY_CARD_BATCH_PATH_PREFIX, methods=['POST'])
+def action_play_card_batch(player_name: str):
+    """
+    Takes a action_play_card_batch request with a list of observations and returns the list of cards to play.
+    Args:
+        player_name: the name of the desired player
+    Returns:
+        the http response to answer the given request
+    """
+    player = current_app.get_player_for_name(player_name)
+    if player is None:
+        logging.warning('player {} not found'.format(player_name))
+        return jsonify(error='player not found'), HTTPStatus.BAD_REQUEST
+
+    if not request.is_json:
+        logging.warning('request is not json')
+        return jsonify(error='json data expected'), HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+    try:
+        observations = [GameObservation.from_json(data) for data in request.get_json()[OBSERVATIONS_KEY]]
+    except Exception as e:
+        logging.warning('Error parsing request to GameObservations')
+        return jsonify(error=str(e)), HTTPStatus.BAD_REQUEST
+
+    try:
+        cards = player.action_play_card_batch(observations)
+        data = dict(cards=[card_strings[card] for card in cards])
+        return jsonify(data), HTTPStatus.OK
+    except Exception as e:
+        logging.warning('Error in action_play_card_batch')
+        return jsonify(error=str(e)), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+@players.route('/<string:player_name>' + SELECT_TRUMP_BATCH_PATH_PREFIX, methods=['POST'])
+def action_trump_batch(player_name: str):
+    """
+    Takes a action_trump_batch request with a list of observations and returns the list of selected trumps.
+    Args:
+        player_name: the name of the desired player
+    Returns:
+        the http response to answer the given request
+    """
+    player = current_app.get_player_for_name(player_name)
+    if player is None:
+        logging.warning('player {} not found'.format(player_name))
+        return jsonify(error='player not found'), HTTPStatus.BAD_REQUEST
+
+    if not request.is_json:
+        logging.warning('request is not json')
+        return jsonify(error='json data expected'), HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+    try:
+        observations = [GameObservation.from_json(data) for data in request.get_json()[OBSERVATIONS_KEY]]
+    except Exception as e:
+        logging.warning('Error parsing request to GameObservations')
+        return jsonify(error=str(e)), HTTPStatus.BAD_REQUEST
+
+    try:
+        trumps = player.action_trump_batch(observations)
+        data = dict(trumps=[int(trump) for trump in trumps])
+        return jsonify(data), HTTPStatus.OK
+    except Exception as e:
+        logging.warning('Error in action_trump_batch: {}'.format(e))
+        return jsonify(error=str(e)), HTTPStatus.INTERNAL_SERVER_ERROR
+
+
 @players.route('/<string:player_name>' + SEND_INFO_PREFIX, methods=['POST'])
 def game_info(player_name: str):
     """
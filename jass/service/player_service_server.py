@@ -0,0 +1,175 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+"""
+Serving of the player service with several workers.
+
+Agents often keep state between calls (for example AgentNoob), so the same agent instance must not be used by
+several requests at the same time. The players are therefore registered with factories, and each thread of a worker
+creates its own agent instances (ThreadLocalAgent). The app itself is created by a factory in each worker process, so
+models are loaded (by the warmup hook) in the workers after they have been started.
+
+If gunicorn is installed, the service is run with gunicorn with several worker processes with several threads
+each, otherwise with the werkzeug server in a single process, which handles the requests by a fixed pool of threads
+(PooledWSGIServer), so that the agents of each thread are created and warmed up only once. The observations of the session protocol are
+stored per worker process, so a client using sessions needs more full requests (answered after a CONFLICT) if
+there are several worker processes.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from werkzeug.serving import BaseWSGIServer
+
+from jass.agents.agent import Agent
+from jass.game.game_observation import GameObservation
+from jass.service.player_service_app import PlayerServiceApp
+
+AgentFactory = Callable[[], Agent]
+
+
+class ThreadLocalAgent(Agent):
+    """
+    Agent that forwards the actions to an agent instance of the calling thread, which is created by a factory
+    on the first call of a thread.
+    """
+
+    def __init__(self, agent_factory: AgentFactory, warmup: Callable[[Agent], None] = None):
+        """
+        Args:
+            agent_factory: function to create an agent instance
+            warmup: function that is called with each new agent instance, for example to load a model
+        """
+        self._agent_factory = agent_factory
+        self._warmup = warmup
+        self._local = threading.local()
+
+    @property
+    def agent(self) -> Agent:
+        """
+        Returns:
+            the agent instance of the calling thread
+        """
+        agent = getattr(self._local, 'agent', None)
+        if agent is None:
+            agent = self._agent_factory()
+            if self._warmup is not None:
+                self._warmup(agent)
+            self._local.agent = agent
+        return agent
+
+    def action_trump(self, obs: GameObservation) -> int:
+        return self.agent.action_trump(obs)
+
+    def action_play_card(self, obs: GameObservation) -> int:
+        return self.agent.action_play_card(obs)
+
+    def action_trump_batch(self, observations):
+        return self.agent.action_trump_batch(observations)
+
+    def action_play_card_batch(self, observations):
+        return self.agent.action_play_card_batch(observations)
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    Werkzeug server that handles the requests by a fixed pool of long-lived threads. The threaded werkzeug server
+    starts a new thread for each request, so the agents of ThreadLocalAgent would be created and warmed up again
+    for every request.
+    """
+
+    def __init__(self, host: str, port: int, app: PlayerServiceApp, threads: int = 8):
+        """
+        Args:
+            host: host address to listen on
+            port: port to listen on, 0 to use any free port
+            app: the app to serve
+            threads: number of threads handling the requests
+        """
+        super().__init__(host, port, app)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='player_service')
+
+    def process_request(self, request, client_address) -> None:
+        self._executor.submit(self._process_request_in_thread, request, client_address)
+
+    def _process_request_in_thread(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def create_service_app(player_factories: Dict[str, AgentFactory],
+                       warmup: Callable[[Agent], None] = None,
+                       max_sessions: int = 1000) -> PlayerServiceApp:
+    """
+    Create a player service app in which each thread uses its own agent instances.
+
+    One agent instance of each player is created and warmed up immediately, so that errors (for example when
+    loading a model) are detected when the app is created.
+
+    Args:
+        player_factories: factories to create the agents by the name of the players
+        warmup: function that is called with each new agent instance
+        max_sessions: maximal number of sessions stored by the app
+
+    Returns:
+        the app
+    """
+    app = PlayerServiceApp('player_service', max_sessions=max_sessions)
+    for name, factory in player_factories.items():
+        player = ThreadLocalAgent(factory, warmup)
+        _ = player.agent
+        app.add_player(name, player)
+    return app
+
+
+def run_service(app_factory: Callable[[], PlayerServiceApp], host: str = '0.0.0.0', port: int = 8888,
+                workers: int = 4, threads: int = 8, timeout: int = 30) -> None:
+    """
+    Run the player service until it is stopped. Uses gunicorn if it is installed, otherwise the werkzeug server
+    with one process and a pool of threads (PooledWSGIServer).
+
+    Args:
+        app_factory: function to create the app, it is called in each worker process
+        host: host address to listen on
+        port: port to listen on
+        workers: number of worker processes (gunicorn only)
+        threads: number of threads per worker process
+        timeout: timeout of the workers in seconds (gunicorn only)
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        BaseApplication = None
+
+    if BaseApplication is None:
+        if workers > 1:
+            logger.warning('gunicorn not installed, serving with a single process')
+        server = PooledWSGIServer(host, port, app_factory(), threads=threads)
+        logger.info('Serving on {}:{}'.format(host, server.server_port))
+        server.serve_forever()
+        return
+
+    class _GunicornApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', '{}:{}'.format(host, port))
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', timeout)
+
+        def load(self):
+            # called in each worker process after fork
+            return app_factory()
+
+    _GunicornApplication().run()
@@ -0,0 +1,315 @@
+# HSLU
+#
+# Created on 17.10.2026
+#
+"""
+Conversion of files containing complete games (json log files or game archives) to datasets of observation
+features and actions, stored as numpy npz shards.
+
+The files are read in chunks of games that are distributed over a pool of worker processes, so the files never
+have to be loaded completely. Each worker calculates the features of all the observations of its chunk with
+array operations. Each shard contains the arrays:
+    features: [N, nr_features] int8 array of the observation features (see the FEATURES_ constants)
+    actions: [N] int32 array of the actions (card played, or trump action with PUSH encoded as PUSH_ALT)
+    player_ids: [N] int32 array of the ids of the players that made the actions
+"""
+import json
+import logging
+import multiprocessing
+import os
+from typing import List, Iterator
+
+import numpy as np
+
+from jass.game.const import next_player, PUSH_ALT
+from jass.game.game_state import GameState
+from jass.game.game_state_util import state_from_complete_game
+from jass.game.game_util import convert_str_encoded_cards_to_int_encoded
+from jass.game.rule_schieber import RuleSchieber
+from jass.logs.game_archive import GameArchiveWriter, GameArchiveReader
+
+# layout of the features for playing a card, the players are relative to the player to play: 0 for the player
+# itself, 1 for the next player, 2 for the partner and 3 for the previous player
+FEATURES_HAND = 0                                   # cards in the hand of the player (36)
+FEATURES_PLAYED = FEATURES_HAND + 36                # cards played so far by each (relative) player (4 * 36)
+FEATURES_TRICK = FEATURES_PLAYED + 4 * 36           # cards in the current trick (36)
+FEATURES_TRUMP = FEATURES_TRICK + 36                # trump, one-hot encoded (6)
+FEATURES_FOREHAND = FEATURES_TRUMP + 6              # 1 if trump was declared forehand (1)
+FEATURES_DECLARED_OWN = FEATURES_FOREHAND + 1       # 1 if trump was declared by the own team (1)
+NR_FEATURES = FEATURES_DECLARED_OWN + 1
+
+# layout of the features for selecting trump
+FEATURES_TRUMP_HAND = 0                             # cards in the hand of the player (36)
+FEATURES_TRUMP_REARHAND = FEATURES_TRUMP_HAND + 36  # 1 if the forehand player pushed (1)
+NR_FEATURES_TRUMP = FEATURES_TRUMP_REARHAND + 1
+
+_next_player = np.array(next_player, dtype=np.int32)
+
+
+def card_features_from_games(cards: np.ndarray, trick_first_player: np.ndarray, trumps: np.ndarray,
+                             forehands: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Calculate the features of the observations before each card played for a number of complete games.
+
+    Args:
+        cards: [G,36] array of the cards in the order they were played
+        trick_first_player: [G,9] array of the first players of the tricks
+        trumps: [G] array of the trumps
+        forehands: [G] array of the forehand values (1 if trump was declared forehand, 0 if rearhand)
+
+    Returns:
+        [G*36, NR_FEATURES] array of the features, [G*36] array of the cards played, [G*36] array of the players
+    """
+    nr_games = cards.shape[0]
+    games = np.arange(nr_games)[:, np.newaxis]
+
+    # player of each card played, and the owner and position in the game of each card
+    players = (trick_first_player[:, :, np.newaxis] - np.arange(4)[np.newaxis, np.newaxis, :]) % 4
+    players = players.reshape(nr_games, 36)
+    owner = np.zeros([nr_games, 36], dtype=np.int32)
+    owner[games, cards] = players
+    position = np.zeros([nr_games, 36], dtype=np.int32)
+    position[games, cards] = np.arange(36)
+
+    # [G, step, card] arrays
+    steps = np.arange(36)[np.newaxis, :, np.newaxis]
+    played_before = position[:, np.newaxis, :] < steps
+    in_trick = played_before & (position[:, np.newaxis, :] >= steps - steps % 4)
+    relative_owner = (players[:, :, np.newaxis] - owner[:, np.newaxis, :]) % 4
+
+    features = np.zeros([nr_games, 36, NR_FEATURES], dtype=np.int8)
+    features[:, :, FEATURES_HAND:FEATURES_HAND + 36] = (relative_owner == 0) & ~played_before
+    for relative_player in range(4):
+        start = FEATURES_PLAYED + relative_player * 36
+        features[:, :, start:start + 36] = (relative_owner == relative_player) & played_before
+    features[:, :, FEATURES_TRICK:FEATURES_TRICK + 36] = in_trick
+    features[games, :, FEATURES_TRUMP + trumps[:, np.newaxis]] = 1
+    features[:, :, FEATURES_FOREHAND] = (forehands == 1)[:, np.newaxis]
+
+    # trump was declared by the team of the forehand player, who plays the first card
+    features[:, :, FEATURES_DECLARED_OWN] = (players % 2) == (trick_first_player[:, 0:1] % 2)
+
+    return features.reshape(nr_games * 36, NR_FEATURES), cards.reshape(-1), players.reshape(-1)
+
+
+def trump_features_from_games(cards: np.ndarray, trick_first_player: np.ndarray, trumps: np.ndarray,
+                              forehands: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Calculate the features of the observations for trump selection for a number of complete games. There is one
+    observation for the forehand player, and one for the rearhand player if the forehand player pushed.
+
+    Args:
+        cards: [G,36] array of the cards in the order they were played
+        trick_first_player: [G,9] array of the first players of the tricks
+        trumps: [G] array of the trumps
+        forehands: [G] array of the forehand values (1 if trump was declared forehand, 0 if rearhand)
+
+    Returns:
+        [M, NR_FEATURES_TRUMP] array of the features, [M] array of the trump actions, [M] array of the players
+    """
+    nr_games = cards.shape[0]
+    games = np.arange(nr_games)[:, np.newaxis]
+    players = (trick_first_player[:, :, np.newaxis] - np.arange(4)[np.newaxis, np.newaxis, :]) % 4
+    owner = np.zeros([nr_games, 36], dtype=np.int32)
+    owner[games, cards] = players.reshape(nr_games, 36)
+
+    forehand_player = trick_first_player[:, 0]
+    rearhand_player = (forehand_player + 2) % 4
+    pushed = forehands == 0
+
+    features_forehand = np.zeros([nr_games, NR_FEATURES_TRUMP], dtype=np.int8)
+    features_forehand[:, FEATURES_TRUMP_HAND:FEATURES_TRUMP_HAND + 36] = owner == forehand_player[:, np.newaxis]
+    actions_forehand = np.where(pushed, PUSH_ALT, trumps)
+
+    features_rearhand = np.zeros([np.count_nonzero(pushed), NR_FEATURES_TRUMP], dtype=np.int8)
+    features_rearhand[:, FEATURES_TRUMP_HAND:FEATURES_TRUMP_HAND + 36] = \
+        owner[pushed] == rearhand_player[pushed, np.newaxis]
+    features_rearhand[:, FEATURES_TRUMP_REARHAND] = 1
+
+    return np.concatenate([features_forehand, features_rearhand]), \
+        np.concatenate([actions_forehand, trumps[pushed]]), \
+        np.concatenate([forehand_player, rearhand_player[pushed]])
+
+
+def calc_trick_first_player(cards: np.ndarray, dealers: np.ndarray, trumps: np.ndarray) -> np.ndarray:
+    """
+    Calculate the first players of all tricks of complete games from the winners of the previous tricks.
+
+    Args:
+        cards: [G,36] array of the cards in the order they were played
+        dealers: [G] array of the dealers
+        trumps: [G] array of the trumps
+
+    Returns:
+        [G,9] array of the first players of the tricks
+    """
+    rule = RuleSchieber()
+    tricks = cards.reshape(-1, 9, 4)
+    trick_first_player = np.zeros([tricks.shape[0], 9], dtype=np.int32)
+    trick_first_player[:, 0] = _next_player[dealers]
+    for i in range(8):
+        trick_first_player[:, i + 1] = rule.calc_winner_batch(tricks[:, i], trick_first_player[:, i], trumps)
+    return trick_first_player
+
+
+def _games_from_lines(lines: List[str]) -> dict:
+    """
+    Parse the complete games in lines of a json log file (one GameLogEntry per line) into arrays.
+    """
+    cards, dealers, trumps, forehands, player_ids = [], [], [], [], []
+    for line in lines:
+        data = json.loads(line)
+        game = data['game']
+        game_cards = [card for trick in game['tricks'] for card in trick['cards']]
+        if len(game_cards) != 36:
+            continue
+        cards.append(convert_str_encoded_cards_to_int_encoded(game_cards))
+        dealers.append(game['dealer'])
+        trumps.append(game['trump'])
+        # older versions of the format contain tss instead of forehand
+        if 'forehand' in game:
+            forehands.append(game['forehand'])
+        else:
+            forehands.append(0 if game.get('tss', 0) == 1 else 1)
+        player_ids.append(data.get('player_ids', [0, 0, 0, 0]))
+    return dict(cards=np.array(cards, dtype=np.int32).reshape(-1, 36),
+                dealers=np.array(dealers, dtype=np.int32),
+                trumps=np.array(trumps, dtype=np.int32),
+                forehands=np.array(forehands, dtype=np.int32),
+                player_ids=np.array(player_ids, dtype=np.int32).reshape(-1, 4))
+
+
+def _games_from_records(records: np.ndarray) -> dict:
+    """
+    Convert the complete games in records of a game archive into arrays.
+    """
+    records = records[records['game']['nr_played_cards'] == 36]
+    return dict(cards=records['game']['cards'].astype(np.int32),
+                dealers=records['game']['dealer'].astype(np.int32),
+                trumps=records['game']['trump'].astype(np.int32),
+                forehands=records['game']['forehand'].astype(np.int32),
+                player_ids=records['player_ids'].astype(np.int32))
+
+
+def _assert_invariants(games: dict, trick_first_player: np.ndarray) -> None:
+    """
+    Check the invariants of the states after each card played in the games (slow).
+    """
+    rule = RuleSchieber()
+    for i in range(games['cards'].shape[0]):
+        record = np.zeros((), dtype=GameState.BYTES_DTYPE)
+        record['dealer'] = games['dealers'][i]
+        record['trump'] = games['trumps'][i]
+        record['forehand'] = games['forehands'][i]
+        record['nr_played_cards'] = 36
+        record['cards'] = games['cards'][i]
+        game = GameState.from_record(record, rule)
+        if not np.array_equal(game.trick_first_player, trick_first_player[i]):
+            raise AssertionError('First players of the tricks do not match in game {}'.format(i))
+        for nr_cards in range(36):
+            rule.assert_invariants(state_from_complete_game(game, nr_cards))
+
+
+def _convert_chunk(chunk: dict) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Convert a chunk of games to features, actions and player ids. Runs in the worker processes, so the arguments
+    are collected in a dict.
+    """
+    if chunk['lines'] is not None:
+        games = _games_from_lines(chunk['lines'])
+    else:
+        games = _games_from_records(chunk['records'])
+    trick_first_player = calc_trick_first_player(games['cards'], games['dealers'], games['trumps'])
+    if chunk['check_invariants']:
+        _assert_invariants(games, trick_first_player)
+
+    if chunk['trump']:
+        features, actions, players = trump_features_from_games(games['cards'], trick_first_player,
+                                                               games['trumps'], games['forehands'])
+        game_idx = np.concatenate([np.arange(games['cards'].shape[0]), np.flatnonzero(games['forehands'] == 0)])
+    else:
+        features, actions, players = card_features_from_games(games['cards'], trick_first_player,
+                                                              games['trumps'], games['forehands'])
+        game_idx = np.repeat(np.arange(games['cards'].shape[0]), 36)
+    return features, actions.astype(np.int32), games['player_ids'][game_idx, players]
+
+
+def _read_chunks(files: List[str], chunk_size: int, trump: bool, check_invariants: bool) -> Iterator[dict]:
+    """
+    Read the files and yield chunks of games for the conversion.
+    """
+    logger = logging.getLogger(__name__)
+    for filename in files:
+        logger.info('Reading file: {}'.format(filename))
+        if filename.endswith(GameArchiveWriter.EXTENSION):
+            records = GameArchiveReader(filename[:-len(GameArchiveWriter.EXTENSION)]).records
+            for start in range(0, records.shape[0], chunk_size):
+                yield dict(lines=None, records=np.array(records[start:start + chunk_size]),
+                           trump=trump, check_invariants=check_invariants)
+        else:
+            with open(filename, 'r') as file:
+                lines = []
+                for line in file:
+                    if line.strip():
+                        lines.append(line)
+                    if len(lines) == chunk_size:
+                        yield dict(lines=lines, records=None, trump=trump, check_invariants=check_invariants)
+                        lines = []
+                if len(lines) > 0:
+                    yield dict(lines=lines, records=None, trump=trump, check_invariants=check_invariants)
+
+
+def convert_games_to_dataset(files: List[str], basename: str, trump: bool = False, max_entries_per_file: int = 1000000,
+                             chunk_size: int = 1000, nr_workers: int = None, check_invariants: bool = False) \
+        -> List[str]:
+    """
+    Convert files containing complete games to npz shards of observation features and actions.
+
+    Args:
+        files: input files, either json log files of GameLogEntry or game archives (with extension .games)
+        basename: basename of the generated files, this should include the whole file path
+        trump: create the dataset for trump selection if True, for playing cards otherwise
+        max_entries_per_file: maximal number of observations in a shard
+        chunk_size: number of games that are converted together in a worker
+        nr_workers: number of worker processes, the number of cpus if None, 0 to convert in this process
+        check_invariants: check the invariants of all states of the games (slow)
+
+    Returns:
+        list of the filenames of the generated shards
+    """
+    for filename in files:
+        if not os.path.isfile(filename):
+            raise ValueError('File not found: {}'.format(filename))
+
+    logger = logging.getLogger(__name__)
+    filenames = []
+    buffers = []
+    nr_buffered = 0
+
+    def write_shard(nr_entries: int):
+        nonlocal buffers, nr_buffered
+        features, actions, player_ids = (np.concatenate(arrays) for arrays in zip(*buffers))
+        filename = '{}_{:04d}.npz'.format(basename, len(filenames))
+        logger.info('Writing file: {}'.format(filename))
+        np.savez(filename, features=features[:nr_entries], actions=actions[:nr_entries],
+                 player_ids=player_ids[:nr_entries])
+        filenames.append(filename)
+        buffers = [(features[nr_entries:], actions[nr_entries:], player_ids[nr_entries:])]
+        nr_buffered -= nr_entries
+
+    chunks = _read_chunks(files, chunk_size, trump, check_invariants)
+    pool = multiprocessing.Pool(nr_workers) if nr_workers != 0 else None
+    try:
+        results = pool.imap(_convert_chunk, chunks) if pool is not None else map(_convert_chunk, chunks)
+        for result in results:
+            buffers.append(result)
+            nr_buffered += result[0].shape[0]
+            while nr_buffered >= max_entries_per_file:
+                write_shard(max_entries_per_file)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    if nr_buffered > 0:
+        write_shard(nr_buffered)
+    return filenames
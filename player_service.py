@@ -4,10 +4,15 @@
 #
 """
 Example how to use flask to create a service for one or more players
+
+Run with several workers (using gunicorn if it is installed):
+
+    python player_service.py --port 8888 --workers 4 --threads 8
 """
+import argparse
 import logging
 
-from jass.service.player_service_app import PlayerServiceApp
+from jass.service.player_service_server import create_service_app, run_service
 from jass.agents.agent_random_schieber import AgentRandomSchieber
 from jass.agents.agent_noob import AgentNoob
 
@@ -23,20 +28,29 @@ def create_app():
     """
     logging.basicConfig(level=logging.DEBUG)
 
-    # create and configure the app
-    app = PlayerServiceApp('player_service')
+    # create and configure the app, the players are added by factories, so that each thread uses its own agents
+    # (a warmup function can be supplied to load models for each new agent)
+    app = create_service_app({
+        'random': AgentRandomSchieber,
+        'noob': AgentNoob,
+    })
 
     # you could use a configuration file to load additional variables
     # app.config.from_pyfile('my_player_service.cfg', silent=False)
 
-    # add some players
-    app.add_player('random', AgentRandomSchieber())
-    app.add_player('noob', AgentNoob())
-
     return app
 
 
+def main():
+    parser = argparse.ArgumentParser(description='Run the player service')
+    parser.add_argument('--host', type=str, default='0.0.0.0', help='Host address')
+    parser.add_argument('--port', type=int, default=8888, help='Port')
+    parser.add_argument('--workers', type=int, default=4, help='Number of worker processes (gunicorn)')
+    parser.add_argument('--threads', type=int, default=8, help='Number of threads per worker (gunicorn)')
+    args = parser.parse_args()
+    run_service(create_app, host=args.host, port=args.port, workers=args.workers, threads=args.threads)
+
+
 if __name__ == '__main__':
-   app = create_app()
-   app.run(host='0.0.0.0', port=8888)
+    main()
 
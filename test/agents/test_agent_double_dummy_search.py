@@ -0,0 +1,20 @@
+import unittest
+
+from jass.agents.agent_cheating_random_schieber import AgentCheatingRandomSchieber
+from jass.agents.agent_double_dummy_search import AgentDoubleDummySearch
+from jass.arena.arena import Arena
+
+
+class AgentDoubleDummySearchTestCase(unittest.TestCase):
+    def test_play_games(self):
+        arena = Arena(nr_games_to_play=2, print_every_x_games=0, cheating_mode=True)
+        agent = AgentDoubleDummySearch(exact_tricks=4, max_tricks=2)
+        arena.set_players(agent, AgentCheatingRandomSchieber(), agent, AgentCheatingRandomSchieber())
+        arena.play_all_games()
+        self.assertEqual(157, arena.points_team_0[0] + arena.points_team_1[0])
+        self.assertGreater(arena.points_team_0.sum(), arena.points_team_1.sum())
+        self.assertTrue(agent.last_search_info['exact'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+
+from jass.agents.agent_ismcts import AgentISMCTS
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.arena.arena import Arena
+from jass.game.const import NORTH, SPADES
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+
+class AgentISMCTSTestCase(unittest.TestCase):
+    def test_play_games(self):
+        arena = Arena(nr_games_to_play=1, print_every_x_games=0)
+        agent = AgentISMCTS(iterations=30, seed=2)
+        arena.set_players(agent, AgentRandomSchieber(), agent, AgentRandomSchieber())
+        arena.play_all_games()
+        self.assertEqual(157, arena.points_team_0[0] + arena.points_team_1[0])
+
+    def test_root_parallel(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(np.random.default_rng(3)), dealer=NORTH)
+        game.action_trump(SPADES)
+        agent = AgentISMCTS(iterations=50, nr_processes=2, seed=3)
+        try:
+            card = agent.action_play_card(game.get_observation())
+            self.assertEqual(1, rule.get_valid_cards_from_state(game.state)[card])
+            self.assertEqual(100, agent.last_search_info['iterations'])
+        finally:
+            agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import time
+import unittest
+
+import numpy as np
+
+from jass.agents.agent_MCTS import AgentMCTS
+from jass.agents.agent_cheating_random_schieber import AgentCheatingRandomSchieber
+from jass.agents.agent_minimax import AgentMinimax
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.arena.arena import Arena
+from jass.game.const import NORTH, HEARTS, team
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.service.player_service_app import PlayerServiceApp
+
+
+class AgentSearchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rule = RuleSchieber()
+        self.game = GameSim(rule=self.rule)
+        self.game.init_from_cards(hands=deal_random_hand(np.random.default_rng(5)), dealer=NORTH)
+        self.game.action_trump(HEARTS)
+        for _ in range(6):
+            self.game.action_play_card(int(np.flatnonzero(self.rule.get_valid_cards_from_state(self.game.state))[0]))
+        # the position must have a choice of cards
+        self.assertGreater(self.rule.get_valid_cards_from_state(self.game.state).sum(), 1)
+
+    def test_minimax_fixed_depth(self):
+        agent = AgentMinimax(depth=3)
+        state_before = self.game.state.tricks.copy()
+        card = agent.action_play_card(self.game.state)
+        self.assertEqual(1, self.rule.get_valid_cards_from_state(self.game.state)[card])
+        self.assertEqual(1, agent.last_search_info['iterations'])
+        self.assertEqual(3, agent.last_search_info['depth'])
+        # the state of the game is not changed by the search
+        self.assertTrue(np.array_equal(state_before, self.game.state.tricks))
+
+    def _minimax(self, depth: int, own_team: int) -> int:
+        # plain minimax without pruning and transposition table
+        state = self.game.state
+        if depth == 0 or state.nr_played_cards == 36:
+            return int(state.points[own_team] - state.points[1 - own_team])
+        values = []
+        for card in np.flatnonzero(self.rule.get_valid_cards_from_state(state)):
+            self.game.action_play_card(int(card))
+            values.append(self._minimax(depth - 1, own_team))
+            self.game.undo_play_card()
+        return max(values) if team[state.player] == own_team else min(values)
+
+    def test_minimax_transposition_table(self):
+        agent = AgentMinimax(depth=4)
+        own_team = team[self.game.state.player]
+        values = {}
+        for card in np.flatnonzero(self.rule.get_valid_cards_from_state(self.game.state)):
+            self.game.action_play_card(int(card))
+            values[card] = self._minimax(3, own_team)
+            self.game.undo_play_card()
+        # the card found with the table has the best value, also when searching again with the filled table
+        for _ in range(2):
+            card = agent.action_play_card(self.game.state)
+            self.assertEqual(max(values.values()), values[card])
+        self.assertGreater(agent.last_search_info['table_hits'], 0)
+
+    def test_minimax_time_budget(self):
+        agent = AgentMinimax(time_budget=0.2)
+        start = time.perf_counter()
+        card = agent.action_play_card(self.game.state)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(1, self.rule.get_valid_cards_from_state(self.game.state)[card])
+        self.assertGreaterEqual(agent.last_search_info['iterations'], 1)
+        self.assertEqual(agent.last_search_info['iterations'], agent.last_search_info['depth'])
+
+    def test_mcts_time_budget(self):
+        agent = AgentMCTS(time_budget=0.2, seed=1)
+        obs = self.game.get_observation()
+        start = time.perf_counter()
+        card = agent.action_play_card(obs)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(1, self.rule.get_valid_cards_from_obs(obs)[card])
+        self.assertGreater(agent.last_search_info['iterations'], 10)
+
+        agent = AgentMCTS(iterations=25, seed=1)
+        agent.action_play_card(obs)
+        self.assertEqual(25, agent.last_search_info['iterations'])
+
+    def test_arena(self):
+        arena = Arena(nr_games_to_play=1, print_every_x_games=0, cheating_mode=True)
+        agent = AgentMinimax(depth=2)
+        other = AgentCheatingRandomSchieber()
+        arena.set_players(agent, other, agent, other)
+        arena.play_all_games()
+        self.assertEqual(157, arena.points_team_0[0] + arena.points_team_1[0])
+
+        arena = Arena(nr_games_to_play=1, print_every_x_games=0)
+        agent = AgentMCTS(iterations=10, seed=2)
+        other = AgentRandomSchieber()
+        arena.set_players(agent, other, agent, other)
+        arena.play_all_games()
+        self.assertEqual(157, arena.points_team_0[0] + arena.points_team_1[0])
+
+    def test_service_time_budget(self):
+        app = PlayerServiceApp('player_service')
+        agent = AgentMCTS(time_budget=1.0, seed=3)
+        app.add_player('mcts', agent)
+        data = self.game.get_observation().to_json()
+        data['timeBudget'] = 0.05
+        start = time.perf_counter()
+        response = app.test_client().post('/mcts/action_play_card', json=data)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIn('searchInfo', response.get_json())
+        self.assertGreater(response.get_json()['searchInfo']['iterations'], 0)
+        # the budget of the agent is restored
+        self.assertEqual(1.0, agent.time_budget)
+
+
+if __name__ == '__main__':
+    unittest.main()
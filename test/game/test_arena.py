@@ -1,8 +1,47 @@
+import asyncio
+import json
+import os
+import tempfile
 import unittest
 
+import numpy as np
+
 from jass.agents.agent_cheating_random_schieber import AgentCheatingRandomSchieber
+from jass.agents.agent_noob import AgentNoob
 from jass.agents.agent_random_schieber import AgentRandomSchieber
 from jass.arena.arena import Arena
+from jass.arena.dealing_card_random_strategy import DealingCardRandomStrategy
+from jass.arena.dealing_card_strategy import DealingCardStrategy
+from jass.game.game_observation import GameObservation
+from jass.game.game_util import deal_random_hand
+from jass.game.instrumentation import Instrumentation
+
+
+class AgentNoobAsync(AgentNoob):
+    """
+    Deterministic agent with coroutines, that waits before answering, so that the games are interleaved.
+    """
+    def __init__(self):
+        super().__init__()
+        self.nr_calls_async = 0
+
+    async def action_trump_async(self, obs: GameObservation) -> int:
+        self.nr_calls_async += 1
+        await asyncio.sleep(0)
+        return self.action_trump(obs)
+
+    async def action_play_card_async(self, obs: GameObservation) -> int:
+        self.nr_calls_async += 1
+        await asyncio.sleep(0)
+        return self.action_play_card(obs)
+
+
+class DealingCardGlobalStrategy(DealingCardStrategy):
+    """
+    Deal cards randomly with the global random generator.
+    """
+    def deal_cards(self, game_nr: int = 0, total_nr_games: int = 0) -> np.ndarray:
+        return deal_random_hand()
 
 
 class GameSimTestCase(unittest.TestCase):
@@ -18,6 +57,14 @@ class GameSimTestCase(unittest.TestCase):
 
         self.assertEqual(arena.nr_games_played, 1)
 
+    def test_arena_reuse_observation(self):
+        arena = Arena(nr_games_to_play=2, reuse_observation=True, check_move_validity=True)
+        player = AgentRandomSchieber()
+        arena.set_players(player, player, player, player)
+        arena.play_all_games()
+
+        self.assertEqual(arena.nr_games_played, 2)
+
     def test_arena_in_cheating_mode(self):
         # setup the arena
         arena = Arena(nr_games_to_play=1, cheating_mode=True, check_move_validity=True)
@@ -47,6 +94,121 @@ class GameSimTestCase(unittest.TestCase):
         with self.assertRaises(AssertionError):
             arena.set_players(my_player, player, my_player, player)
 
+    def test_arena_parallel(self):
+        # with a deterministic agent, the results must be the same independent of the number of workers
+        results = []
+        for nr_workers in [1, 3]:
+            arena = Arena(nr_games_to_play=8, print_every_x_games=0)
+            player = AgentNoob()
+            arena.set_players(player, player, player, player)
+            arena.play_all_games_parallel(nr_workers=nr_workers, seed=42)
+            self.assertEqual(arena.nr_games_played, 8)
+            results.append((arena.points_team_0.copy(), arena.points_team_1.copy()))
+
+        self.assertTrue((results[0][0] == results[1][0]).all())
+        self.assertTrue((results[0][1] == results[1][1]).all())
+        self.assertTrue(((results[0][0] + results[0][1]) == 157).all())
+
+        # and the same as playing sequentially with the same dealing strategy
+        arena = Arena(nr_games_to_play=8, print_every_x_games=0, dealing_card_strategy=DealingCardRandomStrategy(42))
+        player = AgentNoob()
+        arena.set_players(player, player, player, player)
+        arena.play_all_games()
+        self.assertTrue((results[0][0] == arena.points_team_0).all())
+
+    def test_arena_parallel_without_seed(self):
+        # the shards of the workers deal different cards, even though the forked workers inherit the same state of
+        # the global random generator
+        arena = Arena(nr_games_to_play=8, print_every_x_games=0)
+        player = AgentNoob()
+        arena.set_players(player, player, player, player)
+        arena.play_all_games_parallel(nr_workers=2)
+        self.assertEqual(8, arena.nr_games_played)
+        self.assertFalse((arena.points_team_0[:4] == arena.points_team_0[4:]).all())
+        self.assertTrue(((arena.points_team_0 + arena.points_team_1) == 157).all())
+
+        # the same with another dealing strategy that deals using the global random generator
+        arena = Arena(nr_games_to_play=8, print_every_x_games=0, dealing_card_strategy=DealingCardGlobalStrategy())
+        arena.set_players(player, player, player, player)
+        arena.play_all_games_parallel(nr_workers=2)
+        self.assertFalse((arena.points_team_0[:4] == arena.points_team_0[4:]).all())
+
+    def test_arena_async(self):
+        # the results must be the same as playing sequentially
+        arena = Arena(nr_games_to_play=12, print_every_x_games=0, dealing_card_strategy=DealingCardRandomStrategy(7))
+        player = AgentNoob()
+        arena.set_players(player, player, player, player)
+        arena.play_all_games()
+
+        arena_async = Arena(nr_games_to_play=12, print_every_x_games=0, reuse_observation=True,
+                            dealing_card_strategy=DealingCardRandomStrategy(7))
+        player_async = AgentNoobAsync()
+        arena_async.set_players(player_async, player, player_async, player)
+        arena_async.play_all_games_async(max_games_in_flight=5)
+        self.assertEqual(12, arena_async.nr_games_played)
+        self.assertTrue(player_async.nr_calls_async >= 12 * 18)
+        self.assertTrue((arena.points_team_0 == arena_async.points_team_0).all())
+        self.assertTrue((arena.points_team_1 == arena_async.points_team_1).all())
+
+    def test_arena_instrumentation(self):
+        # the results are the same with and without instrumentation
+        arena = Arena(nr_games_to_play=6, print_every_x_games=0, dealing_card_strategy=DealingCardRandomStrategy(3))
+        player = AgentNoob()
+        arena.set_players(player, player, player, player)
+        arena.play_all_games()
+        self.assertIsNone(arena.instrumentation)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            arena_instrumented = Arena(nr_games_to_play=6, print_every_x_games=0,
+                                       dealing_card_strategy=DealingCardRandomStrategy(3),
+                                       save_filename=os.path.join(tmp_dir, 'games'),
+                                       instrumentation=Instrumentation())
+            arena_instrumented.set_players(player, player, player, player)
+            arena_instrumented.play_all_games()
+            self.assertTrue((arena.points_team_0 == arena_instrumented.points_team_0).all())
+
+            timers = arena_instrumented.instrumentation.to_dict()['timers']
+            nr_trump_decisions = timers['trump_decision']['calls']
+            self.assertEqual(6, timers['game']['calls'])
+            self.assertEqual(6, timers['save_game']['calls'])
+            self.assertEqual(6, timers['json_encoding']['calls'])
+            self.assertEqual(6 * 36, timers['card_decision']['calls'])
+            self.assertTrue(6 <= nr_trump_decisions <= 12)
+            self.assertEqual(6 * 36 + nr_trump_decisions, timers['validity_check']['calls'])
+            self.assertEqual(6 * 36 + nr_trump_decisions, timers['state_update']['calls'])
+            self.assertEqual(6 * 36 + nr_trump_decisions, timers['observation']['calls'])
+            self.assertTrue(timers['game']['total'] >= timers['card_decision']['total'] > 0)
+            self.assertIn('card_decision', arena_instrumented.instrumentation.summary())
+
+            filename = os.path.join(tmp_dir, 'instrumentation.json')
+            arena_instrumented.instrumentation.save_json(filename)
+            with open(filename) as f:
+                self.assertEqual(timers, json.load(f)['timers'])
+
+        # the instrumentations of the workers are merged
+        arena_parallel = Arena(nr_games_to_play=6, print_every_x_games=0, instrumentation=Instrumentation())
+        arena_parallel.set_players(player, player, player, player)
+        arena_parallel.play_all_games_parallel(nr_workers=2, seed=3)
+        timers = arena_parallel.instrumentation.to_dict()['timers']
+        self.assertEqual(6, timers['game']['calls'])
+        self.assertEqual(6 * 36, timers['card_decision']['calls'])
+
+        # the games played as coroutines are instrumented, including the awaited decisions
+        arena_async = Arena(nr_games_to_play=6, print_every_x_games=0,
+                            dealing_card_strategy=DealingCardRandomStrategy(3), instrumentation=Instrumentation())
+        player_async = AgentNoobAsync()
+        arena_async.set_players(player_async, player_async, player_async, player_async)
+        arena_async.play_all_games_async(max_games_in_flight=3)
+        self.assertTrue((arena.points_team_0 == arena_async.points_team_0).all())
+        timers = arena_async.instrumentation.to_dict()['timers']
+        nr_trump_decisions = timers['trump_decision']['calls']
+        self.assertEqual(6, timers['game']['calls'])
+        self.assertEqual(6 * 36, timers['card_decision']['calls'])
+        self.assertEqual(6 * 36 + nr_trump_decisions, player_async.nr_calls_async)
+        self.assertEqual(6 * 36 + nr_trump_decisions, timers['validity_check']['calls'])
+        self.assertEqual(6 * 36 + nr_trump_decisions, timers['state_update']['calls'])
+        self.assertEqual(6 * 36 + nr_trump_decisions, timers['observation']['calls'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from jass.game.batch_game_sim import BatchGameSim
+from jass.game.const import *
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+
+class BatchGameSimTestCase(unittest.TestCase):
+    def test_same_as_game_sim(self):
+        rule = RuleSchieber()
+        rng = np.random.default_rng(42)
+        nr_games = 60
+        hands = np.array([deal_random_hand() for _ in range(nr_games)])
+        dealers = np.arange(nr_games) % 4
+
+        batch = BatchGameSim(rule=rule, nr_games=nr_games)
+        batch.init_from_cards(hands=hands, dealer=dealers)
+        games = []
+        for i in range(nr_games):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=hands[i], dealer=int(dealers[i]))
+            games.append(game)
+
+        # the first third of the games is pushed
+        actions = np.where(np.arange(nr_games) < nr_games // 3, PUSH, np.arange(nr_games) % 6)
+        batch.action_trump_batch(actions)
+        for i in range(nr_games):
+            games[i].action_trump(int(actions[i]))
+        batch.action_trump_batch(np.arange(nr_games) % 6)
+        for i in range(nr_games):
+            if actions[i] == PUSH:
+                games[i].action_trump(i % 6)
+            self.assertTrue(games[i].state == batch.get_state(i))
+
+        while not batch.is_done():
+            valid = batch.get_valid_cards_batch()
+            cards = (rng.random(valid.shape) * valid).argmax(axis=1)
+            batch.action_play_card_batch(cards)
+            for i in range(nr_games):
+                self.assertEqual(1, valid[i, cards[i]])
+                games[i].action_play_card(int(cards[i]))
+                self.assertTrue(games[i].state == batch.get_state(i))
+
+        for i in range(nr_games):
+            rule.assert_invariants(batch.get_state(i))
+        self.assertTrue(np.all(batch.points.sum(axis=1) == 157))
+
+    def test_init_from_state(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=WEST)
+        game.action_trump(OBE_ABE)
+        for _ in range(5):
+            game.action_play_card(int(np.flatnonzero(rule.get_valid_cards_from_state(game.state))[0]))
+
+        batch = BatchGameSim(rule=rule, nr_games=3)
+        batch.init_from_state(game.state)
+        for i in range(3):
+            self.assertTrue(game.state == batch.get_state(i))
+
+
+if __name__ == '__main__':
+    unittest.main()
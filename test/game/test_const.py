@@ -15,6 +15,24 @@ class JassConstTestCase(unittest.TestCase):
             # 9 cards per color
             self.assertEqual(9, color_masks[color, :].sum())
 
+    def test_allowed_masks(self):
+        # all cards are allowed if the player does not have the color and no trump was played
+        self.assertTrue((allowed_masks[0, :, :, NO_TRUMP_PLAYED, :] == 1).all())
+        # obe / une: the color played
+        np.testing.assert_array_equal(color_masks[SPADES], allowed_masks[1, OBE_ABE, SPADES, NO_TRUMP_PLAYED])
+        # trump played first: only trump
+        np.testing.assert_array_equal(color_masks[HEARTS], allowed_masks[1, HEARTS, HEARTS, NO_TRUMP_PLAYED])
+        # other color: the color or any trump, or a higher trump if a trump was played
+        np.testing.assert_array_equal(color_masks[CLUBS] + color_masks[HEARTS],
+                                      allowed_masks[1, HEARTS, CLUBS, NO_TRUMP_PLAYED])
+        np.testing.assert_array_equal(get_cards_encoded([CA, CK, CQ, CJ, C10, C9, C8, C7, C6, HJ, H9]),
+                                      allowed_masks[1, HEARTS, CLUBS, HA - HEARTS * 9])
+        # without the color: anything except a lower trump
+        np.testing.assert_array_equal(1 - get_cards_encoded([HA, HK, HQ, H10, H8, H7, H6]),
+                                      allowed_masks[0, HEARTS, CLUBS, HA - HEARTS * 9])
+        self.assertEqual(allowed_masks_bits[0][HEARTS][CLUBS][HA - HEARTS * 9],
+                         sum(1 << int(card) for card in np.flatnonzero(allowed_masks[0, HEARTS, CLUBS, 0])))
+
     def test_conversions(self):
         cards = get_cards_encoded([DA, C6])
         self.assertEqual(36, cards.size)
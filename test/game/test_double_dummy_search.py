@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from jass.game.const import NORTH, team
+from jass.game.double_dummy_search import DoubleDummySearch, solve_moves
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+
+
+class DoubleDummySearchTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rule = RuleSchieber()
+
+    def _play_game(self, trump: int, nr_cards: int, seed: int) -> GameSim:
+        rng = np.random.default_rng(seed)
+        game = GameSim(rule=self.rule)
+        game.init_from_cards(hands=deal_random_hand(rng), dealer=NORTH)
+        game.action_trump(trump)
+        for _ in range(nr_cards):
+            game.action_play_card(int(rng.choice(np.flatnonzero(self.rule.get_valid_cards_from_state(game.state)))))
+        return game
+
+    def _minimax(self, game: GameSim) -> int:
+        # points of team 0 at the end of the game with perfect play
+        state = game.state
+        if state.nr_played_cards == 36:
+            return int(state.points[0])
+        values = []
+        for card in np.flatnonzero(self.rule.get_valid_cards_from_state(state)):
+            game.action_play_card(int(card))
+            values.append(self._minimax(game))
+            game.undo_play_card()
+        return max(values) if team[state.player] == 0 else min(values)
+
+    def test_solve_moves_endgame(self):
+        solver = DoubleDummySearch()
+        for seed in range(24):
+            game = self._play_game(seed % 6, 25 + seed % 3, seed)
+            state = game.state
+            # points from the start of the current trick until the end
+            total = 157 - int(state.points.sum())
+            points_before = int(state.points[0])
+            values = solver.solve_moves(state)
+            valid_cards = np.flatnonzero(self.rule.get_valid_cards_from_state(state))
+            self.assertEqual(set(valid_cards), set(values.keys()))
+            for card in valid_cards:
+                game.action_play_card(int(card))
+                points_team_0 = self._minimax(game) - points_before
+                game.undo_play_card()
+                expected = points_team_0 if team[state.player] == 0 else total - points_team_0
+                self.assertEqual(expected, values[card])
+            self.assertEqual(max(values.values()), solver.solve(state))
+            self.assertEqual(max(values.values()), values[solver.best_card(state)])
+
+    def test_solve_moves_function(self):
+        game = self._play_game(2, 20, 1)
+        values = solve_moves(game.state)
+        valid_cards = np.flatnonzero(self.rule.get_valid_cards_from_state(game.state))
+        self.assertEqual(set(valid_cards), set(values.keys()))
+        # the values do not change when the best card is played (also for the other team)
+        best = max(values.values())
+        card = max(values, key=values.get)
+        own_team = team[game.state.player]
+        total = 157 - int(game.state.points.sum())
+        game.action_play_card(card)
+        value = DoubleDummySearch().solve(game.state)
+        self.assertEqual(best, value if team[game.state.player] == own_team else total - value)
+
+    def test_max_tricks(self):
+        solver = DoubleDummySearch()
+        game = self._play_game(0, 0, 3)
+        values = solver.solve_moves(game.state, max_tricks=2)
+        valid_cards = np.flatnonzero(self.rule.get_valid_cards_from_state(game.state))
+        self.assertEqual(set(valid_cards), set(values.keys()))
+        for value in values.values():
+            self.assertTrue(0 <= value <= 157)
+        self.assertEqual(max(values.values()), values[solver.best_card(game.state, max_tricks=2)])
+
+        # searching all the remaining tricks is exact
+        game = self._play_game(0, 24, 3)
+        self.assertEqual(solver.solve_moves(game.state), solver.solve_moves(game.state, max_tricks=3))
+
+    def test_trump_not_selected(self):
+        game = GameSim(rule=self.rule)
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        self.assertRaises(ValueError, DoubleDummySearch().solve, game.state)
+
+
+if __name__ == '__main__':
+    unittest.main()
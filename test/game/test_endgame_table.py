@@ -0,0 +1,149 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from jass.agents.agent_MCTS import AgentMCTS
+from jass.agents.agent_ismcts import AgentISMCTS
+from jass.game.const import NORTH, team
+from jass.game.double_dummy_search import DoubleDummySearch
+from jass.game.endgame_table import EndgameTable, generate_endgame_table
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.game.zobrist import zobrist_hash
+
+
+class RecordingEndgameTable(EndgameTable):
+    """
+    Endgame table that checks the lookups of the agents: the key must be the key of the state and the points
+    of the positions found must be the exact points.
+    """
+    def __init__(self, directory: str):
+        super().__init__(directory)
+        self.nr_lookups = 0
+        self.nr_hits = 0
+        self.nr_errors = 0
+        self._solver = DoubleDummySearch()
+
+    def final_points(self, sim: GameSim):
+        points = super().final_points(sim)
+        self.nr_lookups += 1
+        if sim.zobrist_key != zobrist_hash(sim.state):
+            self.nr_errors += 1
+        if points is not None:
+            self.nr_hits += 1
+            state = sim.state
+            player_team = team[state.player]
+            if points[player_team] != state.points[player_team] + self._solver.solve(state):
+                self.nr_errors += 1
+        return points
+
+
+class EndgameTableTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.nr_positions = generate_endgame_table(cls.tmp_dir.name, nr_games=12, nr_tricks=2, seed=1)
+        cls.table = EndgameTable(cls.tmp_dir.name)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        del cls.table
+        cls.tmp_dir.cleanup()
+
+    def setUp(self) -> None:
+        self.rule = RuleSchieber()
+
+    def _play_game(self, trump: int, nr_cards: int, seed: int) -> GameSim:
+        rng = np.random.default_rng(seed)
+        game = GameSim(rule=self.rule)
+        game.init_from_cards(hands=deal_random_hand(rng), dealer=NORTH)
+        game.action_trump(trump)
+        for _ in range(nr_cards):
+            game.action_play_card(int(rng.choice(np.flatnonzero(self.rule.get_valid_cards_from_state(game.state)))))
+        return game
+
+    def test_table(self):
+        self.assertEqual(self.nr_positions, len(self.table))
+        self.assertEqual(2, self.table.nr_tricks)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, 'keys.npy')))
+        self.assertIsInstance(self.table._keys, np.memmap)
+
+    def test_pickle(self):
+        # only the directory is pickled, the unpickled table maps the files again
+        data = pickle.dumps(self.table)
+        self.assertLess(len(data), 1000)
+        self.assertLess(len(data), self.table._keys.nbytes)
+        table = pickle.loads(data)
+        self.assertIsInstance(table._keys, np.memmap)
+        self.assertIsInstance(table._values, np.memmap)
+        self.assertEqual(len(self.table), len(table))
+        for game in self._replay_positions():
+            self.assertEqual(self.table.lookup(game.state), table.lookup(game.state))
+
+    def _replay_positions(self):
+        # replay the games of the generator, all positions in the last two tricks are in the table
+        rng = np.random.default_rng(1)
+        game = GameSim(rule=self.rule)
+        for game_nr in range(12):
+            game.init_from_cards(hands=deal_random_hand(rng), dealer=game_nr % 4)
+            game.action_trump(game_nr % 6)
+            while not game.is_done():
+                if game.state.nr_played_cards >= 28:
+                    yield game
+                valid_cards = np.flatnonzero(self.rule.get_valid_cards_from_state(game.state))
+                game.action_play_card(int(rng.choice(valid_cards)))
+
+    def test_lookup(self):
+        solver = DoubleDummySearch()
+        for game in self._replay_positions():
+            self.assertEqual(solver.solve(game.state), self.table.lookup(game.state))
+            self.assertEqual(self.table.lookup(game.state), self.table.lookup_key(game.zobrist_key))
+
+    def test_lookup_unknown(self):
+        # too early in the game
+        game = self._play_game(0, 20, 5)
+        self.assertIsNone(self.table.lookup(game.state))
+        self.assertIsNone(self.table.final_points(game))
+        # the game is done
+        game = self._play_game(0, 36, 5)
+        self.assertIsNone(self.table.lookup(game.state))
+        self.assertIsNone(self.table.lookup_key(12345))
+
+    def test_final_points(self):
+        solver = DoubleDummySearch()
+        for game in self._replay_positions():
+            state = game.state
+            points = self.table.final_points(game)
+            self.assertEqual(157, points.sum())
+            self.assertEqual(state.points[team[state.player]] + solver.solve(state), points[team[state.player]])
+
+    def test_agents(self):
+        # a position of the generator in the last two tricks with few possible deals of the hidden cards, the
+        # simulations reach positions in the table when the actual cards are dealt
+        game = next(game for game in self._replay_positions()
+                    if game.state.nr_played_cards == 29 and self.rule.get_valid_cards_from_state(game.state).sum() > 1)
+        obs = game.get_observation()
+        valid_cards = self.rule.get_valid_cards_from_obs(obs)
+        for agent_class in [AgentMCTS, AgentISMCTS]:
+            table = RecordingEndgameTable(self.tmp_dir.name)
+            card = agent_class(iterations=100, seed=1, endgame_table=table).action_play_card(obs)
+            self.assertEqual(1, valid_cards[card])
+            self.assertGreater(table.nr_lookups, 0)
+            self.assertGreater(table.nr_hits, 0)
+            self.assertEqual(0, table.nr_errors)
+
+        # the table is sent to the worker processes once, where it is memory mapped again
+        agent = AgentISMCTS(iterations=50, nr_processes=2, seed=1, endgame_table=self.table)
+        try:
+            self.assertEqual(1, valid_cards[agent.action_play_card(obs)])
+            self.assertEqual(100, agent.last_search_info['iterations'])
+        finally:
+            agent.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import copy
 import unittest
 import numpy as np
 
@@ -92,6 +93,21 @@ class GameSimTestCase(unittest.TestCase):
         trick = np.array([SA, D6, D7, S9])
         self.assertEqual(rule.calc_winner(trick, first_player, trump=OBE_ABE), EAST)
         
+    def test_calc_winner_points_batch(self):
+        rule = RuleSchieber()
+        rng = np.random.default_rng(42)
+        nr_tricks = 2000
+        tricks = np.array([rng.choice(36, size=4, replace=False) for _ in range(nr_tricks)], dtype=np.int32)
+        first_player = rng.integers(0, 4, size=nr_tricks)
+        trumps = rng.integers(0, 6, size=nr_tricks)
+        is_last = rng.integers(0, 2, size=nr_tricks).astype(bool)
+
+        winners = rule.calc_winner_batch(tricks, first_player, trumps)
+        points = rule.calc_points_batch(tricks, is_last, trumps)
+        for i in range(nr_tricks):
+            self.assertEqual(rule.calc_winner(tricks[i], first_player[i], trumps[i]), winners[i])
+            self.assertEqual(rule.calc_points(tricks[i], is_last[i], trumps[i]), points[i])
+
     def test_complete_game(self):
         # replay game manually from a log file entry
         # {"trump":5,"dealer":3,"tss":1,"tricks":[{"cards":["C7","CK","C6","CJ"],"points":17,"win":0,"first":2},
@@ -222,6 +238,39 @@ class GameSimTestCase(unittest.TestCase):
         while not game.is_done():
             game.action_play_card(agent.action_play_card(game.get_observation()))
 
+    def test_undo(self):
+        rule = RuleSchieber()
+        rng = np.random.default_rng(42)
+        for trump_action in [PUSH, HEARTS, OBE_ABE]:
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=EAST)
+            states = [copy.deepcopy(game.state)]
+            game.action_trump(trump_action)
+            states.append(copy.deepcopy(game.state))
+            if trump_action == PUSH:
+                game.action_trump(UNE_UFE)
+                states.append(copy.deepcopy(game.state))
+
+            while not game.is_done():
+                valid_cards = rule.get_valid_cards_from_state(game.state)
+                game.action_play_card(rng.choice(np.flatnonzero(valid_cards)))
+                states.append(copy.deepcopy(game.state))
+
+            # undo all the actions and compare with the saved states
+            states.pop()
+            while game.state.nr_played_cards > 0:
+                game.undo_play_card()
+                self.assertTrue(states.pop() == game.state)
+                rule.assert_invariants(game.state)
+            while states:
+                game.undo_trump()
+                self.assertTrue(states.pop() == game.state)
+
+            with self.assertRaises(ValueError):
+                game.undo_trump()
+            with self.assertRaises(ValueError):
+                game.undo_play_card()
+
     def test_random_game_full_action(self):
         rule = RuleSchieber()
         game = GameSim(rule=rule)
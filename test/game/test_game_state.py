@@ -4,12 +4,13 @@ import unittest
 import numpy as np
 
 from jass.agents.agent_random_schieber import AgentRandomSchieber
-from jass.game.const import NORTH, PUSH
+from jass.game.const import NORTH, PUSH, OBE_ABE
 from jass.game.game_observation import GameObservation
 from jass.game.game_sim import GameSim
 from jass.game.game_state import GameState
 from jass.game.game_state_util import observation_from_state, calculate_starting_hands_from_game, \
-    state_from_complete_game, state_for_trump_from_complete_game, state_from_observation
+    state_from_complete_game, state_for_trump_from_complete_game, state_from_observation, states_to_array, \
+    states_from_array, observation_play_card, canonicalize, permute_colors, permute_card, permute_trump
 from jass.game.game_util import deal_random_hand
 from jass.game.rule_schieber import RuleSchieber
 
@@ -113,6 +114,34 @@ class MyTestCase(unittest.TestCase):
                 obs_read = GameObservation.from_json(json.loads(json_str))
                 self.assertTrue(obs == obs_read)
 
+    def test_to_from_bytes(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        agent = AgentRandomSchieber()
+
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        states = [copy.deepcopy(game.state)]
+
+        game.action_trump(PUSH)
+        states.append(copy.deepcopy(game.state))
+        game.action_trump(agent.action_trump(game.get_observation()))
+        states.append(copy.deepcopy(game.state))
+
+        while not game.is_done():
+            game.action_play_card(agent.action_play_card(game.get_observation()))
+            states.append(copy.deepcopy(game.state))
+
+        for state in states:
+            data = state.to_bytes()
+            self.assertEqual(40, len(data))
+            self.assertTrue(state == GameState.from_bytes(data, rule))
+
+        records = states_to_array(states)
+        self.assertEqual(GameState.BYTES_DTYPE, records.dtype)
+        states_read = states_from_array(records, rule)
+        for state, state_read in zip(states, states_read):
+            self.assertTrue(state == state_read)
+
     def test_from_complete_game(self):
         # play a random game
         rule = RuleSchieber()
@@ -187,6 +216,78 @@ class MyTestCase(unittest.TestCase):
             state_back = state_from_observation(obs, game.state.hands)
             self.assertTrue(game.state == state_back)
 
+    def test_obs_in_place(self):
+        # the reused observation must be the same as a new one for all moves and players
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        agent = AgentRandomSchieber()
+        obs_buffer = GameObservation()
+
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(agent.action_trump(game.get_observation(obs_buffer)))
+        if game.state.trump == -1:
+            game.action_trump(agent.action_trump(game.get_observation(obs_buffer)))
+
+        while True:
+            for i in range(4):
+                obs = observation_from_state(game.state, player=i, obs=obs_buffer)
+                self.assertIs(obs_buffer, obs)
+                self.assertTrue(observation_from_state(game.state, player=i) == obs)
+            if game.is_done():
+                break
+            game.action_play_card(agent.action_play_card(game.get_observation(obs_buffer)))
+
+    def test_obs_play_card(self):
+        # observations updated by the cards played must be the same as new observations from the state
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        agent = AgentRandomSchieber()
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(agent.action_trump(game.get_observation()))
+        if game.state.trump == -1:
+            game.action_trump(agent.action_trump(game.get_observation()))
+
+        observations = [observation_from_state(game.state, player=i) for i in range(4)]
+        while not game.is_done():
+            card = agent.action_play_card(game.get_observation())
+            game.action_play_card(card)
+            for i in range(4):
+                observation_play_card(observations[i], card, rule)
+                self.assertTrue(observation_from_state(game.state, player=i) == observations[i])
+
+    def test_canonicalize(self):
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        rng = np.random.default_rng(4)
+        for trump in [-1, 1, OBE_ABE]:
+            game.init_from_cards(hands=deal_random_hand(rng), dealer=NORTH)
+            if trump != -1:
+                game.action_trump(trump)
+            for _ in range(0 if trump == -1 else 14):
+                game.action_play_card(int(rng.choice(np.flatnonzero(rule.get_valid_cards_from_state(game.state)))))
+            for state in [game.state, observation_from_state(game.state, player=2)]:
+                canonical, inverse_perm = canonicalize(state)
+                self.assertTrue(permute_colors(canonical, inverse_perm) == state)
+                self.assertEqual(trump, permute_trump(canonical.trump, inverse_perm))
+
+                # all the states with permuted equivalent colors have the same canonical state
+                for _ in range(10):
+                    color_perm = rng.permutation(4)
+                    if 0 <= trump < 4:
+                        color_perm = np.arange(4)
+                        color_perm[[0, 2, 3]] = rng.permutation([0, 2, 3])
+                    permuted, _ = canonicalize(permute_colors(state, color_perm))
+                    self.assertTrue(canonical == permuted)
+
+            # actions of the canonical state are mapped back to actions of the state
+            if trump != -1:
+                valid_cards = rule.get_valid_cards_from_state(game.state)
+                canonical, inverse_perm = canonicalize(game.state)
+                canonical_valid_cards = rule.get_valid_cards_from_state(canonical)
+                for card in np.flatnonzero(canonical_valid_cards):
+                    self.assertEqual(1, valid_cards[permute_card(card, inverse_perm)])
+                self.assertEqual(valid_cards.sum(), canonical_valid_cards.sum())
+
 
 if __name__ == '__main__':
     unittest.main()
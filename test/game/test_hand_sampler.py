@@ -0,0 +1,102 @@
+import itertools
+import unittest
+
+import numpy as np
+
+from jass.game.const import NORTH, SPADES, OBE_ABE, color_of_card, offset_of_card, J_offset
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.hand_sampler import calc_voids, HandSampler
+from jass.game.rule_schieber import RuleSchieber
+
+
+class HandSamplerTestCase(unittest.TestCase):
+    @staticmethod
+    def _play_game(trump: int, nr_cards: int, seed: int) -> GameSim:
+        rule = RuleSchieber()
+        rng = np.random.default_rng(seed)
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(rng), dealer=NORTH)
+        game.action_trump(trump)
+        for _ in range(nr_cards):
+            game.action_play_card(int(rng.choice(np.flatnonzero(rule.get_valid_cards_from_state(game.state)))))
+        return game
+
+    def test_voids_respected_by_real_hands(self):
+        for seed in range(20):
+            trump = SPADES if seed % 2 == 0 else OBE_ABE
+            for nr_cards in range(0, 36, 5):
+                game = self._play_game(trump, nr_cards, seed)
+                voids = calc_voids(game.get_observation())
+                for player in range(4):
+                    for card in np.flatnonzero(game.state.hands[player]):
+                        if color_of_card[card] == trump and offset_of_card[card] == J_offset:
+                            continue
+                        self.assertEqual(0, voids[player, color_of_card[card]])
+
+    def test_sample_consistent(self):
+        rng = np.random.default_rng(1)
+        for seed in range(10):
+            game = self._play_game(SPADES, 3 * seed, seed)
+            obs = game.get_observation()
+            voids = calc_voids(obs)
+            deals = HandSampler(obs, rng).sample_batch(20)
+            for hands in deals:
+                np.testing.assert_array_equal(obs.hand, hands[obs.player_view])
+                np.testing.assert_array_equal(game.state.hands.sum(axis=1), hands.sum(axis=1))
+                # each unplayed card is dealt exactly once
+                np.testing.assert_array_equal(game.state.hands.sum(axis=0), hands.sum(axis=0))
+                for player in range(4):
+                    for card in np.flatnonzero(hands[player]):
+                        if offset_of_card[card] != J_offset or color_of_card[card] != SPADES:
+                            self.assertEqual(0, voids[player, color_of_card[card]])
+
+    def test_sample_uniform(self):
+        # enumerate all deals late in a game with a void and compare with the sampled frequencies
+        for seed in range(40):
+            game = self._play_game(OBE_ABE, 26, seed)
+            obs = game.get_observation()
+            voids = calc_voids(obs)
+            if voids.sum() > 0:
+                break
+        self.assertGreater(voids.sum(), 0)
+        sampler = HandSampler(obs, np.random.default_rng(2))
+
+        hidden = [p for p in range(4) if p != obs.player_view]
+        unknown = np.flatnonzero(game.state.hands[hidden].sum(axis=0))
+        nr_cards = game.state.hands[hidden].sum(axis=1)
+        valid_deals = set()
+        for owners in itertools.product(range(3), repeat=len(unknown)):
+            owners = np.array(owners)
+            if np.any(np.bincount(owners, minlength=3) != nr_cards):
+                continue
+            if all(voids[hidden[owner], color_of_card[card]] == 0 for owner, card in zip(owners, unknown)):
+                valid_deals.add(tuple(owners))
+        self.assertEqual(len(valid_deals), sampler.nr_deals)
+
+        nr_samples = 200 * len(valid_deals)
+        for deals in [sampler.sample_batch(nr_samples), np.array([sampler.sample() for _ in range(nr_samples)])]:
+            owners, counts = np.unique(deals[:, hidden][:, :, unknown].argmax(axis=1), axis=0, return_counts=True)
+            self.assertEqual(valid_deals, set(tuple(o) for o in owners))
+            self.assertLess(np.abs(counts - 200).max(), 80)
+
+    def test_sample_batch_out(self):
+        game = self._play_game(SPADES, 10, 3)
+        obs = game.get_observation()
+        out = np.ones([8, 4, 36], dtype=np.int32)
+        result = HandSampler(obs, np.random.default_rng(3)).sample_batch(5, out=out)
+        self.assertEqual((5, 4, 36), result.shape)
+        self.assertTrue(np.shares_memory(result, out))
+        np.testing.assert_array_equal(game.state.hands.sum(axis=1), result[0].sum(axis=1))
+        np.testing.assert_array_equal(np.ones([3, 4, 36]), out[5:])
+
+    def test_inconsistent_observation(self):
+        game = self._play_game(SPADES, 0, 4)
+        obs = game.get_observation()
+        obs.hand = obs.hand.copy()
+        obs.hand[np.flatnonzero(obs.hand == 0)[0]] = 1
+        self.assertRaises(ValueError, HandSampler, obs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from jass.game.const import NORTH, PUSH
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.instrumentation import Instrumentation
+from jass.game.rule_schieber import RuleSchieber
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def test_timers_and_counters(self):
+        instrumentation = Instrumentation()
+        instrumentation.record('phase', 0.5)
+        instrumentation.record('phase', 1.5)
+        instrumentation.count('counter')
+        instrumentation.count('counter', 2)
+        data = instrumentation.to_dict()
+        self.assertEqual(dict(calls=2, total=2.0, mean=1.0, max=1.5), data['timers']['phase'])
+        self.assertEqual(3, data['counters']['counter'])
+
+        other = Instrumentation()
+        other.record('phase', 2.0)
+        other.record('other', 1.0)
+        other.count('counter')
+        instrumentation.merge(other)
+        data = instrumentation.to_dict()
+        self.assertEqual(dict(calls=3, total=4.0, mean=4.0 / 3, max=2.0), data['timers']['phase'])
+        self.assertEqual(1, data['timers']['other']['calls'])
+        self.assertEqual(4, data['counters']['counter'])
+        # sorted by total time
+        lines = instrumentation.summary().split('\n')
+        self.assertTrue(lines[1].startswith('phase'))
+        self.assertTrue(lines[2].startswith('other'))
+
+        instrumentation.reset()
+        self.assertEqual(dict(timers={}, counters={}), instrumentation.to_dict())
+
+    def test_timed_exception(self):
+        instrumentation = Instrumentation()
+
+        def fail():
+            raise ValueError()
+        self.assertRaises(ValueError, instrumentation.timed('fail', fail))
+        self.assertEqual(1, instrumentation.to_dict()['timers']['fail']['calls'])
+
+    def test_game_sim(self):
+        instrumentation = Instrumentation()
+        game = GameSim(rule=RuleSchieber())
+        game.instrument(instrumentation)
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(PUSH)
+        game.action_trump(0)
+        game.get_observation()
+        game.action_play_card(int(game.rule.get_valid_cards_from_state(game.state).argmax()))
+        timers = instrumentation.to_dict()['timers']
+        self.assertEqual(3, timers['state_update']['calls'])
+        self.assertEqual(1, timers['observation']['calls'])
+        # other games are not instrumented
+        GameSim(rule=RuleSchieber()).get_observation()
+        self.assertEqual(1, instrumentation.to_dict()['timers']['observation']['calls'])
+
+
+if __name__ == '__main__':
+    unittest.main()
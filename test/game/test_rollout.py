@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from jass.game.const import NORTH
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rollout import Rollout, rollout, random_policy, highest_card_policy, bits_from_one_hot, \
+    one_hot_from_bits, select_bits
+from jass.game.rule_schieber import RuleSchieber
+
+
+class RolloutTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rule = RuleSchieber()
+
+    def _play_game(self, trump: int, nr_cards: int, rng: np.random.Generator) -> GameSim:
+        game = GameSim(rule=self.rule)
+        game.init_from_cards(hands=deal_random_hand(rng), dealer=NORTH)
+        game.action_trump(trump)
+        for _ in range(nr_cards):
+            game.action_play_card(int(rng.choice(np.flatnonzero(self.rule.get_valid_cards_from_state(game.state)))))
+        return game
+
+    def test_bits(self):
+        rng = np.random.default_rng(1)
+        cards = rng.integers(0, 2, size=[20, 36])
+        bits = bits_from_one_hot(cards)
+        np.testing.assert_array_equal(cards, one_hot_from_bits(bits))
+        for i in range(20):
+            index = rng.integers(0, cards[i].sum())
+            self.assertEqual(np.flatnonzero(cards[i])[index], select_bits(bits[i:i + 1], np.array([index]))[0])
+
+    def test_same_as_game_sim(self):
+        # the valid cards and the points are the same as when playing the same cards in GameSim
+        rng = np.random.default_rng(2)
+        for trump in range(6):
+            game = self._play_game(trump, int(rng.integers(0, 36)), rng)
+            valid_cards = []
+            played_cards = []
+
+            def recording_policy(kernel, valid, policy_rng):
+                cards = random_policy(kernel, valid, policy_rng)
+                valid_cards.append(valid.copy())
+                played_cards.append(cards.copy())
+                return cards
+
+            points = Rollout(50).run(game.state, recording_policy, rng)
+            nr_played_cards = game.state.nr_played_cards
+            for i in range(50):
+                for step, cards in enumerate(played_cards):
+                    valid = one_hot_from_bits(valid_cards[step][i])
+                    np.testing.assert_array_equal(self.rule.get_valid_cards_from_state(game.state), valid)
+                    game.action_play_card(int(cards[i]))
+                np.testing.assert_array_equal(game.state.points, points[i])
+                while game.state.nr_played_cards > nr_played_cards:
+                    game.undo_play_card()
+
+    def test_rollout(self):
+        rng = np.random.default_rng(3)
+        game = self._play_game(4, 10, rng)
+        points = rollout(game.state, random_policy, rng, n=200)
+        self.assertEqual((200, 2), points.shape)
+        self.assertTrue((points.sum(axis=1) == 157).all())
+        self.assertTrue((points >= game.state.points).all())
+        # the random continuations differ, the one of the policy without randomness do not
+        self.assertGreater(len(np.unique(points[:, 0])), 1)
+        points = rollout(game.state, highest_card_policy, rng, n=5)
+        self.assertTrue((points == points[0]).all())
+
+        # the game is already finished
+        game = self._play_game(4, 36, rng)
+        np.testing.assert_array_equal(np.tile(game.state.points, (3, 1)), rollout(game.state, n=3))
+
+        game = GameSim(rule=self.rule)
+        game.init_from_cards(hands=deal_random_hand(rng), dealer=NORTH)
+        self.assertRaises(ValueError, rollout, game.state)
+
+
+if __name__ == '__main__':
+    unittest.main()
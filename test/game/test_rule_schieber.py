@@ -156,6 +156,35 @@ class RuleSchieberTestCase(unittest.TestCase):
         actions = rule.get_valid_actions_from_state(game.state)
         self.assertEqual(9, actions.sum())
 
+    def test_valid_cards_batch(self):
+        # collect positions from random games and compare with the results of the single positions
+        rng = np.random.default_rng(42)
+        hands, tricks, move_nrs, trumps, expected = [], [], [], [], []
+        for game_nr in range(100):
+            game = GameSim(rule=self.rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(game_nr % 6)
+            while not game.is_done():
+                state = game.state
+                valid = self.rule.get_valid_cards_from_state(state)
+                hands.append(state.hands[state.player].copy())
+                tricks.append(state.current_trick.copy())
+                move_nrs.append(state.nr_cards_in_trick)
+                trumps.append(state.trump)
+                expected.append(valid.copy())
+                game.action_play_card(rng.choice(np.flatnonzero(valid)))
+
+        valid_batch = self.rule.get_valid_cards_batch(np.array(hands), np.array(tricks),
+                                                      np.array(move_nrs), np.array(trumps))
+        self.assertTrue(np.all(np.array(expected) == valid_batch))
+
+        # special cases from the tests above
+        hand = np.zeros(36, np.int32)
+        hand[[SA, SK, HJ, C6, C7]] = 1
+        valid = self.rule.get_valid_cards_batch(hand[np.newaxis, :], np.array([[H6, H8, -1, -1]]),
+                                                np.array([2]), np.array([H]))
+        self.assertTrue(np.all(hand == valid[0]))
+
 
 
 
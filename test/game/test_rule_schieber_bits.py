@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from jass.game.const import *
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand, convert_one_hot_encoded_cards_to_bits, \
+    convert_bits_to_one_hot_encoded_cards, convert_bits_to_int_encoded_list
+from jass.game.rule_schieber import RuleSchieber
+from jass.game.rule_schieber_bits import RuleSchieberBits
+
+
+class RuleSchieberBitsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.rule = RuleSchieber()
+        self.rule_bits = RuleSchieberBits()
+
+    def test_conversions(self):
+        hand = np.zeros(36, np.int32)
+        hand[[DA, HJ, C6]] = 1
+        bits = convert_one_hot_encoded_cards_to_bits(hand)
+        self.assertEqual(card_bits[DA] | card_bits[HJ] | card_bits[C6], bits)
+        self.assertEqual([DA, HJ, C6], convert_bits_to_int_encoded_list(bits))
+        self.assertTrue(np.all(hand == convert_bits_to_one_hot_encoded_cards(bits)))
+
+    def test_masks(self):
+        for color in range(4):
+            self.assertEqual(9, bin(color_masks_bits[color]).count('1'))
+        self.assertEqual(ALL_CARDS_BITS, sum(color_masks_bits))
+        self.assertEqual(card_bits[HJ] | card_bits[H9], higher_trump_bits[HA])
+        self.assertEqual(0, higher_trump_bits[SJ])
+        self.assertEqual(card_bits[CJ], trump_jack_bits[CLUBS])
+
+    def test_valid_cards(self):
+        hand = np.zeros(36, np.int32)
+        hand[[SA, SK, S7, H8, H6, C7, C6]] = 1
+        valid = self.rule_bits.get_valid_cards(convert_one_hot_encoded_cards_to_bits(hand), [HK, H8, SQ], 3, S)
+        self.assertEqual([SA, SK, H8, H6], sorted(convert_bits_to_int_encoded_list(valid), key=lambda c: c % 9))
+
+    def test_random_games_same_as_rule_schieber(self):
+        # play random games and compare all the results with the numpy implementation
+        rng = np.random.default_rng(42)
+        for game_nr in range(200):
+            game = GameSim(rule=self.rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(game_nr % 6)
+            while not game.is_done():
+                state = game.state
+                valid = self.rule.get_valid_cards_from_state(state)
+                valid_bits = self.rule_bits.get_valid_cards(
+                    convert_one_hot_encoded_cards_to_bits(state.hands[state.player]),
+                    state.current_trick, state.nr_cards_in_trick, state.trump)
+                self.assertEqual(convert_one_hot_encoded_cards_to_bits(valid), valid_bits)
+
+                if state.nr_cards_in_trick == 3:
+                    trick = state.current_trick.copy()
+                    card = rng.choice(np.flatnonzero(valid))
+                    trick[3] = card
+                    first_player = state.trick_first_player[state.nr_tricks]
+                    is_last = state.nr_tricks == 8
+                    self.assertEqual(self.rule.calc_winner(trick, first_player, state.trump),
+                                     self.rule_bits.calc_winner(trick, first_player, state.trump))
+                    self.assertEqual(self.rule.calc_points(trick, is_last, state.trump),
+                                     self.rule_bits.calc_points(trick, is_last, state.trump))
+                else:
+                    card = rng.choice(np.flatnonzero(valid))
+                game.action_play_card(card)
+
+    def test_calc_points_bits(self):
+        cards = card_bits[SA] | card_bits[SJ] | card_bits[S6] | card_bits[S9]
+        self.assertEqual(45, self.rule_bits.calc_points_bits(cards, SPADES))
+        self.assertEqual(152, self.rule_bits.calc_points_bits(ALL_CARDS_BITS, OBE_ABE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from jass.game.const import NORTH, PUSH, SPADES
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.game.zobrist import zobrist_hash, TranspositionTable
+
+
+class ZobristTestCase(unittest.TestCase):
+    def test_incremental_key(self):
+        rule = RuleSchieber()
+        rng = np.random.default_rng(1)
+        for dealer in range(4):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(rng), dealer=dealer)
+            self.assertEqual(zobrist_hash(game.state), game.zobrist_key)
+            game.action_trump(PUSH)
+            self.assertEqual(zobrist_hash(game.state), game.zobrist_key)
+            game.undo_trump()
+            self.assertEqual(zobrist_hash(game.state), game.zobrist_key)
+            game.action_trump(dealer)
+            self.assertEqual(zobrist_hash(game.state), game.zobrist_key)
+
+            keys = [game.zobrist_key]
+            while not game.is_done():
+                game.action_play_card(int(rng.choice(np.flatnonzero(rule.get_valid_cards_from_state(game.state)))))
+                self.assertEqual(zobrist_hash(game.state), game.zobrist_key)
+                keys.append(game.zobrist_key)
+            self.assertEqual(len(keys), len(set(keys)))
+            while game.state.nr_played_cards > 0:
+                game.undo_play_card()
+                keys.pop()
+                self.assertEqual(keys[-1], game.zobrist_key)
+
+    def test_key_independent_of_history(self):
+        # the completed tricks and points are not part of the key
+        rule = RuleSchieber()
+        game = GameSim(rule=rule)
+        game.init_from_cards(hands=deal_random_hand(np.random.default_rng(2)), dealer=NORTH)
+        game.action_trump(SPADES)
+        for _ in range(6):
+            game.action_play_card(int(np.flatnonzero(rule.get_valid_cards_from_state(game.state))[0]))
+        key = game.zobrist_key
+        game.state.tricks[0] = game.state.tricks[0, ::-1]
+        game.state.points[:] = 0
+        game.update_zobrist_key()
+        self.assertEqual(key, game.zobrist_key)
+        game.state.current_trick[:2] = game.state.current_trick[1::-1]
+        game.update_zobrist_key()
+        self.assertNotEqual(key, game.zobrist_key)
+
+    def test_stable_across_processes(self):
+        code = 'import numpy as np\n' \
+               'from jass.game.game_sim import GameSim\n' \
+               'from jass.game.rule_schieber import RuleSchieber\n' \
+               'from jass.game.game_util import deal_random_hand\n' \
+               'game = GameSim(rule=RuleSchieber())\n' \
+               'game.init_from_cards(hands=deal_random_hand(np.random.default_rng(3)), dealer=0)\n' \
+               'game.action_trump(1)\n' \
+               'print(game.zobrist_key)\n'
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(np.random.default_rng(3)), dealer=0)
+        game.action_trump(1)
+        self.assertEqual(game.zobrist_key, int(output))
+
+    def test_transposition_table(self):
+        table = TranspositionTable(size_bits=2)
+        table.store(1, 3, 0, 10, 5)
+        entry = table.lookup(1)
+        self.assertEqual((3, 0, 10, 5), (entry.depth, entry.lower, entry.upper, entry.best_move))
+        self.assertIsNone(table.lookup(5))
+
+        # same slot: a shallower search does not replace a deeper one of the same search
+        table.store(5, 2, 1, 1)
+        self.assertIsNone(table.lookup(5))
+        table.store(5, 3, 1, 1)
+        self.assertIsNone(table.lookup(1))
+        self.assertEqual(1, table.lookup(5).lower)
+
+        # entries of older searches are always replaced
+        table.new_search()
+        table.store(9, 0, 2, 2)
+        self.assertEqual(2, table.lookup(9).lower)
+        self.assertEqual(1, len(table))
+        table.clear()
+        self.assertEqual(0, len(table))
+
+
+if __name__ == '__main__':
+    unittest.main()
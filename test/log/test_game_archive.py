@@ -0,0 +1,69 @@
+import copy
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.arena.arena import Arena
+from jass.game.const import NORTH
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.logs.game_archive import GameArchiveWriter, GameArchiveReader
+
+
+class GameArchiveTestCase(unittest.TestCase):
+    def test_read_write(self):
+        rule = RuleSchieber()
+        agent = AgentRandomSchieber()
+        games = []
+        for i in range(7):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(agent.action_trump(game.get_observation()))
+            if game.state.trump == -1:
+                game.action_trump(agent.action_trump(game.get_observation()))
+            while not game.is_done():
+                game.action_play_card(agent.action_play_card(game.get_observation()))
+            games.append(copy.deepcopy(game.state))
+
+        now = datetime.now().replace(microsecond=0)
+        with tempfile.TemporaryDirectory() as directory:
+            basename = os.path.join(directory, 'games')
+            # use a small buffer, so that it is written several times
+            with GameArchiveWriter(basename, max_buffer=3) as writer:
+                for i, game in enumerate(games):
+                    writer.add_game(game, date=now if i > 0 else None, player_ids=[i, 1, 2, 3])
+
+            archive = GameArchiveReader(basename)
+            self.assertEqual(7, len(archive))
+            for i, game in enumerate(games):
+                self.assertTrue(game == archive.get_state(i))
+                entry = archive.get_entry(i)
+                self.assertEqual(now if i > 0 else None, entry.date)
+                self.assertEqual([i, 1, 2, 3], entry.player_ids)
+            states = archive.get_states(2, 5)
+            self.assertEqual(3, len(states))
+            self.assertTrue(games[4] == states[2])
+            self.assertEqual(games[6].trump, archive.records[6]['game']['trump'])
+            del archive
+
+    def test_arena(self):
+        with tempfile.TemporaryDirectory() as directory:
+            basename = os.path.join(directory, 'arena')
+            arena = Arena(nr_games_to_play=5, save_filename=basename, save_format=Arena.SAVE_FORMAT_ARCHIVE)
+            player = AgentRandomSchieber()
+            arena.set_players(player, player, player, player)
+            arena.play_all_games()
+
+            archive = GameArchiveReader(basename)
+            self.assertEqual(5, len(archive))
+            for i in range(5):
+                self.assertEqual(arena.points_team_0[i], archive.get_state(i).points[0])
+                self.assertEqual(arena.points_team_1[i], archive.get_state(i).points[1])
+            del archive
+
+
+if __name__ == '__main__':
+    unittest.main()
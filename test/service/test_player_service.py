@@ -0,0 +1,176 @@
+import asyncio
+import copy
+import socket
+import threading
+import unittest
+from http import HTTPStatus
+from typing import List
+
+import numpy as np
+
+from werkzeug.serving import make_server
+
+from jass.agents.agent import Agent
+from jass.agents.agent_by_network import AgentByNetwork
+from jass.agents.agent_by_network_async import AgentByNetworkAsync
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.game.const import NORTH
+from jass.game.game_observation import GameObservation
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.service.latency_histogram import LatencyHistogram
+from jass.service.player_service_app import PlayerServiceApp
+
+
+class AgentRecording(Agent):
+    """
+    Random agent that keeps copies of the observations it received.
+    """
+    def __init__(self):
+        self._agent = AgentRandomSchieber()
+        self.observations = []
+        self.nr_batches = 0
+
+    def action_trump_batch(self, observations: List[GameObservation]) -> List[int]:
+        self.nr_batches += 1
+        return super().action_trump_batch(observations)
+
+    def action_play_card_batch(self, observations: List[GameObservation]) -> List[int]:
+        self.nr_batches += 1
+        return super().action_play_card_batch(observations)
+
+    def action_trump(self, obs: GameObservation) -> int:
+        return self._agent.action_trump(obs)
+
+    def action_play_card(self, obs: GameObservation) -> int:
+        self.observations.append(copy.deepcopy(obs))
+        return self._agent.action_play_card(obs)
+
+
+class PlayerServiceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.agent = AgentRecording()
+        self.app = PlayerServiceApp('player_service', max_sessions=100)
+        self.app.add_player('random', self.agent)
+        self.server = make_server('127.0.0.1', 0, self.app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.url = 'http://127.0.0.1:{}/random'.format(self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+
+    def test_session(self):
+        rule = RuleSchieber()
+        # the same network agent plays for all players
+        agent = AgentByNetwork(self.url, use_session=True)
+        for _ in range(3):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(agent.action_trump(game.get_observation()))
+            if game.state.trump == -1:
+                game.action_trump(agent.action_trump(game.get_observation()))
+            while not game.is_done():
+                obs = game.get_observation()
+                card = agent.action_play_card(obs)
+                # the observation in the service must be the same as the one of the client
+                self.assertTrue(obs == self.agent.observations[-1])
+                game.action_play_card(card)
+
+        # sessions are removed after the last card of each player
+        self.assertEqual(0, len(self.app._sessions))
+
+    def test_async_concurrent_games(self):
+        rule = RuleSchieber()
+        nr_games = 6
+
+        async def play_game(agent: AgentByNetworkAsync) -> GameSim:
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(await agent.action_trump_async(game.get_observation()))
+            if game.state.trump == -1:
+                game.action_trump(await agent.action_trump_async(game.get_observation()))
+            while not game.is_done():
+                game.action_play_card(await agent.action_play_card_async(game.get_observation()))
+            return game
+
+        async def play_games(agent: AgentByNetworkAsync):
+            return await asyncio.gather(*[play_game(agent) for _ in range(nr_games)])
+
+        with AgentByNetworkAsync(self.url, use_session=True, max_connections=4) as agent:
+            games = asyncio.run(play_games(agent))
+        self.assertEqual(nr_games, len(games))
+        self.assertEqual(0, agent.nr_failed_requests)
+        self.assertEqual(nr_games * 36, agent.latency_play_card.count)
+        self.assertEqual(nr_games * 36, len(self.agent.observations))
+        self.assertEqual(0, len(self.app._sessions))
+
+    def test_batch(self):
+        rule = RuleSchieber()
+        agent = AgentByNetwork(self.url)
+        games = []
+        for _ in range(5):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            games.append(game)
+
+        # the trump of all games in one request, the games with push need a second request
+        trumps = agent.action_trump_batch([game.get_observation() for game in games])
+        for game, trump in zip(games, trumps):
+            game.action_trump(trump)
+        pushed = [game for game in games if game.state.trump == -1]
+        if len(pushed) > 0:
+            trumps = agent.action_trump_batch([game.get_observation() for game in pushed])
+            for game, trump in zip(pushed, trumps):
+                game.action_trump(trump)
+        nr_trump_batches = self.agent.nr_batches
+
+        for _ in range(36):
+            observations = [game.get_observation() for game in games]
+            cards = agent.action_play_card_batch(observations)
+            for game, obs, card in zip(games, observations, cards):
+                self.assertEqual(1, rule.get_valid_cards_from_obs(obs)[card])
+                game.action_play_card(card)
+        self.assertEqual(nr_trump_batches + 36, self.agent.nr_batches)
+        self.assertEqual(5 * 36, len(self.agent.observations))
+        self.assertTrue(np.all([game.state.points.sum() == 157 for game in games]))
+
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram(min_latency=0.001, max_latency=1.0, bins_per_decade=10)
+        for i in range(1, 101):
+            histogram.record(i / 1000.0)
+        self.assertEqual(100, histogram.count)
+        self.assertAlmostEqual(0.0505, histogram.mean())
+        # percentiles are precise to one bin
+        self.assertTrue(0.050 <= histogram.percentile(50) <= 0.050 * 10 ** 0.1 + 1e-9)
+        self.assertEqual(0.1, histogram.percentile(100))
+        histogram.record(5.0)
+        self.assertEqual(5.0, histogram.percentile(100))
+        self.assertEqual(101, histogram.to_dict()['count'])
+
+    def test_unknown_session(self):
+        client = self.app.test_client()
+        response = client.post('/random/action_play_card',
+                               json=dict(gameId='unknown', cards=['DA'], nrPlayedCards=1))
+        self.assertEqual(HTTPStatus.CONFLICT, response.status_code)
+
+
+class AgentByNetworkStandinTestCase(unittest.TestCase):
+    def test_standin(self):
+        # use a port on which no service is running
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        with AgentByNetworkAsync('http://127.0.0.1:{}/random'.format(port), timeout=1) as agent:
+            game = GameSim(rule=RuleSchieber())
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(agent.action_trump(game.get_observation()))
+            self.assertTrue(game.state.trump != -1 or game.state.forehand == 0)
+            self.assertEqual(1, agent.nr_failed_requests)
+            self.assertEqual(0, agent.latency_trump.count)
+
+
+if __name__ == '__main__':
+    unittest.main()
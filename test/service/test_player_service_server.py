@@ -0,0 +1,87 @@
+import json
+import threading
+import unittest
+import urllib.request
+from http import HTTPStatus
+
+from jass.agents.agent_noob import AgentNoob
+from jass.game.const import NORTH
+from jass.game.game_sim import GameSim
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.service.player_service_server import ThreadLocalAgent, PooledWSGIServer, create_service_app
+
+
+class PlayerServiceServerTestCase(unittest.TestCase):
+    def test_thread_local_agent(self):
+        warmed_up = []
+        player = ThreadLocalAgent(AgentNoob, warmup=warmed_up.append)
+        agents = [player.agent]
+
+        def get_agent():
+            agents.append(player.agent)
+            agents.append(player.agent)
+
+        thread = threading.Thread(target=get_agent)
+        thread.start()
+        thread.join()
+
+        # one instance per thread, each warmed up once
+        self.assertIs(agents[0], player.agent)
+        self.assertIs(agents[1], agents[2])
+        self.assertIsNot(agents[0], agents[1])
+        self.assertEqual(2, len(warmed_up))
+
+    def test_concurrent_requests(self):
+        warmed_up = []
+        app = create_service_app({'noob': AgentNoob}, warmup=warmed_up.append)
+        self.assertEqual(1, len(warmed_up))
+
+        game = GameSim(rule=RuleSchieber())
+        game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+        game.action_trump(0)
+        data = game.get_observation().to_json()
+
+        statuses = []
+
+        def send_requests():
+            client = app.test_client()
+            for _ in range(5):
+                statuses.append(client.post('/noob/action_play_card', json=data).status_code)
+
+        threads = [threading.Thread(target=send_requests) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([HTTPStatus.OK] * 20, statuses)
+        self.assertEqual(5, len(warmed_up))
+
+    def test_pooled_server(self):
+        # the requests are handled by a fixed pool of threads, so the agents are warmed up once per thread and
+        # not for every request
+        warmed_up = []
+        app = create_service_app({'noob': AgentNoob}, warmup=warmed_up.append)
+        server = PooledWSGIServer('127.0.0.1', 0, app, threads=2)
+        server_thread = threading.Thread(target=server.serve_forever)
+        server_thread.start()
+        try:
+            game = GameSim(rule=RuleSchieber())
+            game.init_from_cards(hands=deal_random_hand(), dealer=NORTH)
+            game.action_trump(0)
+            data = json.dumps(game.get_observation().to_json()).encode()
+            url = 'http://127.0.0.1:{}/noob/action_play_card'.format(server.server_port)
+            for _ in range(10):
+                request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+                with urllib.request.urlopen(request) as response:
+                    self.assertEqual(HTTPStatus.OK, response.status)
+        finally:
+            server.shutdown()
+            server.server_close()
+            server_thread.join()
+        # one agent when the app is created and at most one for each thread of the pool
+        self.assertLessEqual(len(warmed_up), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from jass.agents.agent_random_schieber import AgentRandomSchieber
+from jass.game.const import PUSH, PUSH_ALT, next_player, partner_player
+from jass.game.game_sim import GameSim
+from jass.game.game_state_util import state_from_complete_game, observation_from_state
+from jass.game.game_util import deal_random_hand
+from jass.game.rule_schieber import RuleSchieber
+from jass.logs.game_archive import GameArchiveWriter
+from jass.logs.game_log_entry import GameLogEntry
+from jass.train.obs_action_dataset import convert_games_to_dataset, NR_FEATURES, NR_FEATURES_TRUMP, \
+    FEATURES_HAND, FEATURES_PLAYED, FEATURES_TRICK, FEATURES_TRUMP, FEATURES_TRUMP_REARHAND
+
+
+class ObsActionDatasetTestCase(unittest.TestCase):
+    def setUp(self):
+        rule = RuleSchieber()
+        agent = AgentRandomSchieber()
+        self.games = []
+        for i in range(11):
+            game = GameSim(rule=rule)
+            game.init_from_cards(hands=deal_random_hand(), dealer=i % 4)
+            game.action_trump(PUSH if i % 3 == 0 else agent.action_trump(game.get_observation()))
+            if game.state.trump == -1:
+                game.action_trump(i % 6)
+            while not game.is_done():
+                game.action_play_card(agent.action_play_card(game.get_observation()))
+            self.games.append(copy.deepcopy(game.state))
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.directory.name, 'games.txt')
+        with open(self.log_file, 'w') as file:
+            for i, game in enumerate(self.games):
+                file.write(json.dumps(GameLogEntry(game=game, date=datetime.now(), player_ids=[i, i, i, i]).to_json()) + '\n')
+        with GameArchiveWriter(os.path.join(self.directory.name, 'archive')) as writer:
+            for i, game in enumerate(self.games):
+                writer.add_game(game, player_ids=[i, i, i, i])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_card_dataset(self):
+        basename = os.path.join(self.directory.name, 'cards')
+        filenames = convert_games_to_dataset([self.log_file], basename, max_entries_per_file=100,
+                                             chunk_size=4, nr_workers=0, check_invariants=True)
+        self.assertEqual(4, len(filenames))
+        data = [np.load(filename) for filename in filenames]
+        features = np.concatenate([d['features'] for d in data])
+        actions = np.concatenate([d['actions'] for d in data])
+        player_ids = np.concatenate([d['player_ids'] for d in data])
+        self.assertEqual((11 * 36, NR_FEATURES), features.shape)
+
+        for i, game in enumerate(self.games):
+            for nr_cards in range(36):
+                entry = i * 36 + nr_cards
+                obs = observation_from_state(state_from_complete_game(game, nr_cards))
+                self.assertEqual(game.tricks.reshape(-1)[nr_cards], actions[entry])
+                self.assertEqual(i, player_ids[entry])
+                np.testing.assert_array_equal(obs.hand, features[entry, FEATURES_HAND:FEATURES_HAND + 36])
+                np.testing.assert_array_equal(features[entry, FEATURES_TRUMP:FEATURES_TRUMP + 6],
+                                              np.eye(6)[game.trump])
+                played = features[entry, FEATURES_PLAYED:FEATURES_PLAYED + 4 * 36].reshape(4, 36)
+                self.assertEqual(nr_cards, played.sum())
+                self.assertEqual(obs.nr_cards_in_trick, features[entry, FEATURES_TRICK:FEATURES_TRICK + 36].sum())
+                if obs.nr_cards_in_trick > 0:
+                    # the previous player played the last card of the trick
+                    self.assertEqual(1, played[3, obs.current_trick[obs.nr_cards_in_trick - 1]])
+
+        # the archive and several workers give the same result
+        archive_filenames = convert_games_to_dataset([os.path.join(self.directory.name, 'archive.games')],
+                                                     basename + '_archive', max_entries_per_file=1000,
+                                                     chunk_size=3, nr_workers=2)
+        self.assertEqual(1, len(archive_filenames))
+        data = np.load(archive_filenames[0])
+        np.testing.assert_array_equal(features, data['features'])
+        np.testing.assert_array_equal(actions, data['actions'])
+        np.testing.assert_array_equal(player_ids, data['player_ids'])
+
+    def test_trump_dataset(self):
+        basename = os.path.join(self.directory.name, 'trump')
+        filenames = convert_games_to_dataset([self.log_file], basename, trump=True, nr_workers=0)
+        data = np.load(filenames[0])
+        nr_pushed = sum(1 for game in self.games if game.forehand == 0)
+        self.assertEqual((11 + nr_pushed, NR_FEATURES_TRUMP), data['features'].shape)
+        for i, game in enumerate(self.games):
+            forehand_player = next_player[game.dealer]
+            hands = state_from_complete_game(game, 0).hands
+            np.testing.assert_array_equal(hands[forehand_player], data['features'][i, 0:36])
+            self.assertEqual(game.trump if game.forehand == 1 else PUSH_ALT, data['actions'][i])
+        rearhand = data['features'][11:]
+        self.assertTrue(np.all(rearhand[:, FEATURES_TRUMP_REARHAND] == 1))
+        pushed_games = [game for game in self.games if game.forehand == 0]
+        for i, game in enumerate(pushed_games):
+            hands = state_from_complete_game(game, 0).hands
+            np.testing.assert_array_equal(hands[partner_player[next_player[game.dealer]]], rearhand[i, 0:36])
+            self.assertEqual(game.trump, data['actions'][11 + i])
+
+
+if __name__ == '__main__':
+    unittest.main()